@@ -2,7 +2,10 @@
 Demonstração em linha de comando do simulador de Tomasulo
 Útil para testes rápidos sem GUI
 """
+import sys
 from src.core.simulator import TomasuloSimulator
+from src.core.result_cache import ResultCache, SimulationResult
+from src.core.server import SimulationClient, server_available
 from src.mips.parser import MIPSParser
 
 
@@ -90,6 +93,7 @@ def print_metrics(simulator):
     print(f"IPC:                      {metrics.get_ipc():.3f}")
     print(f"Ciclos de Bolha:          {metrics.bubble_cycles}")
     print(f"Ciclos de Stall:          {metrics.stall_cycles}")
+    print(f"Ciclos com ROB Cheio:     {metrics.rob_full_cycles}")
     print(f"Predições de Desvio:      {bp.predictions}")
     print(f"Predições Corretas:       {bp.correct_predictions}")
     print(f"Taxa de Acerto:           {bp.get_accuracy()*100:.1f}%")
@@ -150,6 +154,63 @@ def run_demo(program_text, step_by_step=False, config=None):
     return simulator
 
 
+def print_result(result):
+    """Imprime o resultado final de uma execução completa (simulada ou do cache)"""
+    metrics = result.metrics
+    print("\nRegistradores (não-zero):")
+    print("-" * 80)
+    non_zero = [(k, v) for k, v in result.registers.items() if v != 0]
+    for i in range(0, len(non_zero), 4):
+        print("  ".join([f"{k}={v:4}" for k, v in non_zero[i:i+4]]))
+        
+    print("\nMétricas de Desempenho:")
+    print("-" * 80)
+    print(f"Total de Ciclos:          {metrics.total_cycles}")
+    print(f"Instruções Completadas:   {metrics.instructions_completed}")
+    print(f"IPC:                      {metrics.get_ipc():.3f}")
+    print(f"Ciclos de Bolha:          {metrics.bubble_cycles}")
+    print(f"Ciclos de Stall:          {metrics.stall_cycles}")
+    print(f"Ciclos com ROB Cheio:     {metrics.rob_full_cycles}")
+    print(f"Taxa de Acerto:           {result.branch_accuracy*100:.1f}%")
+    print(f"Mispredictions:           {metrics.branch_mispredictions}")
+
+
+def run_file(path, config=None, use_cache=True, use_server=True):
+    """Executa um arquivo MIPS até o fim, consultando o cache de resultados
+    
+    Com um servidor local de simulação em execução (python -m src.core.server),
+    a simulação é feita por ele, sem decodificar o programa neste processo
+    (exceto com use_cache=False, já que os workers do servidor consultam o cache).
+    """
+    with open(path) as f:
+        source = f.read()
+        
+    if use_server and use_cache and server_available():
+        result = SimulationClient().run(source, config)
+        print(f"{path}: resultado obtido do servidor de simulação")
+        print_result(result)
+        return result
+        
+    instructions = MIPSParser().parse_program(source)
+    cache = ResultCache() if use_cache else None
+    result = cache.get(instructions, config) if cache is not None else None
+    if result is None:
+        simulator = TomasuloSimulator(config)
+        simulator.load_program(instructions)
+        simulator.run_until_complete()
+        result = SimulationResult.from_simulator(simulator)
+        if cache is not None:
+            cache.put(instructions, config, result)
+        print(f"{path}: {len(instructions)} instruções simuladas")
+    else:
+        print(f"{path}: resultado obtido do cache")
+    if cache is not None:
+        cache.close()
+        
+    print_result(result)
+    return result
+
+
 def demo1_basic():
     """Demonstração 1: Operações básicas"""
     program = """
@@ -249,4 +310,9 @@ def main():
 
 
 if __name__ == '__main__':
-    main()
+    # Uso: python demo.py [arquivo.asm [--no-cache] [--no-server]]
+    if len(sys.argv) > 1:
+        run_file(sys.argv[1], use_cache='--no-cache' not in sys.argv[2:],
+                 use_server='--no-server' not in sys.argv[2:])
+    else:
+        main()
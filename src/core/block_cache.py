@@ -0,0 +1,335 @@
+"""
+Memoização da temporização por bloco básico
+
+A execução é dividida em blocos que terminam no commit de um desvio
+condicional. A temporização de um bloco depende apenas do estado
+microarquitetural sem valores (ocupação das RS e do ROB, status de
+registradores, PC de busca, preditor e ciclos relativos das instruções em
+voo) e da direção do desvio que fará commit ao fim do bloco: no modelo, os
+valores só influenciam a temporização através das direções de desvio
+resolvidas no commit. Essa direção é obtida por um simulador funcional a
+partir do estado arquitetural.
+
+A chave do cache é (PC do bloco, codificação canônica desse estado, direção do
+desvio). Em um acerto, o estado estrutural ao fim do bloco, o número de ciclos
+e os incrementos das métricas são aplicados diretamente; o estado arquitetural
+e os valores em voo são recalculados funcionalmente. O resultado é idêntico ao
+da simulação ciclo a ciclo.
+"""
+from collections import ChainMap, OrderedDict
+from src.core.structures import InstructionType
+from src.core.simulator import TomasuloSimulator, MISSING
+from src.core.functional import FunctionalSimulator
+
+
+CONDITIONAL_BRANCHES = (InstructionType.BEQ, InstructionType.BNE)
+
+
+class BlockTimingCache:
+    """Executa um simulador bloco a bloco, reaproveitando blocos já simulados
+
+    O cache é um LRU limitado a `max_entries` blocos.
+    """
+
+    # Blocos sem desvio condicional são encerrados após este número de ciclos
+    MAX_BLOCK_CYCLES = 10000
+
+    def __init__(self, simulator: TomasuloSimulator, max_entries: int = 4096):
+        if type(simulator) is not TomasuloSimulator:
+            raise ValueError("O cache de blocos requer um TomasuloSimulator de busca direta")
+        if (simulator.loop_accelerator is not None or simulator.history is not None
+                or simulator.breakpoints is not None):
+            raise ValueError("O cache de blocos não pode ser combinado com aceleração de laços, "
+                             "histórico ou breakpoints")
+        if simulator.scheduler == 'random':
+            raise ValueError("O cache de blocos requer uma política de escalonamento determinística")
+        self.simulator = simulator
+        self.max_entries = max_entries
+        self._entries = OrderedDict()
+        self.hits = 0
+        self.misses = 0
+        # Chave do estado ao fim do último bloco, válida enquanto o simulador não mudar por fora
+        self._next_key = None
+        # Valores em voo ainda não recalculados após acertos consecutivos
+        self._stale_values = False
+
+    def __len__(self):
+        return len(self._entries)
+
+    @property
+    def hit_rate(self) -> float:
+        """Fração dos blocos servidos pelo cache"""
+        total = self.hits + self.misses
+        return self.hits / total if total > 0 else 0.0
+
+    def clear(self):
+        """Descarta os blocos memorizados e zera as estatísticas"""
+        self._entries.clear()
+        self.hits = 0
+        self.misses = 0
+        self._next_key = None
+
+    def step_block(self) -> bool:
+        """Executa um bloco (do cache ou ciclo a ciclo); retorna False ao terminar"""
+        running = self._step_block()
+        self._refresh_values()
+        return running
+
+    def run_until_complete(self, max_cycles: int = None):
+        """Executa até o fim (ou até passar de max_cycles, ao fim de um bloco)"""
+        sim = self.simulator
+        while not sim.finished:
+            if max_cycles is not None and sim.current_cycle >= max_cycles:
+                break
+            self._step_block()
+        self._refresh_values()
+
+    def _step_block(self) -> bool:
+        sim = self.simulator
+        if sim.finished:
+            return False
+
+        start_pc = self._start_pc()
+        state_key = self._current_state_key()
+        outcome, lookahead, committed = self._next_branch_outcome(start_pc)
+        key = (start_pc, state_key, outcome)
+        block = self._entries.get(key)
+        if block is not None:
+            self._entries.move_to_end(key)
+            self.hits += 1
+            self._apply(block, start_pc, lookahead, committed)
+        else:
+            self.misses += 1
+            block = self._record()
+            self._entries[key] = block
+            if len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+        self._next_key = (self._fingerprint(), block[-1])
+        return not sim.finished
+
+    # Chave
+
+    def _start_pc(self) -> int:
+        """PC da próxima instrução a fazer commit"""
+        sim = self.simulator
+        head = sim.rob[sim.rob_head]
+        return head.instruction.pc if head.busy else sim.pc
+
+    def _next_branch_outcome(self, start_pc: int):
+        """
+        Executa funcionalmente até o próximo desvio condicional (inclusive)
+
+        Returns:
+            (direção do desvio ou None, simulador funcional, instruções executadas);
+            as escritas em memória ficam no primeiro mapa de um ChainMap
+        """
+        sim = self.simulator
+        functional = FunctionalSimulator(sim.instructions, sim.registers)
+        functional.memory = ChainMap({}, sim.memory)
+        functional.pc = start_pc
+        instructions = sim.instructions
+        step = functional.step
+        for executed in range(1, self.MAX_BLOCK_CYCLES + 1):
+            inst_pc = functional.pc
+            record = step()
+            if record is None:
+                return None, functional, executed - 1
+            if instructions[inst_pc].type in CONDITIONAL_BRANCHES:
+                return record[1], functional, executed
+        return None, functional, self.MAX_BLOCK_CYCLES
+
+    def _fingerprint(self) -> tuple:
+        """Identifica o ponto da simulação para validar a chave guardada"""
+        sim = self.simulator
+        metrics = sim.metrics
+        return (id(sim.instructions), sim.current_cycle, metrics.instructions_issued,
+                metrics.instructions_completed, sim.pc, sim.rob_head, sim.rob_tail)
+
+    def _current_state_key(self) -> tuple:
+        if self._next_key is not None and self._next_key[0] == self._fingerprint():
+            return self._next_key[1]
+        return self._state_key()
+
+    def _state_key(self) -> tuple:
+        sim = self.simulator
+        cycle = sim.current_cycle
+        in_flight = {entry.instruction.pc for entry in sim.rob if entry.busy}
+        return (
+            self._control(),
+            tuple(self._masked_rs(rs) for rs in sim._all_rs()),
+            tuple(self._masked_rob(entry) for entry in sim.rob),
+            tuple(sorted(sim.register_status.reorder.items())),
+            tuple(sorted(sim.branch_predictor.table.items())),
+            tuple((pc, self._relative(sim._inst_state(sim.instructions[pc]), cycle))
+                  for pc in sorted(in_flight)),
+        )
+
+    def _control(self) -> tuple:
+        sim = self.simulator
+        return (sim.rob_head, sim.rob_tail, sim.pc, sim.finished,
+                sim.speculating, sim.speculation_rob)
+
+    @staticmethod
+    def _masked_rs(rs) -> tuple:
+        """Estado da RS com os valores substituídos por sua presença"""
+        return (rs.busy, rs.vj is not None, rs.vk is not None, rs.qj, rs.qk,
+                rs.dest, rs.address is not None,
+                rs.instruction.pc if rs.instruction else None, rs.cycles_remaining)
+
+    @staticmethod
+    def _masked_rob(entry) -> tuple:
+        """Estado da entrada do ROB com os valores substituídos por sua presença"""
+        return (entry.busy, entry.instruction.pc if entry.instruction else None,
+                entry.state, entry.dest, entry.value is not None, entry.address is not None,
+                entry.ready, entry.speculative, entry.branch_predicted,
+                entry.branch_actual is not None)
+
+    @staticmethod
+    def _relative(state: tuple, cycle: int) -> tuple:
+        """Estado de instrução com os ciclos relativos a `cycle`"""
+        stage, *cycles, rob_entry, rs_entry = state
+        return (stage, *(c - cycle if c is not None else None for c in cycles),
+                rob_entry, rs_entry)
+
+    # Gravação e aplicação de blocos
+
+    def _record(self) -> tuple:
+        """Simula um bloco ciclo a ciclo e retorna seu efeito"""
+        self._refresh_values()
+        sim = self.simulator
+        bp = sim.branch_predictor
+        start_cycle = sim.current_cycle
+        metrics = dict(vars(sim.metrics))
+        predictions, correct = bp.predictions, bp.correct_predictions
+        table = dict(bp.table)
+        insts = [sim._inst_state(inst) for inst in sim.instructions]
+        rs_before = [self._masked_rs(rs) for rs in sim._all_rs()]
+        rob_before = [self._masked_rob(entry) for entry in sim.rob]
+
+        while True:
+            sim._step_cycle()
+            sim._check_progress()
+            if (sim.finished or bp.predictions != predictions
+                    or sim.current_cycle - start_cycle >= self.MAX_BLOCK_CYCLES):
+                break
+
+        changed = tuple(
+            (pc, self._relative(sim._inst_state(inst), start_cycle))
+            for pc, inst in enumerate(sim.instructions)
+            if sim._inst_state(inst) != insts[pc]
+        )
+        rs_after = [self._masked_rs(rs) for rs in sim._all_rs()]
+        rob_after = [self._masked_rob(entry) for entry in sim.rob]
+        return (
+            sim.current_cycle - start_cycle,
+            self._control(),
+            tuple((i, state) for i, state in enumerate(rs_after) if state != rs_before[i]),
+            tuple((i, state) for i, state in enumerate(rob_after) if state != rob_before[i]),
+            dict(sim.register_status.reorder),
+            {pc: counter for pc, counter in bp.table.items() if table.get(pc, MISSING) != counter},
+            (bp.predictions - predictions, bp.correct_predictions - correct),
+            {name: value - metrics[name] for name, value in vars(sim.metrics).items()},
+            changed,
+            self._state_key(),
+        )
+
+    def _apply(self, block: tuple, start_pc: int, lookahead: FunctionalSimulator, executed: int):
+        """Aplica um bloco memorizado ao simulador"""
+        sim = self.simulator
+        (cycles, control, rs_changes, rob_changes, status, table_changes,
+         predictor_deltas, metric_deltas, changed, _) = block
+        start_cycle = sim.current_cycle
+
+        # Estado arquitetural: as instruções que fizeram commit são, em geral,
+        # exatamente as já executadas pela busca da direção do desvio
+        committed = metric_deltas['instructions_completed']
+        if committed == executed:
+            sim.registers = lookahead.registers
+            sim.memory.update(lookahead.memory.maps[0])
+        else:
+            functional = FunctionalSimulator(sim.instructions)
+            functional.registers = sim.registers
+            functional.memory = sim.memory
+            functional.pc = start_pc
+            functional.run(committed)
+
+        # Estado estrutural (apenas as entradas alteradas pelo bloco)
+        all_rs = sim._all_rs()
+        for i, state in rs_changes:
+            rs = all_rs[i]
+            (rs.busy, has_vj, has_vk, rs.qj, rs.qk, rs.dest, has_address,
+             inst_pc, rs.cycles_remaining) = state
+            rs.vj = 0 if has_vj else None
+            rs.vk = 0 if has_vk else None
+            rs.address = 0 if has_address else None
+            rs.instruction = sim.instructions[inst_pc] if inst_pc is not None else None
+            rs.op = rs.instruction.type if rs.instruction else None
+        for i, state in rob_changes:
+            entry = sim.rob[i]
+            (entry.busy, inst_pc, entry.state, entry.dest, has_value, has_address,
+             entry.ready, entry.speculative, entry.branch_predicted, has_actual) = state
+            entry.value = 0 if has_value else None
+            entry.address = 0 if has_address else None
+            entry.branch_actual = False if has_actual else None
+            entry.instruction = sim.instructions[inst_pc] if inst_pc is not None else None
+        (sim.rob_head, sim.rob_tail, sim.pc, sim.finished,
+         sim.speculating, sim.speculation_rob) = control
+        sim.current_cycle = start_cycle + cycles
+        sim.register_status.reorder = dict(status)
+        sim._rebuild_ready_queues()
+
+        bp = sim.branch_predictor
+        bp.table.update(table_changes)
+        bp.predictions += predictor_deltas[0]
+        bp.correct_predictions += predictor_deltas[1]
+        for name, delta in metric_deltas.items():
+            setattr(sim.metrics, name, getattr(sim.metrics, name) + delta)
+
+        for pc, state in changed:
+            stage, *rel_cycles, rob_entry, rs_entry = state
+            sim._set_inst_state(sim.instructions[pc], (
+                stage, *(c + start_cycle if c is not None else None for c in rel_cycles),
+                rob_entry, rs_entry))
+
+        # Os valores em voo não influenciam os próximos blocos: são recalculados
+        # apenas quando alguém precisar deles
+        self._stale_values = True
+        if sim.versions is not None:
+            sim.versions.invalidate()
+
+    def _refresh_values(self):
+        """Recalcula os valores em voo avaliando o ROB em ordem de programa"""
+        if not self._stale_values:
+            return
+        self._stale_values = False
+        sim = self.simulator
+        functional = FunctionalSimulator(sim.instructions, sim.registers)
+        functional.memory = ChainMap({}, sim.memory)
+        regs = functional.registers
+        stations = {rs.dest: rs for rs in sim._all_rs() if rs.busy}
+
+        idx = sim.rob_head
+        for _ in range(sim.rob_size):
+            entry = sim.rob[idx]
+            if not entry.busy:
+                break
+            inst = entry.instruction
+            src1, src2 = regs.get(inst.src1, 0), regs.get(inst.src2, 0)
+            functional.pc = inst.pc
+            _, taken, address, value = functional.step()
+
+            if entry.value is not None:
+                entry.value = value
+            if entry.address is not None:
+                entry.address = address
+            if entry.branch_actual is not None:
+                entry.branch_actual = taken
+            rs = stations.get(idx)
+            if rs is not None:
+                if rs.vj is not None:
+                    rs.vj = src1
+                if rs.vk is not None:
+                    rs.vk = src2
+                if rs.address is not None:
+                    rs.address = address
+            idx = (idx + 1) % sim.rob_size
@@ -0,0 +1,197 @@
+"""
+Breakpoints e watchpoints para simulações longas
+
+Um `BreakpointSet` (ver `TomasuloSimulator.enable_breakpoints`) guarda os
+breakpoints já compilados em tabelas por tipo de evento: PCs de issue e de
+commit, registradores, endereços de memória, ROB cheio, misprediction e o
+próximo ciclo-alvo. Cada estágio do simulador consulta apenas a tabela do
+seu evento (uma busca em dicionário), e o ciclo é comparado só com o
+próximo alvo, sem avaliar condições arbitrárias a cada ciclo. O motor
+compilado gera o código das verificações apenas para os tipos em uso.
+
+Os eventos atingidos durante um ciclo ficam em `hits`; `run_to_breakpoint`,
+o fluxo de estados e a interface param no fim desse ciclo.
+
+Exemplo:
+    breakpoints = simulator.enable_breakpoints()
+    breakpoints.add('commit', 12)
+    breakpoints.add(parse_breakpoint('mem 200'))
+    hits = simulator.run_to_breakpoint()
+"""
+import bisect
+from typing import Dict, List, NamedTuple, Optional, Union
+
+
+# Tipos de breakpoint e se exigem um alvo
+KINDS = {
+    'cycle': True,       # Ciclo atingido
+    'issue': True,       # Instrução do PC despachada
+    'commit': True,      # Instrução do PC efetivada
+    'register': True,    # Escrita (commit) no registrador
+    'memory': True,      # Escrita (commit de store) no endereço
+    'rob_full': False,   # ROB cheio passa a bloquear o despacho (uma vez por período)
+    'mispredict': False, # Predição de desvio errada
+}
+
+# Nomes curtos aceitos por parse_breakpoint
+ALIASES = {
+    'ciclo': 'cycle',
+    'pc': 'issue',
+    'reg': 'register',
+    'mem': 'memory',
+    'rob': 'rob_full',
+    'rob_cheio': 'rob_full',
+    'misprediction': 'mispredict',
+}
+
+DESCRIPTIONS = {
+    'cycle': 'ciclo {}',
+    'issue': 'issue do PC {}',
+    'commit': 'commit do PC {}',
+    'register': 'escrita em {}',
+    'memory': 'escrita em Mem[{}]',
+    'rob_full': 'ROB cheio',
+    'mispredict': 'misprediction',
+}
+
+
+class Breakpoint(NamedTuple):
+    """Condição de parada: tipo (ver KINDS) e alvo (ciclo, PC, registrador ou endereço)"""
+    kind: str
+    target: Optional[Union[int, str]] = None
+
+    def __str__(self):
+        return DESCRIPTIONS[self.kind].format(self.target)
+
+
+class BreakpointHit(NamedTuple):
+    """Breakpoint atingido: ciclo e valor associado (PC, valor escrito...)"""
+    breakpoint: Breakpoint
+    cycle: int
+    value: Optional[int] = None
+
+    def __str__(self):
+        text = f'{self.breakpoint} no ciclo {self.cycle}'
+        if self.breakpoint.kind in ('register', 'memory'):
+            text += f' (valor {self.value})'
+        return text
+
+
+def make_breakpoint(kind: str, target=None) -> Breakpoint:
+    """Valida e normaliza um breakpoint (registradores em maiúsculas, alvos inteiros)"""
+    kind = ALIASES.get(kind, kind)
+    if kind not in KINDS:
+        raise ValueError(f"Tipo de breakpoint desconhecido: {kind}")
+    if not KINDS[kind]:
+        if target is not None:
+            raise ValueError(f"Breakpoint '{kind}' não aceita alvo")
+        return Breakpoint(kind)
+    if target is None:
+        raise ValueError(f"Breakpoint '{kind}' exige um alvo")
+    if kind == 'register':
+        target = str(target).upper()
+        if not (target[:1] == 'R' and target[1:].isdigit() and int(target[1:]) < 32):
+            raise ValueError(f"Registrador inválido: {target}")
+        return Breakpoint(kind, target)
+    try:
+        target = int(target)
+    except ValueError:
+        raise ValueError(f"Alvo inválido para '{kind}': {target}") from None
+    if target < 0:
+        raise ValueError(f"Alvo inválido para '{kind}': {target}")
+    return Breakpoint(kind, target)
+
+
+def parse_breakpoint(text: str) -> Breakpoint:
+    """
+    Lê um breakpoint em texto: 'cycle 2000000', 'issue 4', 'commit 12',
+    'reg R4', 'mem 200', 'rob_full', 'mispredict' (e os nomes de ALIASES)
+    """
+    parts = text.split()
+    if not parts or len(parts) > 2:
+        raise ValueError(f"Breakpoint inválido: '{text}'")
+    return make_breakpoint(parts[0].lower(), parts[1] if len(parts) == 2 else None)
+
+
+def parse_breakpoints(text: str) -> List[Breakpoint]:
+    """Lê breakpoints separados por vírgula ou ponto e vírgula"""
+    specs = text.replace(';', ',').split(',')
+    return [parse_breakpoint(spec) for spec in specs if spec.strip()]
+
+
+class BreakpointSet:
+    """Breakpoints de um simulador, compilados em tabelas por evento"""
+
+    def __init__(self, simulator):
+        self.simulator = simulator
+        self._breakpoints: List[Breakpoint] = []
+        self.hits: List[BreakpointHit] = []  # Eventos atingidos desde a última parada
+        self.rob_stalled = False  # Despacho bloqueado por ROB cheio no último ciclo
+        self._compile()
+
+    def __iter__(self):
+        return iter(self._breakpoints)
+
+    def __len__(self):
+        return len(self._breakpoints)
+
+    def __contains__(self, breakpoint: Breakpoint):
+        return breakpoint in self._breakpoints
+
+    def add(self, kind: Union[str, Breakpoint], target=None) -> Breakpoint:
+        """Adiciona um breakpoint (ignorado se já existir)"""
+        breakpoint = make_breakpoint(*kind) if isinstance(kind, Breakpoint) else make_breakpoint(kind, target)
+        if breakpoint not in self._breakpoints:
+            self._breakpoints.append(breakpoint)
+            self._compile()
+        return breakpoint
+
+    def remove(self, breakpoint: Breakpoint):
+        """Remove um breakpoint"""
+        self._breakpoints.remove(breakpoint)
+        self._compile()
+
+    def replace(self, breakpoints):
+        """Substitui todos os breakpoints (ex.: pela lista editada na interface)"""
+        self._breakpoints = []
+        for breakpoint in breakpoints:
+            breakpoint = make_breakpoint(*breakpoint)
+            if breakpoint not in self._breakpoints:
+                self._breakpoints.append(breakpoint)
+        self._compile()
+
+    def clear(self):
+        """Remove todos os breakpoints"""
+        self.replace([])
+
+    def _compile(self):
+        """Reconstrói as tabelas por evento consultadas pelos estágios do simulador"""
+        tables: Dict[str, dict] = {kind: {} for kind in KINDS}
+        for breakpoint in self._breakpoints:
+            tables[breakpoint.kind][breakpoint.target] = breakpoint
+        self.issue = tables['issue']
+        self.commit = tables['commit']
+        self.registers = tables['register']
+        self.memory = tables['memory']
+        self.rob_full = tables['rob_full'].get(None)
+        self.mispredict = tables['mispredict'].get(None)
+        self._cycles = tables['cycle']
+        self._cycle_list = sorted(self._cycles)
+        self.rewind()
+        self.simulator._breakpoints_changed()
+
+    def rewind(self):
+        """Recalcula o próximo ciclo-alvo (após reset, step_back ou restauração)"""
+        index = bisect.bisect_right(self._cycle_list, self.simulator.current_cycle)
+        self.next_cycle = self._cycle_list[index] if index < len(self._cycle_list) else float('inf')
+
+    def cycle_reached(self):
+        """O simulador chegou (ou passou) do próximo ciclo-alvo"""
+        cycle = self.simulator.current_cycle
+        if cycle == self.next_cycle:
+            self.hit(self._cycles[cycle])
+        self.rewind()
+
+    def hit(self, breakpoint: Breakpoint, value: Optional[int] = None):
+        """Registra um evento atingido no ciclo atual"""
+        self.hits.append(BreakpointHit(breakpoint, self.simulator.current_cycle, value))
@@ -0,0 +1,71 @@
+"""
+Checkpoints periódicos e navegação para qualquer ciclo da simulação
+"""
+import bisect
+from typing import Dict, List
+from src.core.simulator import TomasuloSimulator
+
+
+class CheckpointManager:
+    """Mantém checkpoints periódicos de um simulador
+
+    Um checkpoint é gravado a cada `interval` ciclos durante run_until_complete;
+    goto_cycle restaura o checkpoint mais próximo (anterior ou igual) ao ciclo
+    pedido e avança ciclo a ciclo a partir dele.
+    """
+
+    def __init__(self, simulator: TomasuloSimulator, interval: int = 10000,
+                 max_checkpoints: int = None):
+        self.simulator = simulator
+        self.interval = interval
+        self.max_checkpoints = max_checkpoints
+        self.checkpoints: Dict[int, bytes] = {}
+        self._cycles: List[int] = []
+        self.take()
+
+    def take(self):
+        """Grava um checkpoint do ciclo atual"""
+        cycle = self.simulator.current_cycle
+        if cycle not in self.checkpoints:
+            bisect.insort(self._cycles, cycle)
+        self.checkpoints[cycle] = self.simulator.save_checkpoint()
+
+        # Descartar checkpoints intermediários, preservando o primeiro (ciclo inicial)
+        if self.max_checkpoints is not None:
+            while len(self._cycles) > max(self.max_checkpoints, 2):
+                del self.checkpoints[self._cycles.pop(1)]
+
+    def step(self) -> bool:
+        """Executa um ciclo, gravando checkpoint quando o intervalo é atingido"""
+        simulator = self.simulator
+        cycle = simulator.current_cycle
+        running = simulator.step()
+        # Simulação terminada: step não avança o ciclo e não há o que gravar
+        if simulator.current_cycle != cycle and simulator.current_cycle % self.interval == 0:
+            self.take()
+        return running
+
+    def run_until_complete(self, max_cycles: int = None):
+        """Executa até o fim (ou até max_cycles), gravando checkpoints periódicos"""
+        simulator = self.simulator
+        while not simulator.finished:
+            if max_cycles is not None and simulator.current_cycle >= max_cycles:
+                break
+            self.step()
+
+    def nearest(self, cycle: int) -> int:
+        """Ciclo do checkpoint mais recente que não ultrapassa `cycle`"""
+        index = bisect.bisect_right(self._cycles, cycle) - 1
+        if index < 0:
+            raise ValueError(f"Nenhum checkpoint anterior ao ciclo {cycle}")
+        return self._cycles[index]
+
+    def goto_cycle(self, cycle: int):
+        """Leva o simulador ao ciclo pedido"""
+        simulator = self.simulator
+        start = self.nearest(cycle)
+        # Avançar a partir do estado atual é mais barato se ele estiver mais perto
+        if not start <= simulator.current_cycle <= cycle:
+            simulator.load_checkpoint(self.checkpoints[start])
+        while simulator.current_cycle < cycle and not simulator.finished:
+            self.step()
@@ -0,0 +1,451 @@
+"""
+Motor compilado: função de ciclo especializada por configuração e programa
+
+`CompiledSimulator` gera, ao carregar o programa, o código-fonte de uma
+função de ciclo específica para a configuração: os laços sobre as
+reservation stations e o ROB são desenrolados (cada estação vira uma
+variável da closure), tamanhos e latências entram como constantes e cada
+instrução estática recebe closures de despacho e de execução já
+especializadas para seu opcode, registradores e imediato.
+
+O resultado é idêntico ciclo a ciclo ao do TomasuloSimulator. Quando algum
+recurso que depende dos ganchos genéricos está ativo (histórico, receptores
+de temporização, aceleração de laços, estatísticas por intervalo, versões),
+o ciclo genérico é usado. Breakpoints são compilados na própria função: a
+cada mudança do conjunto, ela é gerada de novo com as verificações apenas
+dos tipos em uso.
+"""
+from typing import List, Callable
+from src.core.structures import Instruction, InstructionType, InstructionStage
+from src.core.simulator import TomasuloSimulator
+
+
+# Tipos de commit por instrução estática
+COMMIT_OTHER, COMMIT_REGISTER, COMMIT_STORE, COMMIT_BRANCH = range(4)
+
+REGISTER_WRITERS = (InstructionType.ADD, InstructionType.SUB, InstructionType.MUL,
+                    InstructionType.DIV, InstructionType.ADDI, InstructionType.LW)
+
+BRANCHES = (InstructionType.BEQ, InstructionType.BNE)
+
+
+class CompiledSimulator(TomasuloSimulator):
+    """TomasuloSimulator com a função de ciclo gerada para a configuração"""
+
+    def __init__(self, config=None):
+        super().__init__(config)
+        self._compiled_step = None
+        self.compiled_source = None  # Código gerado (para inspeção)
+
+    def load_program(self, instructions: List[Instruction]):
+        super().load_program(instructions)
+        self._compiled_step, self.compiled_source = compile_step(self)
+
+    def _breakpoints_changed(self):
+        if self._compiled_step is not None:
+            self._compiled_step, self.compiled_source = compile_step(self)
+
+    def _step_cycle(self):
+        if (self._compiled_step is None or self._undo_log is not None or self.timing_listeners
+                or self.loop_accelerator is not None or self.interval_stats is not None
+                or self.versions is not None):
+            return super()._step_cycle()
+        return self._compiled_step()
+
+
+def compile_step(sim: TomasuloSimulator):
+    """
+    Gera a função de ciclo especializada de um simulador já carregado
+
+    Returns:
+        (função sem argumentos que executa um ciclo, código-fonte gerado)
+    """
+    all_rs = sim._all_rs()
+    rob_size = sim.rob_size
+    # Próxima entrada circular do ROB, pré-calculada
+    next_entry = tuple((i + 1) % rob_size for i in range(rob_size))
+    commit_kinds = [_commit_kind(inst) for inst in sim.instructions]
+    backward = [inst.target is not None and inst.target <= inst.pc for inst in sim.instructions]
+    # Breakpoints em uso (ver BreakpointSet): só geram código os tipos presentes
+    brk = sim.breakpoints
+    brk_issue = brk.issue if brk is not None else {}
+    brk_commit = brk.commit if brk is not None else {}
+    brk_registers = brk.registers if brk is not None else {}
+    brk_memory = brk.memory if brk is not None else {}
+    brk_rob_full = brk is not None and brk.rob_full is not None
+    brk_mispredict = brk is not None and brk.mispredict is not None
+    issue_fns = [_issue_closure(sim, inst, next_entry, brk_issue.get(inst.pc))
+                 for inst in sim.instructions]
+    exec_fns = [_exec_closure(sim, inst, next_entry) for inst in sim.instructions]
+
+    rs_names = [f'rs{i}' for i in range(len(all_rs))]
+    rob_names = [f'e{i}' for i in range(rob_size)]
+    queue_names = {op_type: f'q_{op_type}' for op_type in sim._ready_queues}
+
+    lines = []
+
+    def emit(indent: int, text: str):
+        lines.append('    ' * indent + text)
+
+    emit(0, f"def _make(sim, rob, next_entry, commit_kinds, backward, issue_fns, exec_fns, "
+            f"bp_update, bp_record, brk, brk_commit, brk_registers, brk_memory, SW, EXECUTING, WRITE_RESULT, COMMIT, "
+            f"{', '.join(rs_names)}, {', '.join(rob_names)}, {', '.join(queue_names.values())}):")
+    emit(1, "def step():")
+    emit(2, "if sim.finished:")
+    emit(3, "return False")
+    emit(2, "cycle = sim.current_cycle + 1")
+    emit(2, "sim.current_cycle = cycle")
+    emit(2, "metrics = sim.metrics")
+    emit(2, "metrics.total_cycles += 1")
+    emit(2, "active = False")
+    emit(2, "sim._back_edge = False")
+
+    # 1. Commit
+    emit(2, "head = sim.rob_head")
+    emit(2, "e = rob[head]")
+    emit(2, "if e.busy and e.state == 'Commit':")
+    emit(3, "active = True")
+    emit(3, "inst = e.instruction")
+    emit(3, "pc = inst.pc")
+    emit(3, "kind = commit_kinds[pc]")
+    emit(3, f"if kind == {COMMIT_BRANCH}:")
+    emit(4, "taken = e.branch_actual")
+    emit(4, "correct = e.branch_predicted == taken")
+    emit(4, "bp_update(pc, taken)")
+    emit(4, "bp_record(correct)")
+    emit(4, "if not correct:")
+    emit(5, "metrics.branch_mispredictions += 1")
+    if brk_mispredict:
+        emit(5, "brk.hit(brk.mispredict, pc)")
+    emit(5, "sim._flush_speculative_instructions(e)")
+    emit(5, "sim.pc = inst.target if taken and inst.target is not None else pc + 1")
+    emit(4, "if taken and backward[pc]:")
+    emit(5, "sim._back_edge = True")
+    emit(3, f"elif kind == {COMMIT_REGISTER}:")
+    emit(4, "dest = e.dest")
+    emit(4, "if dest:")
+    emit(5, "sim.registers[dest] = e.value")
+    if brk_registers:
+        emit(5, "if dest in brk_registers:")
+        emit(6, "brk.hit(brk_registers[dest], e.value)")
+    emit(5, "reorder = sim.register_status.reorder")
+    emit(5, "if reorder.get(dest) == head:")
+    emit(6, "del reorder[dest]")
+    emit(3, f"elif kind == {COMMIT_STORE}:")
+    emit(4, "if e.address is not None:")
+    emit(5, "sim.memory[e.address] = e.value")
+    if brk_memory:
+        emit(5, "if e.address in brk_memory:")
+        emit(6, "brk.hit(brk_memory[e.address], e.value)")
+    emit(3, "elif backward[pc]:")
+    emit(4, "sim._back_edge = True")
+    emit(3, "inst.commit_cycle = cycle")
+    emit(3, "inst.stage = COMMIT")
+    if brk_commit:
+        emit(3, "if pc in brk_commit:")
+        emit(4, "brk.hit(brk_commit[pc], pc)")
+    emit(3, "e.clear()")
+    emit(3, "sim.rob_head = next_entry[head]")
+    emit(3, f"if kind == {COMMIT_BRANCH}:")
+    emit(4, "sim._update_speculation()")
+    emit(3, "metrics.instructions_completed += 1")
+    emit(2, "else:")
+    emit(3, "metrics.bubble_cycles += 1")
+
+    # 2. Write Result: estações e broadcast desenrolados
+    for i, rs in enumerate(all_rs):
+        name = rs_names[i]
+        emit(2, f"# {rs.name}")
+        emit(2, f"if {name}.busy:")
+        emit(3, f"d = {name}.dest")
+        emit(3, "e = rob[d]")
+        emit(3, "if e.ready and e.state == 'Write':")
+        emit(4, "v = e.value")
+        for j, other in enumerate(all_rs):
+            if j == i:
+                continue  # Uma estação que executou não espera operandos
+            other_name = rs_names[j]
+            emit(4, f"if {other_name}.busy:")
+            emit(5, "hit = False")
+            emit(5, f"if {other_name}.qj == d:")
+            emit(6, f"{other_name}.vj = v")
+            emit(6, f"{other_name}.qj = None")
+            emit(6, "hit = True")
+            emit(5, f"if {other_name}.qk == d:")
+            emit(6, f"{other_name}.vk = v")
+            emit(6, f"{other_name}.qk = None")
+            emit(6, "hit = True")
+            emit(5, f"if hit and {other_name}.qj is None and {other_name}.qk is None:")
+            emit(6, f"{queue_names[other.op_type]}[{other.name!r}] = {other_name}")
+        emit(4, "e.state = 'Commit'")
+        emit(4, "active = True")
+        emit(4, f"inst = {name}.instruction")
+        emit(4, "inst.write_cycle = cycle")
+        emit(4, "inst.stage = WRITE_RESULT")
+        emit(4, f"{name}.clear()")
+
+    # 3. Execute, por classe na ordem das filas de prontas
+    for op_type, queue_name in queue_names.items():
+        units = sim.functional_units[op_type]
+        emit(2, f"if {queue_name}:")
+        if units is None:
+            emit(3, f"for rs in list({queue_name}.values()):")
+        else:
+            emit(3, f"for rs in sim._select_ready({op_type!r}, {queue_name}):")
+        emit(4, "if rs.cycles_remaining > 0:")
+        emit(5, "rs.cycles_remaining -= 1")
+        emit(5, "active = True")
+        emit(5, "inst = rs.instruction")
+        emit(5, "inst.stage = EXECUTING")
+        emit(5, "if inst.exec_start_cycle is None:")
+        emit(6, "inst.exec_start_cycle = cycle")
+        emit(4, "if rs.cycles_remaining == 0:")
+        if op_type == 'Load':
+            # Loads esperam stores mais antigos sem endereço/valor
+            emit(5, "d = rs.dest")
+            emit(5, "idx = sim.rob_head")
+            emit(5, "while idx != d:")
+            emit(6, "x = rob[idx]")
+            emit(6, "if x.busy and x.instruction.type is SW and not x.ready:")
+            emit(7, "break")
+            emit(6, "idx = next_entry[idx]")
+            emit(5, "if idx != d:")
+            emit(6, "continue")
+        emit(5, "inst = rs.instruction")
+        emit(5, "exec_fns[inst.pc](rs)")
+        emit(5, f"del {queue_name}[rs.name]")
+        emit(5, "active = True")
+        emit(5, "inst.exec_end_cycle = cycle")
+
+    # 4. Issue
+    program_size = len(sim.instructions)
+    emit(2, "e = rob[sim.rob_tail]")
+    emit(2, "if e.busy:")
+    emit(3, f"if sim.pc < {program_size}:")
+    emit(4, "metrics.rob_full_cycles += 1")
+    if brk_rob_full:
+        # Só na transição para ROB cheio (ver TomasuloSimulator._issue_stage)
+        emit(4, "if not brk.rob_stalled:")
+        emit(5, "brk.hit(brk.rob_full, sim.pc)")
+        emit(4, "brk.rob_stalled = True")
+        emit(2, "else:")
+        emit(3, "brk.rob_stalled = False")
+        emit(3, f"if sim.pc < {program_size}:")
+        emit(4, "issue_fns[sim.pc](e, cycle, metrics)")
+    else:
+        emit(2, f"elif sim.pc < {program_size}:")
+        emit(3, "issue_fns[sim.pc](e, cycle, metrics)")
+
+    emit(2, "sim._active = active")
+    emit(2, "sim.idle_cycles = 0 if active else sim.idle_cycles + 1")
+    busy = ' or '.join(f'{name}.busy' for name in rob_names)
+    emit(2, f"if sim.pc >= {program_size} and not ({busy}):")
+    emit(3, "sim.finished = True")
+    emit(3, "return False")
+    emit(2, "return True")
+    emit(1, "return step")
+
+    source = '\n'.join(lines) + '\n'
+    namespace = {}
+    exec(compile(source, f'<tomasulo-step {sim.rob_size}x{len(all_rs)}>', 'exec'), namespace)
+    step = namespace['_make'](
+        sim, sim.rob, next_entry, commit_kinds, backward, issue_fns, exec_fns,
+        sim.branch_predictor.update, sim.branch_predictor.record_prediction,
+        brk, brk_commit, brk_registers, brk_memory, InstructionType.SW, InstructionStage.EXECUTING,
+        InstructionStage.WRITE_RESULT, InstructionStage.COMMIT,
+        *all_rs, *sim.rob, *sim._ready_queues.values())
+    return step, source
+
+
+def _commit_kind(inst: Instruction) -> int:
+    if inst.type in BRANCHES:
+        return COMMIT_BRANCH
+    if inst.type in REGISTER_WRITERS:
+        return COMMIT_REGISTER
+    if inst.type == InstructionType.SW:
+        return COMMIT_STORE
+    return COMMIT_OTHER
+
+
+def _issue_closure(sim: TomasuloSimulator, inst: Instruction, next_entry: tuple,
+                   breakpoint=None) -> Callable:
+    """Despacho especializado de uma instrução estática (com seu breakpoint de issue, se houver)"""
+    inst_type = inst.type
+    pool = tuple(sim._rs_pool(inst_type)) if inst_type not in (InstructionType.J, InstructionType.NOP) else None
+    queue = sim._ready_queues[pool[0].op_type] if pool else None
+    latency = sim.latencies.get(inst_type, 1)
+    rob = sim.rob
+    predict = sim.branch_predictor.predict
+    src1, src2 = inst.src1, inst.src2
+    pc = inst.pc
+    if inst_type in REGISTER_WRITERS:
+        dest = inst.dest
+    elif inst_type == InstructionType.SW:
+        dest = f"Mem[{inst.offset}]"
+    else:
+        dest = None
+    renames = bool(dest) and inst_type != InstructionType.SW
+    is_branch = inst_type in BRANCHES
+    taken_pc = inst.target if inst.target is not None else pc + 1
+    if inst_type == InstructionType.J:
+        next_pc = taken_pc
+    else:
+        next_pc = pc + 1
+    ISSUED = InstructionStage.ISSUED
+
+    def issue(e, cycle, metrics):
+        rs = None
+        if pool is not None:
+            for rs in pool:
+                if not rs.busy:
+                    break
+            else:
+                metrics.stall_cycles += 1
+                return
+        tail = e.entry_id
+        sim.rob_tail = next_entry[tail]
+        e.busy = True
+        e.instruction = inst
+        e.state = "Issue"
+        if sim.speculating:
+            e.speculative = True
+        e.dest = dest
+
+        if rs is not None:
+            rs.busy = True
+            rs.op = inst_type
+            rs.dest = tail
+            rs.instruction = inst
+            rs.cycles_remaining = latency
+            reorder = sim.register_status.reorder
+            if src1:
+                producer = reorder.get(src1)
+                if producer is None:
+                    rs.vj = sim.registers.get(src1, 0)
+                elif rob[producer].ready:
+                    rs.vj = rob[producer].value
+                else:
+                    rs.qj = producer
+            if src2:
+                producer = reorder.get(src2)
+                if producer is None:
+                    rs.vk = sim.registers.get(src2, 0)
+                elif rob[producer].ready:
+                    rs.vk = rob[producer].value
+                else:
+                    rs.qk = producer
+            if rs.qj is None and rs.qk is None:
+                queue[rs.name] = rs
+            inst.rs_entry = rs.name
+        else:
+            e.ready = True
+            e.state = "Commit"
+            inst.rs_entry = None
+
+        if renames:
+            sim.register_status.reorder[dest] = tail
+
+        inst.issue_cycle = cycle
+        inst.exec_start_cycle = None
+        inst.exec_end_cycle = None
+        inst.write_cycle = None
+        inst.commit_cycle = None
+        inst.stage = ISSUED
+        inst.rob_entry = tail
+        if breakpoint is not None:
+            sim.breakpoints.hit(breakpoint, pc)
+
+        if is_branch:
+            predicted = predict(pc)
+            e.branch_predicted = predicted
+            if not sim.speculating:
+                sim.speculating = True
+                sim.speculation_rob = tail
+            sim.pc = taken_pc if predicted else pc + 1
+        else:
+            sim.pc = next_pc
+        metrics.instructions_issued += 1
+
+    return issue
+
+
+def _exec_closure(sim: TomasuloSimulator, inst: Instruction, next_entry: tuple) -> Callable:
+    """Fim de execução especializado de uma instrução estática (ver _execute_operation)"""
+    rob = sim.rob
+    inst_type = inst.type
+    immediate = inst.immediate
+    offset = inst.offset
+    SW = InstructionType.SW
+
+    if inst_type == InstructionType.ADD:
+        def execute(rs):
+            e = rob[rs.dest]
+            e.value = rs.vj + rs.vk
+            e.ready = True
+            e.state = "Write"
+    elif inst_type == InstructionType.SUB:
+        def execute(rs):
+            e = rob[rs.dest]
+            e.value = rs.vj - rs.vk
+            e.ready = True
+            e.state = "Write"
+    elif inst_type == InstructionType.MUL:
+        def execute(rs):
+            e = rob[rs.dest]
+            e.value = rs.vj * rs.vk
+            e.ready = True
+            e.state = "Write"
+    elif inst_type == InstructionType.DIV:
+        def execute(rs):
+            e = rob[rs.dest]
+            e.value = rs.vj // rs.vk if rs.vk != 0 else 0
+            e.ready = True
+            e.state = "Write"
+    elif inst_type == InstructionType.ADDI:
+        def execute(rs):
+            e = rob[rs.dest]
+            e.value = rs.vj + immediate
+            e.ready = True
+            e.state = "Write"
+    elif inst_type == InstructionType.LW:
+        def execute(rs):
+            dest = rs.dest
+            e = rob[dest]
+            address = rs.vj + offset
+            rs.address = address
+            # Encaminhamento do store mais recente ao mesmo endereço
+            value = sim.memory.get(address, 0)
+            idx = sim.rob_head
+            while idx != dest:
+                x = rob[idx]
+                if x.busy and x.instruction.type is SW and x.address == address:
+                    value = x.value
+                idx = next_entry[idx]
+            e.value = value
+            e.ready = True
+            e.state = "Write"
+    elif inst_type == InstructionType.SW:
+        def execute(rs):
+            e = rob[rs.dest]
+            address = rs.vj + offset
+            rs.address = address
+            e.address = address
+            e.value = rs.vk
+            e.ready = True
+            e.state = "Write"
+    elif inst_type == InstructionType.BEQ:
+        def execute(rs):
+            e = rob[rs.dest]
+            e.branch_actual = rs.vj == rs.vk
+            e.ready = True
+            e.state = "Write"
+    elif inst_type == InstructionType.BNE:
+        def execute(rs):
+            e = rob[rs.dest]
+            e.branch_actual = rs.vj != rs.vk
+            e.ready = True
+            e.state = "Write"
+    else:
+        # J e NOP não passam por reservation stations
+        execute = None
+    return execute
@@ -0,0 +1,172 @@
+"""
+Análise de fluxo de dados: limites de desempenho antes de simular
+
+`DataflowGraph` percorre o programa funcionalmente e monta o grafo de
+dependências RAW da execução dinâmica (registradores e, para loads, o store
+mais recente ao mesmo endereço). Para uma configuração, `bound` calcula:
+
+- o caminho crítico (cada dependência custa a latência do produtor, já que o
+  consumidor executa no ciclo do broadcast, mais a escrita e o commit da
+  última instrução), que dá o IPC ideal com paralelismo ilimitado;
+- um limite inferior de ciclos para a máquina configurada: o mesmo grafo com
+  despacho e commit de uma instrução por ciclo, em ordem, e janela do ROB,
+  além dos limites de recurso de cada classe de RS (ocupação das estações e
+  das unidades funcionais).
+
+Mispredictions e bloqueios de loads por stores sem endereço são ignorados,
+então os ciclos calculados nunca excedem os simulados e o IPC nunca fica
+abaixo do alcançado.
+"""
+import math
+from typing import List, Dict
+from src.core.structures import Instruction, InstructionType
+from src.core.functional import FunctionalSimulator
+from src.core.simulator import TomasuloSimulator
+
+
+# Classe de RS de cada tipo de instrução (J e NOP não usam RS)
+RS_CLASSES = {
+    InstructionType.ADD: 'Add', InstructionType.SUB: 'Add', InstructionType.ADDI: 'Add',
+    InstructionType.BEQ: 'Add', InstructionType.BNE: 'Add',
+    InstructionType.MUL: 'Mult', InstructionType.DIV: 'Mult',
+    InstructionType.LW: 'Load', InstructionType.SW: 'Store',
+}
+
+
+class DataflowBound:
+    """Limites de desempenho de um programa em uma configuração"""
+
+    def __init__(self, instructions: int, critical_path: int, cycles: int,
+                 resource_cycles: Dict[str, float], truncated: bool):
+        self.instructions = instructions  # Instruções dinâmicas analisadas
+        self.critical_path = critical_path  # Ciclos do caminho crítico do fluxo de dados
+        self.cycles = cycles  # Limite inferior de ciclos na configuração
+        self.resource_cycles = resource_cycles  # Limite inferior de ciclos por classe de RS
+        self.truncated = truncated  # A análise parou em max_instructions
+
+    @property
+    def ideal_ipc(self) -> float:
+        """IPC com paralelismo ilimitado (só o caminho crítico limita)"""
+        return self.instructions / self.critical_path if self.critical_path else 0.0
+
+    @property
+    def ipc_bound(self) -> float:
+        """Limite superior do IPC na configuração"""
+        return self.instructions / self.cycles if self.cycles else 0.0
+
+    @property
+    def limiter(self) -> str:
+        """O que determina o limite: 'dataflow' ou a classe de RS mais restritiva"""
+        resource, cycles = max(self.resource_cycles.items(), key=lambda item: item[1])
+        return resource if cycles > self.cycles - 1 else 'dataflow'
+
+    def __str__(self):
+        prefix = '≥' if self.truncated else ''
+        return (f"{prefix}{self.instructions} instruções: caminho crítico {self.critical_path} ciclos "
+                f"(IPC ideal {self.ideal_ipc:.3f}), limite {self.cycles} ciclos "
+                f"(IPC ≤ {self.ipc_bound:.3f}, {self.limiter})")
+
+
+class DataflowGraph:
+    """Grafo de dependências RAW da execução dinâmica de um programa"""
+
+    def __init__(self, instructions: List[Instruction], max_instructions: int = 1_000_000):
+        self.program = instructions
+        self.pcs: List[int] = []
+        self.producers: List[tuple] = []  # Índices dinâmicos dos produtores dos operandos
+        self.store_deps: List[int] = []  # Store mais recente ao mesmo endereço (loads) ou -1
+
+        functional = FunctionalSimulator(instructions)
+        writer: Dict[str, int] = {}  # Registrador -> último produtor dinâmico
+        stores: Dict[int, int] = {}  # Endereço -> último store dinâmico
+        while not functional.finished() and len(self.pcs) < max_instructions:
+            inst = instructions[functional.pc]
+            index = len(self.pcs)
+            _, _, address, _ = functional.step()
+            self.pcs.append(inst.pc)
+            self.producers.append(tuple(writer[src] for src in (inst.src1, inst.src2)
+                                        if src and src in writer))
+            store_dep = -1
+            if inst.type == InstructionType.LW:
+                store_dep = stores.get(address, -1)
+            elif inst.type == InstructionType.SW:
+                stores[address] = index
+            self.store_deps.append(store_dep)
+            if inst.dest and inst.type in RS_CLASSES and inst.type not in (
+                    InstructionType.SW, InstructionType.BEQ, InstructionType.BNE):
+                writer[inst.dest] = index
+        self.truncated = not functional.finished()
+
+    def __len__(self):
+        return len(self.pcs)
+
+    def bound(self, config: Dict = None) -> DataflowBound:
+        """Limites de desempenho para uma configuração do TomasuloSimulator"""
+        simulator = TomasuloSimulator(config)
+        program = self.program
+        latency = [simulator.latencies.get(inst.type, 1) for inst in program]
+        rs_class = [RS_CLASSES.get(inst.type) for inst in program]
+        rob_size = simulator.rob_size
+        rs_counts = {'Add': simulator.num_add_rs, 'Mult': simulator.num_mul_rs,
+                     'Load': simulator.num_load_rs, 'Store': simulator.num_store_rs}
+
+        count = len(self.pcs)
+        ideal_write = [0] * count  # Escrita sem restrições de máquina
+        write = [0] * count  # Escrita com despacho/commit em ordem e janela do ROB
+        commit = [0] * count
+        busy = {name: 0 for name in rs_counts}  # Ciclos de RS ocupadas por classe
+        exec_cycles = {name: 0 for name in rs_counts}  # Ciclos de FU por classe
+        critical_path = 0
+        issue = 0
+        last_commit = 0
+        for index in range(count):
+            pc = self.pcs[index]
+            lat = latency[pc]
+            cls = rs_class[pc]
+            producers = self.producers[index]
+            store = self.store_deps[index]
+
+            issue = issue + 1
+            if index >= rob_size:
+                issue = max(issue, commit[index - rob_size])
+
+            if cls is None:
+                # J e NOP: prontas no despacho
+                ideal_write[index] = 1
+                write[index] = issue
+            else:
+                start = 1
+                for producer in producers:
+                    start = max(start, ideal_write[producer])
+                end = start + lat - 1
+                if store >= 0:
+                    end = max(end, ideal_write[store])
+                ideal_write[index] = end + 1
+
+                start = issue + 1
+                for producer in producers:
+                    start = max(start, write[producer])
+                end = start + lat - 1
+                if store >= 0:
+                    end = max(end, write[store])
+                write[index] = end + 1
+                busy[cls] += lat + 1
+                exec_cycles[cls] += lat
+
+            last_commit = max(write[index] + 1, last_commit + 1)
+            commit[index] = last_commit
+            critical_path = max(critical_path, ideal_write[index] + 1)
+
+        resource_cycles = {}
+        for name, stations in rs_counts.items():
+            units = simulator.functional_units[name] or stations
+            resource_cycles[name] = max(busy[name] / stations if stations else 0.0,
+                                        exec_cycles[name] / units if units else 0.0)
+        cycles = max([last_commit] + [math.ceil(c) for c in resource_cycles.values()])
+        return DataflowBound(count, critical_path, cycles, resource_cycles, self.truncated)
+
+
+def analyze(instructions: List[Instruction], config: Dict = None,
+            max_instructions: int = 1_000_000) -> DataflowBound:
+    """Atalho: monta o grafo e calcula os limites para uma configuração"""
+    return DataflowGraph(instructions, max_instructions).bound(config)
@@ -0,0 +1,102 @@
+"""
+Simulador funcional (sem temporização) do conjunto de instruções MIPS
+"""
+from typing import List, Dict, Optional, Tuple
+from src.core.structures import Instruction, InstructionType, BranchPredictor
+
+
+class FunctionalSimulator:
+    """Interpretador funcional: executa uma instrução por passo, sem modelar o pipeline
+
+    A semântica de cada instrução é a mesma do TomasuloSimulator, de forma que
+    os registradores e a memória finais coincidem com os do modelo temporal.
+    """
+
+    def __init__(self, instructions: List[Instruction],
+                 registers: Dict[str, int] = None, memory: Dict[int, int] = None):
+        self.instructions = instructions
+        self.registers = dict(registers) if registers else {f'R{i}': 0 for i in range(32)}
+        self.memory = dict(memory) if memory else {}
+        self.pc = 0
+        self.executed = 0
+
+    def finished(self) -> bool:
+        """Verifica se o programa terminou"""
+        return self.pc >= len(self.instructions)
+
+    def step(self) -> Optional[Tuple[int, bool, int, int]]:
+        """
+        Executa a instrução apontada pelo PC
+
+        Returns:
+            (pc, desvio tomado, endereço efetivo, valor produzido) ou None se terminou
+        """
+        if self.pc >= len(self.instructions):
+            return None
+
+        inst = self.instructions[self.pc]
+        regs = self.registers
+        t = inst.type
+        pc = self.pc
+        taken = False
+        address = 0
+        value = 0
+
+        if t == InstructionType.ADD:
+            value = regs.get(inst.src1, 0) + regs.get(inst.src2, 0)
+            regs[inst.dest] = value
+        elif t == InstructionType.SUB:
+            value = regs.get(inst.src1, 0) - regs.get(inst.src2, 0)
+            regs[inst.dest] = value
+        elif t == InstructionType.MUL:
+            value = regs.get(inst.src1, 0) * regs.get(inst.src2, 0)
+            regs[inst.dest] = value
+        elif t == InstructionType.DIV:
+            divisor = regs.get(inst.src2, 0)
+            value = regs.get(inst.src1, 0) // divisor if divisor != 0 else 0
+            regs[inst.dest] = value
+        elif t == InstructionType.ADDI:
+            value = regs.get(inst.src1, 0) + inst.immediate
+            regs[inst.dest] = value
+        elif t == InstructionType.LW:
+            address = regs.get(inst.src1, 0) + inst.offset
+            value = self.memory.get(address, 0)
+            regs[inst.dest] = value
+        elif t == InstructionType.SW:
+            address = regs.get(inst.src1, 0) + inst.offset
+            value = regs.get(inst.src2, 0)
+            self.memory[address] = value
+        elif t == InstructionType.BEQ:
+            taken = regs.get(inst.src1, 0) == regs.get(inst.src2, 0)
+        elif t == InstructionType.BNE:
+            taken = regs.get(inst.src1, 0) != regs.get(inst.src2, 0)
+        elif t == InstructionType.J:
+            taken = True
+
+        if taken and inst.target is not None:
+            self.pc = inst.target
+        else:
+            self.pc += 1
+        self.executed += 1
+        return pc, taken, address, value
+
+    def run(self, max_instructions: int = None, predictor: BranchPredictor = None) -> int:
+        """
+        Executa até o fim do programa (ou até max_instructions); retorna o total executado
+
+        Args:
+            predictor: Se informado, é treinado com cada desvio condicional
+                (mantém o preditor "aquecido" durante o avanço rápido)
+        """
+        start = self.executed
+        instructions = self.instructions
+        size = len(instructions)
+        step = self.step
+        while self.pc < size:
+            if max_instructions is not None and self.executed - start >= max_instructions:
+                break
+            inst = instructions[self.pc]
+            record = step()
+            if predictor is not None and inst.type in (InstructionType.BEQ, InstructionType.BNE):
+                predictor.update(inst.pc, record[1])
+        return self.executed - start
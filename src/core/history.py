@@ -0,0 +1,146 @@
+"""
+Histórico de ciclos para execução reversa
+
+Cada ciclo gera um delta de desfazer contendo apenas o estado anterior do que
+mudou: reservation stations, entradas do ROB, instruções em voo, status de
+registradores e métricas (por comparação antes/depois), além das escritas
+esparsas em registradores, memória e preditor registradas pelo próprio
+simulador durante o ciclo. Os deltas ficam em um buffer circular limitado por
+um orçamento de memória.
+"""
+from collections import deque
+from src.core.simulator import MISSING
+
+
+class StepHistory:
+    """Buffer circular de deltas de desfazer, um por ciclo"""
+
+    # Estimativas de custo em memória (bytes) usadas para respeitar o orçamento
+    DELTA_OVERHEAD = 600  # Tuplas de controle, métricas e contêineres do delta
+    ITEM_COST = 200  # Cada estado anterior armazenado
+
+    def __init__(self, simulator, budget_bytes: int):
+        self.simulator = simulator
+        self.budget_bytes = budget_bytes
+        self.deltas = deque()
+        self.used_bytes = 0
+        # PCs das instruções alteradas pelo último step_back (para views incrementais)
+        self.last_touched = set()
+
+    def __len__(self):
+        return len(self.deltas)
+
+    def clear(self):
+        """Descarta todo o histórico"""
+        self.deltas.clear()
+        self.used_bytes = 0
+
+    def set_budget(self, budget_bytes: int):
+        """Altera o orçamento de memória, descartando os deltas mais antigos se preciso"""
+        self.budget_bytes = budget_bytes
+        self._evict()
+
+    def record_step(self) -> bool:
+        """Executa um ciclo registrando o delta necessário para desfazê-lo"""
+        sim = self.simulator
+        if sim.finished:
+            return False
+
+        all_rs = sim._all_rs()
+        rs_before = [sim._rs_state(rs) for rs in all_rs]
+        rob_before = [sim._rob_state(entry) for entry in sim.rob]
+        insts_before = {entry.instruction.pc: sim._inst_state(entry.instruction)
+                        for entry in sim.rob if entry.busy and entry.instruction}
+        control = sim._control_state()
+        status = dict(sim.register_status.reorder)
+        metrics = dict(vars(sim.metrics))
+        bp = sim.branch_predictor
+        predictor_counts = (bp.predictions, bp.correct_predictions)
+
+        sim._undo_log = log = []
+        try:
+            result = sim._step_cycle()
+        finally:
+            sim._undo_log = None
+
+        changes = []
+        for i, rs in enumerate(all_rs):
+            if sim._rs_state(rs) != rs_before[i]:
+                changes.append(('rs', i, rs_before[i]))
+        for i, entry in enumerate(sim.rob):
+            if sim._rob_state(entry) != rob_before[i]:
+                changes.append(('rob', i, rob_before[i]))
+        for pc, state in insts_before.items():
+            if sim._inst_state(sim.instructions[pc]) != state:
+                changes.append(('inst', pc, state))
+        if status != sim.register_status.reorder:
+            changes.append(('status', None, status))
+
+        self.deltas.append((control, metrics, predictor_counts, changes, log))
+        self.used_bytes += self._delta_cost(changes, log)
+        self._evict()
+        return result
+
+    def step_back(self, cycles: int = 1) -> int:
+        """Desfaz até `cycles` ciclos; retorna quantos foram desfeitos"""
+        sim = self.simulator
+        all_rs = sim._all_rs()
+        versions = sim.versions
+        touched = set()
+        undone = 0
+
+        while undone < cycles and self.deltas:
+            control, metrics, predictor_counts, changes, log = self.deltas.pop()
+            self.used_bytes -= self._delta_cost(changes, log)
+
+            # Escritas esparsas em ordem inversa; depois os estados completos anteriores
+            for kind, key, old in reversed(log):
+                if kind == 'reg':
+                    self._restore(sim.registers, key, old)
+                    if versions is not None:
+                        versions.touch_register(key)
+                elif kind == 'mem':
+                    self._restore(sim.memory, key, old)
+                    if versions is not None:
+                        versions.touch_memory(key)
+                elif kind == 'bp':
+                    self._restore(sim.branch_predictor.table, key, old)
+                elif kind == 'inst':
+                    sim._set_inst_state(sim.instructions[key], old)
+                    touched.add(key)
+
+            for kind, key, old in changes:
+                if kind == 'rs':
+                    sim._set_rs_state(all_rs[key], old)
+                elif kind == 'rob':
+                    sim._set_rob_state(sim.rob[key], old)
+                elif kind == 'inst':
+                    sim._set_inst_state(sim.instructions[key], old)
+                    touched.add(key)
+                elif kind == 'status':
+                    sim.register_status.reorder = old
+
+            sim._set_control_state(control)
+            vars(sim.metrics).update(metrics)
+            sim.branch_predictor.predictions, sim.branch_predictor.correct_predictions = predictor_counts
+            undone += 1
+
+        sim._rebuild_ready_queues()
+        self.last_touched = touched
+        return undone
+
+    @staticmethod
+    def _restore(mapping, key, old):
+        if old is MISSING:
+            mapping.pop(key, None)
+        else:
+            mapping[key] = old
+
+    def _delta_cost(self, changes, log) -> int:
+        return self.DELTA_OVERHEAD + self.ITEM_COST * (len(changes) + len(log))
+
+    def _evict(self):
+        """Descarta os deltas mais antigos até caber no orçamento"""
+        while self.deltas and self.used_bytes > self.budget_bytes:
+            control, metrics, predictor_counts, changes, log = self.deltas.popleft()
+            self.used_bytes -= self._delta_cost(changes, log)
@@ -0,0 +1,160 @@
+"""
+Estatísticas por intervalo (série temporal)
+
+A cada `interval` ciclos é gravada uma linha com IPC, ocupação média do ROB e
+das reservation stations por classe, taxa de acerto do preditor e a divisão
+dos ciclos de stall. IPC, desvios e stalls vêm das diferenças dos contadores
+do simulador, exatas; a ocupação é amostrada a cada `sample_every` ciclos,
+o que mantém o custo por ciclo em um decremento e uma comparação.
+
+As colunas são arrays tipados e podem ser exportadas em .npz ou CSV.
+"""
+import math
+from array import array
+from typing import Dict
+from src.core.timing_log import save_npz
+
+
+# Colunas e seus tipos de array ('q' = inteiro, 'd' = real)
+COLUMNS = {
+    'cycle': 'q',              # Último ciclo do intervalo
+    'cycles': 'q',             # Ciclos no intervalo (o último pode ser parcial)
+    'committed': 'q',
+    'ipc': 'd',
+    'rob_occupancy': 'd',      # Entradas ocupadas (média amostrada)
+    'rs_add': 'd',             # RS ocupadas por classe (média amostrada)
+    'rs_mult': 'd',
+    'rs_load': 'd',
+    'rs_store': 'd',
+    'branch_accuracy': 'd',    # NaN se nenhum desvio fez commit no intervalo
+    'mispredictions': 'q',
+    'bubble_cycles': 'q',      # Commit sem instrução pronta no head do ROB
+    'rs_stall_cycles': 'q',    # Despacho bloqueado por falta de RS
+    'rob_full_cycles': 'q',    # Despacho bloqueado por ROB cheio
+}
+
+# Contadores de PerformanceMetrics acumulados por intervalo
+COUNTERS = (
+    ('committed', 'instructions_completed'),
+    ('mispredictions', 'branch_mispredictions'),
+    ('bubble_cycles', 'bubble_cycles'),
+    ('rs_stall_cycles', 'stall_cycles'),
+    ('rob_full_cycles', 'rob_full_cycles'),
+)
+
+
+class IntervalStats:
+    """Série temporal de estatísticas, alimentada ao fim de cada ciclo
+
+    Ver TomasuloSimulator.enable_interval_stats. Ao voltar ciclos com
+    step_back, os intervalos posteriores são descartados e o intervalo
+    corrente recomeça no ciclo restaurado.
+    """
+
+    def __init__(self, simulator, interval: int = 1000, sample_every: int = 16):
+        if interval <= 0 or sample_every <= 0:
+            raise ValueError("interval e sample_every devem ser positivos")
+        self.simulator = simulator
+        self.interval = interval
+        self.sample_every = sample_every
+        self.columns: Dict[str, array] = {name: array(code) for name, code in COLUMNS.items()}
+        self._pools = (simulator.add_rs, simulator.mul_rs, simulator.load_rs, simulator.store_rs)
+        self._begin()
+
+    def __len__(self):
+        return len(self.columns['cycle'])
+
+    def column(self, name: str) -> array:
+        return self.columns[name]
+
+    def reset(self):
+        """Descarta a série"""
+        for column in self.columns.values():
+            del column[:]
+        self._begin()
+
+    def rewind(self):
+        """Descarta os intervalos posteriores ao ciclo atual (após step_back)"""
+        cycles = self.columns['cycle']
+        keep = len(cycles)
+        while keep and cycles[keep - 1] > self.simulator.current_cycle:
+            keep -= 1
+        for column in self.columns.values():
+            del column[keep:]
+        self._begin()
+
+    def _begin(self):
+        """Inicia um intervalo no ciclo atual"""
+        sim = self.simulator
+        self._start_cycle = sim.current_cycle
+        self._end_cycle = sim.current_cycle + self.interval
+        self._counters = [getattr(sim.metrics, attr) for _, attr in COUNTERS]
+        bp = sim.branch_predictor
+        self._predictions = (bp.predictions, bp.correct_predictions)
+        self._countdown = self.sample_every
+        self._samples = 0
+        self._occupancy = [0, 0, 0, 0, 0]  # ROB, Add, Mult, Load, Store
+
+    def end_cycle(self):
+        """Chamado pelo simulador ao fim de cada ciclo"""
+        self._countdown -= 1
+        if self._countdown == 0:
+            self._countdown = self.sample_every
+            self._sample()
+        sim = self.simulator
+        if sim.current_cycle >= self._end_cycle or sim.finished:
+            self._close()
+
+    def _sample(self):
+        sim = self.simulator
+        occupancy = self._occupancy
+        head = sim.rob_head
+        used = (sim.rob_tail - head) % sim.rob_size
+        if used == 0 and sim.rob[head].busy:
+            used = sim.rob_size
+        occupancy[0] += used
+        for i, pool in enumerate(self._pools, 1):
+            for rs in pool:
+                if rs.busy:
+                    occupancy[i] += 1
+        self._samples += 1
+
+    def _close(self):
+        """Grava o intervalo corrente e inicia o próximo"""
+        sim = self.simulator
+        cycles = sim.current_cycle - self._start_cycle
+        if cycles <= 0:
+            return
+        if self._samples == 0:
+            self._sample()
+        columns = self.columns
+        columns['cycle'].append(sim.current_cycle)
+        columns['cycles'].append(cycles)
+        for (name, attr), before in zip(COUNTERS, self._counters):
+            columns[name].append(getattr(sim.metrics, attr) - before)
+        columns['ipc'].append(columns['committed'][-1] / cycles)
+
+        samples = self._samples
+        for name, total in zip(('rob_occupancy', 'rs_add', 'rs_mult', 'rs_load', 'rs_store'),
+                               self._occupancy):
+            columns[name].append(total / samples)
+
+        bp = sim.branch_predictor
+        predictions = bp.predictions - self._predictions[0]
+        correct = bp.correct_predictions - self._predictions[1]
+        columns['branch_accuracy'].append(correct / predictions if predictions else math.nan)
+        self._begin()
+
+    # Exportação
+
+    def save_npz(self, path: str):
+        """Grava a série em um .npz (carregável com numpy.load)"""
+        save_npz(path, self.columns)
+
+    def save_csv(self, path: str):
+        """Grava uma linha por intervalo"""
+        names = list(COLUMNS)
+        with open(path, 'w', newline='') as f:
+            f.write(','.join(names) + '\n')
+            for row in zip(*(self.columns[name] for name in names)):
+                f.write(','.join(repr(value) for value in row) + '\n')
@@ -0,0 +1,243 @@
+"""
+Aceleração de laços: detecção de estado estacionário e extrapolação de ciclos
+
+Em um laço sem desvios internos, após algumas iterações o pipeline entra em
+um regime periódico. A cada commit de um desvio de volta (back-edge) tomado e
+corretamente predito, o acelerador calcula uma chave do estado
+microarquitetural que não depende de valores: ocupação e temporização relativa
+das reservation stations e do ROB, status de registradores, PC de busca e
+tabela do preditor. Quando uma chave se repete, o período (em back-edges e em
+ciclos) e os incrementos das métricas são conhecidos; como a temporização do
+modelo não depende dos valores dos operandos, todas as iterações seguintes
+repetem o mesmo período até a saída do laço.
+
+O acelerador então salta um número inteiro de períodos, mantendo uma margem
+antes da saída: os valores arquiteturais e os valores em voo são obtidos de
+um simulador funcional e os ciclos/métricas são extrapolados. A saída do laço
+é simulada exatamente. O salto é descartado (e a simulação segue exata) se a
+verificação funcional não corresponder ao estado em voo.
+"""
+from typing import Dict
+from src.core.structures import Instruction, InstructionType
+from src.core.functional import FunctionalSimulator
+
+
+BRANCHES = (InstructionType.BEQ, InstructionType.BNE, InstructionType.J)
+
+
+class LoopAccelerator:
+    """Detecta regimes periódicos em laços e salta iterações inteiras
+
+    Habilitado com a opção de configuração 'loop_acceleration'. Não atua
+    enquanto o histórico de execução reversa estiver registrando o ciclo, nem
+    com a política de escalonamento aleatória (que depende do ciclo).
+    """
+
+    # Limite de iterações examinadas pela passada funcional que procura a saída
+    MAX_ITERATIONS = 10 ** 7
+
+    def __init__(self, simulator):
+        self.simulator = simulator
+        self.jumps = 0
+        self.skipped_cycles = 0
+        self.skipped_iterations = 0
+        self.reset()
+
+    def reset(self):
+        """Esquece o laço em observação"""
+        self._loop_pc = None
+        self._back_edges = 0
+        self._seen: Dict[tuple, tuple] = {}
+        self._gave_up = False
+        self._pending = None
+
+    def back_edge_committed(self, inst: Instruction, taken: bool, correct: bool):
+        """Chamado no commit de cada desvio condicional"""
+        backward = inst.target is not None and inst.target <= inst.pc
+        if not (taken and correct and backward):
+            # Saída (ou misprediction): o próximo laço começa do zero
+            self.reset()
+            return
+        if inst.pc != self._loop_pc:
+            self.reset()
+            self._loop_pc = inst.pc
+        self._back_edges += 1
+        self._pending = inst
+
+    def end_cycle(self):
+        """Chamado ao fim de cada ciclo; avalia o estado após um back-edge"""
+        inst = self._pending
+        if inst is None:
+            return
+        self._pending = None
+        sim = self.simulator
+        if (self._gave_up or sim.finished or sim._undo_log is not None
+                or sim.scheduler == 'random'):
+            return
+        if not self._branch_free_body(inst):
+            self._gave_up = True
+            return
+
+        key = self._state_key()
+        previous = self._seen.get(key)
+        if previous is None:
+            self._seen[key] = (self._back_edges, sim.current_cycle,
+                               dict(vars(sim.metrics)), self._predictor_counts())
+            return
+
+        # Regime periódico encontrado: tentar um único salto nesta visita ao laço
+        self._gave_up = True
+        if not self._extrapolate(inst, previous):
+            self._seen.clear()
+
+    # Chave do estado
+
+    def _state_key(self) -> tuple:
+        sim = self.simulator
+        rs_key = tuple(
+            (rs.busy, rs.op, rs.vj is None, rs.vk is None, rs.qj, rs.qk, rs.dest,
+             rs.instruction.pc if rs.instruction else None, rs.cycles_remaining)
+            for rs in sim._all_rs()
+        )
+        rob_key = tuple(
+            (entry.busy, entry.instruction.pc if entry.instruction else None,
+             entry.state, entry.dest, entry.ready, entry.speculative,
+             entry.branch_predicted, entry.branch_actual)
+            for entry in sim.rob
+        )
+        return (sim.rob_head, sim.rob_tail, sim.pc, sim.speculating, sim.speculation_rob,
+                rs_key, rob_key, tuple(sorted(sim.register_status.reorder.items())),
+                tuple(sorted(sim.branch_predictor.table.items())))
+
+    def _predictor_counts(self) -> tuple:
+        bp = self.simulator.branch_predictor
+        return bp.predictions, bp.correct_predictions
+
+    def _branch_free_body(self, inst: Instruction) -> bool:
+        body = self.simulator.instructions[inst.target:inst.pc]
+        return all(other.type not in BRANCHES for other in body)
+
+    # Extrapolação
+
+    def _in_flight(self) -> list:
+        """Entradas ocupadas do ROB, da mais antiga para a mais nova"""
+        sim = self.simulator
+        entries = []
+        idx = sim.rob_head
+        for _ in range(sim.rob_size):
+            entry = sim.rob[idx]
+            if not entry.busy:
+                break
+            entries.append(entry)
+            idx = (idx + 1) % sim.rob_size
+        return entries
+
+    def _functional(self, start_pc: int) -> FunctionalSimulator:
+        sim = self.simulator
+        functional = FunctionalSimulator(sim.instructions, sim.registers, sim.memory)
+        functional.pc = start_pc
+        return functional
+
+    def _remaining_iterations(self, inst: Instruction, start_pc: int) -> int:
+        """Back-edges tomados que ainda faltam antes da saída do laço"""
+        functional = self._functional(start_pc)
+        step = functional.step
+        low, high = inst.target, inst.pc
+        taken_count = 0
+        while taken_count < self.MAX_ITERATIONS:
+            record = step()
+            if record is None:
+                break
+            pc, taken = record[0], record[1]
+            if not low <= pc <= high:
+                break
+            if pc == high:
+                if not taken:
+                    break
+                taken_count += 1
+        return taken_count
+
+    def _extrapolate(self, inst: Instruction, previous: tuple) -> bool:
+        sim = self.simulator
+        back_edges, cycle, metrics, predictor_counts = previous
+        period = self._back_edges - back_edges
+        period_cycles = sim.current_cycle - cycle
+
+        in_flight = self._in_flight()
+        start_pc = in_flight[0].instruction.pc if in_flight else sim.pc
+
+        # Margem: iterações ainda no ROB, mais folga para a saída ser simulada exatamente
+        body_size = inst.pc - inst.target + 1
+        margin = -(-len(in_flight) // body_size) + 2
+        remaining = self._remaining_iterations(inst, start_pc)
+        periods = (remaining - margin) // period
+        if periods <= 0:
+            return True
+        skipped = periods * period * body_size
+
+        # Estado arquitetural após as iterações saltadas e valores das instruções em voo
+        functional = self._functional(start_pc)
+        functional.run(skipped)
+        registers = dict(functional.registers)
+        memory = dict(functional.memory)
+        operands = []
+        for entry in in_flight:
+            before = functional.registers
+            src_values = (before.get(entry.instruction.src1, 0),
+                          before.get(entry.instruction.src2, 0))
+            record = functional.step()
+            if record is None or record[0] != entry.instruction.pc:
+                return False
+            if entry.instruction.type in (InstructionType.BEQ, InstructionType.BNE):
+                if record[1] != entry.branch_predicted:
+                    return False
+            operands.append((src_values, record))
+
+        # Aplicar: valores em voo, estado arquitetural, ciclos e métricas
+        stations = {rs.dest: rs for rs in sim._all_rs() if rs.busy}
+        for entry, ((src1, src2), (pc, taken, address, value)) in zip(in_flight, operands):
+            inst_type = entry.instruction.type
+            if entry.ready:
+                entry.value = value
+                if inst_type == InstructionType.SW:
+                    entry.address = address
+                if entry.branch_actual is not None:
+                    entry.branch_actual = taken
+            rs = stations.get(entry.entry_id)
+            if rs is not None:
+                if rs.qj is None and rs.vj is not None:
+                    rs.vj = src1
+                if rs.qk is None and rs.vk is not None:
+                    rs.vk = src2
+                if rs.address is not None:
+                    rs.address = address
+        sim.registers = registers
+        sim.memory = memory
+
+        extra_cycles = periods * period_cycles
+        sim.current_cycle += extra_cycles
+        for name, before in metrics.items():
+            current = getattr(sim.metrics, name)
+            setattr(sim.metrics, name, current + periods * (current - before))
+        bp = sim.branch_predictor
+        bp.predictions += periods * (bp.predictions - predictor_counts[0])
+        bp.correct_predictions += periods * (bp.correct_predictions - predictor_counts[1])
+        shifted = set(sim.instructions[inst.target:inst.pc + 1])
+        shifted.update(entry.instruction for entry in in_flight)
+        for body_inst in shifted:
+            self._shift_cycles(body_inst, extra_cycles)
+        sim._fast_forward(skipped)
+
+        self.jumps += 1
+        self.skipped_cycles += extra_cycles
+        self.skipped_iterations += periods * period
+        self._back_edges += periods * period
+        return True
+
+    @staticmethod
+    def _shift_cycles(inst: Instruction, cycles: int):
+        for name in ('issue_cycle', 'exec_start_cycle', 'exec_end_cycle',
+                     'write_cycle', 'commit_cycle'):
+            value = getattr(inst, name)
+            if value is not None:
+                setattr(inst, name, value + cycles)
@@ -0,0 +1,308 @@
+"""
+Simulação multinúcleo com memória compartilhada coerente
+
+Cada núcleo é um TomasuloSimulator com uma cache de coerência por palavra
+(estados M, E, S; ausente = I). Um LW cujo endereço não está na cache local
+(nem é encaminhado de um SW em voo) sofre `miss_latency` ciclos extras. SWs
+escrevem no commit (buffer de escrita, sem stall) e tornam a linha M.
+
+Os núcleos avançam em paralelo, em processos separados, sincronizando a cada
+`quantum` ciclos (lockstep por quantum): durante um quantum cada núcleo usa
+sua visão local da memória e registra suas transações; na fronteira o
+coordenador aplica as transações de todos em ordem de ciclo a um diretório
+MSI ou MESI, contabiliza o tráfego de coerência e devolve a cada núcleo os
+novos estados das linhas e os valores escritos pelos demais. A defasagem
+entre núcleos é limitada ao quantum; o resultado não depende de os núcleos
+rodarem em processos ou no próprio processo.
+"""
+import multiprocessing
+from typing import List, Dict, Optional
+from src.core.structures import Instruction, InstructionType, ReservationStation, ROBEntry
+from src.core.simulator import TomasuloSimulator, SimulationStalled
+
+
+PROTOCOLS = ('msi', 'mesi')
+
+TRAFFIC = ('bus_reads', 'bus_read_exclusive', 'upgrades', 'invalidations', 'writebacks')
+
+
+class CoherentCore(TomasuloSimulator):
+    """Núcleo com cache de coerência local e registro de transações
+
+    A detecção de livelock fica desligada: um núcleo esperando em laço por
+    uma escrita de outro núcleo repete o próprio estado legitimamente.
+    """
+
+    def __init__(self, core_id: int, config: Dict = None):
+        config = dict(config or {})
+        super().__init__(config)
+        self.core_id = core_id
+        self.miss_latency = config.get('miss_latency', 10)
+        self.livelock_detection = False
+        self.cache: Dict[int, str] = {}  # Endereço -> 'M', 'E' ou 'S'
+        self.transactions: list = []  # (ciclo, 'read'/'write', endereço, valor)
+        self.load_misses = 0
+        self._pending: Dict[int, int] = {}  # Entrada do ROB do LW -> ciclo em que o dado chega
+
+    def _load_blocked(self, rs: ReservationStation) -> bool:
+        if super()._load_blocked(rs):
+            return True
+        address = rs.vj + rs.instruction.offset
+        if address in self.cache or self._forwarded(rs.dest, address):
+            return False
+        ready = self._pending.get(rs.dest)
+        if ready is None:
+            self._pending[rs.dest] = self.current_cycle + self.miss_latency
+            self.load_misses += 1
+            return True
+        if self.current_cycle < ready:
+            return True
+        del self._pending[rs.dest]
+        self.cache[address] = 'S'
+        self.transactions.append((self.current_cycle, 'read', address, None))
+        return False
+
+    def _forwarded(self, rob_id: int, address: int) -> bool:
+        """Verifica se um SW mais antigo em voo fornece o valor do endereço"""
+        idx = self.rob_head
+        while idx != rob_id:
+            entry = self.rob[idx]
+            if entry.busy and entry.instruction.type == InstructionType.SW and entry.address == address:
+                return True
+            idx = (idx + 1) % self.rob_size
+        return False
+
+    def _write_memory(self, address: int, value: int):
+        super()._write_memory(address, value)
+        self.cache[address] = 'M'
+        self.transactions.append((self.current_cycle, 'write', address, value))
+
+    def _flush_speculative_instructions(self, branch_entry: ROBEntry):
+        super()._flush_speculative_instructions(branch_entry)
+        # Misses de loads descartados não chegam a completar
+        for rob_id in [rob_id for rob_id in self._pending if not self.rob[rob_id].busy]:
+            del self._pending[rob_id]
+
+
+class _CoreRunner:
+    """Executa um núcleo quantum a quantum (no processo do coordenador ou em um worker)"""
+
+    def __init__(self, core_id: int, program: List[Instruction], config: Dict, memory: Dict[int, int]):
+        self.core = CoherentCore(core_id, config)
+        self.core.load_program(program)
+        self.core.memory = dict(memory)
+
+    def run(self, end_cycle: int, states: Dict[int, str], values: Dict[int, int]):
+        """Aplica as atualizações da fronteira anterior e avança até `end_cycle`
+
+        Returns:
+            ('ok', transações, terminou) ou ('stalled', diagnóstico)
+        """
+        core = self.core
+        for address, state in states.items():
+            if state == 'I':
+                core.cache.pop(address, None)
+            else:
+                core.cache[address] = state
+        for address, value in values.items():
+            if core.cache.get(address) != 'M':
+                core.memory[address] = value
+
+        try:
+            while not core.finished and core.current_cycle < end_cycle:
+                core.step()
+        except SimulationStalled as e:
+            return ('stalled', e.diagnosis)
+        transactions = core.transactions
+        core.transactions = []
+        return ('ok', transactions, core.finished)
+
+    def summary(self) -> Dict:
+        core = self.core
+        metrics = core.metrics
+        return {
+            'core': core.core_id,
+            'cycles': core.current_cycle,
+            'committed': metrics.instructions_completed,
+            'ipc': metrics.get_ipc(),
+            'load_misses': core.load_misses,
+            'mispredictions': metrics.branch_mispredictions,
+            'registers': dict(core.registers),
+        }
+
+
+def _worker(conn, core_id, program, config, memory):
+    """Laço de um processo worker: um núcleo, comandos pelo pipe"""
+    runner = _CoreRunner(core_id, program, config, memory)
+    while True:
+        command = conn.recv()
+        if command[0] == 'run':
+            conn.send(runner.run(*command[1:]))
+        else:
+            conn.send(runner.summary())
+            conn.close()
+            return
+
+
+class _Directory:
+    """Diretório de coerência global e memória compartilhada"""
+
+    def __init__(self, protocol: str, memory: Dict[int, int]):
+        self.protocol = protocol
+        self.memory = dict(memory)
+        self.holders: Dict[int, Dict[int, str]] = {}  # Endereço -> núcleo -> estado
+        self.traffic = {name: 0 for name in TRAFFIC}
+
+    def read(self, core: int, address: int):
+        holders = self.holders.setdefault(address, {})
+        self.traffic['bus_reads'] += 1
+        for other, state in holders.items():
+            if state == 'M':
+                self.traffic['writebacks'] += 1
+            holders[other] = 'S'
+        holders[core] = 'E' if self.protocol == 'mesi' and not holders else 'S'
+
+    def write(self, core: int, address: int, value: int):
+        holders = self.holders.setdefault(address, {})
+        state = holders.get(core)
+        if state == 'S':
+            self.traffic['upgrades'] += 1
+        elif state is None:
+            self.traffic['bus_read_exclusive'] += 1
+        for other, other_state in holders.items():
+            if other != core:
+                self.traffic['invalidations'] += 1
+                if other_state == 'M':
+                    self.traffic['writebacks'] += 1
+        self.holders[address] = {core: 'M'}
+        self.memory[address] = value
+
+
+class MulticoreResult:
+    """Resultado de uma simulação multinúcleo"""
+
+    def __init__(self, cores: List[Dict], traffic: Dict[str, int], memory: Dict[int, int],
+                 quanta: int, finished: bool):
+        self.cores = cores  # Métricas por núcleo (ver _CoreRunner.summary)
+        self.traffic = traffic  # Tráfego de coerência
+        self.memory = memory  # Memória compartilhada final
+        self.quanta = quanta
+        self.finished = finished
+
+    @property
+    def cycles(self) -> int:
+        return max(core['cycles'] for core in self.cores)
+
+    @property
+    def ipc(self) -> float:
+        """IPC agregado (commits de todos os núcleos pelo ciclo do último a terminar)"""
+        cycles = self.cycles
+        return sum(core['committed'] for core in self.cores) / cycles if cycles else 0.0
+
+    def __str__(self):
+        lines = [f"{len(self.cores)} núcleos, {self.cycles} ciclos, IPC agregado {self.ipc:.3f}"]
+        for core in self.cores:
+            lines.append(f"  Núcleo {core['core']}: IPC {core['ipc']:.3f}, "
+                         f"{core['committed']} instruções, {core['load_misses']} misses")
+        lines.append('  Tráfego: ' + ', '.join(f'{name}={count}' for name, count in self.traffic.items()))
+        return '\n'.join(lines)
+
+
+def run_multicore(programs: List[List[Instruction]], config: Dict = None, quantum: int = 100,
+                  protocol: str = 'mesi', processes: bool = True,
+                  memory: Dict[int, int] = None, max_cycles: Optional[int] = None) -> MulticoreResult:
+    """
+    Simula um núcleo por programa sobre memória compartilhada coerente
+
+    Args:
+        programs: Um programa decodificado por núcleo
+        config: Configuração de cada TomasuloSimulator (mais 'miss_latency')
+        quantum: Ciclos entre sincronizações (defasagem máxima entre núcleos)
+        protocol: 'msi' ou 'mesi'
+        processes: Executa cada núcleo em um processo worker
+        memory: Conteúdo inicial da memória compartilhada
+        max_cycles: Interrompe a simulação neste ciclo
+
+    Raises:
+        SimulationStalled: se algum núcleo não puder mais progredir
+    """
+    if protocol not in PROTOCOLS:
+        raise ValueError(f"Protocolo de coerência desconhecido: {protocol}")
+    if quantum <= 0:
+        raise ValueError("O quantum deve ser positivo")
+    config = config or {}
+    memory = memory or {}
+    directory = _Directory(protocol, memory)
+    count = len(programs)
+
+    if processes:
+        runners = []
+        for core_id, program in enumerate(programs):
+            parent, child = multiprocessing.Pipe()
+            process = multiprocessing.Process(
+                target=_worker, args=(child, core_id, program, config, memory), daemon=True)
+            process.start()
+            runners.append((parent, process))
+    else:
+        runners = [_CoreRunner(core_id, program, config, memory)
+                   for core_id, program in enumerate(programs)]
+
+    updates = [({}, {}) for _ in range(count)]
+    finished = [False] * count
+    end_cycle = 0
+    quanta = 0
+    try:
+        while not all(finished) and (max_cycles is None or end_cycle < max_cycles):
+            end_cycle += quantum
+            if max_cycles is not None:
+                end_cycle = min(end_cycle, max_cycles)
+            quanta += 1
+
+            # Avançar todos os núcleos (em paralelo quando em processos)
+            if processes:
+                for (conn, _), (states, values) in zip(runners, updates):
+                    conn.send(('run', end_cycle, states, values))
+                replies = [conn.recv() for conn, _ in runners]
+            else:
+                replies = [runner.run(end_cycle, *update) for runner, update in zip(runners, updates)]
+
+            # Fronteira: aplicar as transações em ordem de ciclo
+            events = []
+            for core_id, reply in enumerate(replies):
+                if reply[0] == 'stalled':
+                    raise SimulationStalled(reply[1])
+                _, transactions, finished[core_id] = reply
+                events.extend((cycle, core_id, i, kind, address, value)
+                              for i, (cycle, kind, address, value) in enumerate(transactions))
+            events.sort()
+            touched = set()
+            written = {}
+            for _, core_id, _, kind, address, value in events:
+                touched.add(address)
+                if kind == 'read':
+                    directory.read(core_id, address)
+                else:
+                    directory.write(core_id, address, value)
+                    written[address] = value
+            updates = [
+                ({address: directory.holders[address].get(core_id, 'I') for address in touched},
+                 written)
+                for core_id in range(count)
+            ]
+
+        if processes:
+            summaries = []
+            for conn, process in runners:
+                conn.send(('summary',))
+                summaries.append(conn.recv())
+        else:
+            summaries = [runner.summary() for runner in runners]
+    finally:
+        if processes:
+            for conn, process in runners:
+                process.join(timeout=1)
+                if process.is_alive():
+                    process.terminate()
+
+    return MulticoreResult(summaries, dict(directory.traffic), directory.memory,
+                           quanta, all(finished))
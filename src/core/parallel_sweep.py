@@ -0,0 +1,219 @@
+"""
+Varreduras grandes em paralelo com agregação em memória compartilhada
+
+Os workers escrevem as métricas de cada ponto como uma linha de largura fixa
+(float64) em um bloco de `multiprocessing.shared_memory`, no índice do
+ponto; o processo principal só recebe avisos de blocos de pontos concluídos,
+sem serializar resultados. O prefixo contínuo de linhas prontas é gravado
+periodicamente em disco, de forma que uma varredura interrompida retoma a
+partir do último índice gravado.
+
+Formato do arquivo: cabeçalho de HEADER_SIZE bytes (assinatura, número de
+colunas, número de pontos, hash do programa, das configurações e do limite
+de instruções do trace, e flags) seguido das linhas, em ordem de ponto.
+"""
+import hashlib
+import json
+import os
+import struct
+import tempfile
+import time
+from array import array
+from multiprocessing import Pool, shared_memory
+from typing import List, Dict
+from src.core.structures import Instruction
+from src.core.trace import TraceReader, TraceReplaySimulator, record_trace
+
+
+# Colunas de cada linha (float64; contagens são exatas até 2**53)
+COLUMNS = ('total_cycles', 'instructions_issued', 'instructions_completed', 'bubble_cycles',
+           'stall_cycles', 'rob_full_cycles', 'branch_mispredictions', 'ipc', 'branch_accuracy')
+ROW_BYTES = len(COLUMNS) * 8
+
+MAGIC = b'TSWP'
+HEADER = struct.Struct('<4sII32s')  # Assinatura, colunas, pontos, hash da varredura
+FLAGS = struct.Struct('<I')  # Logo após HEADER; gravadas depois do trace
+FLAG_TRUNCATED = 1  # O trace parou em max_instructions
+HEADER_SIZE = 64
+
+# Estado de cada processo worker (ver _init_worker)
+_worker = {}
+
+
+def _sweep_hash(instructions: List[Instruction], configs: List[Dict],
+                max_instructions: int) -> bytes:
+    """Identifica a varredura (programa + configurações + limite do trace) para retomadas"""
+    program = [(inst.type.value, inst.dest, inst.src1, inst.src2, inst.immediate,
+                inst.offset, inst.target) for inst in instructions]
+    payload = json.dumps([program, configs, max_instructions], sort_keys=True,
+                         separators=(',', ':'))
+    return hashlib.sha256(payload.encode()).digest()
+
+
+def _init_worker(shm, trace_path, instructions, configs):
+    """Inicializa um worker: bloco compartilhado, trace e programa"""
+    _worker['rows'] = shm.buf.cast('d')
+    _worker['shm'] = shm
+    _worker['trace'] = TraceReader(trace_path)
+    _worker['instructions'] = instructions
+    _worker['configs'] = configs
+
+
+def _run_chunk(chunk):
+    """Simula os pontos [start, stop) e escreve suas linhas no bloco compartilhado"""
+    start, stop = chunk
+    rows = _worker['rows']
+    width = len(COLUMNS)
+    for index in range(start, stop):
+        simulator = TraceReplaySimulator(_worker['trace'], _worker['configs'][index])
+        simulator.load_program(_worker['instructions'])
+        simulator.run_until_complete()
+        metrics = simulator.metrics
+        base = index * width
+        rows[base:base + width] = array('d', (
+            metrics.total_cycles, metrics.instructions_issued, metrics.instructions_completed,
+            metrics.bubble_cycles, metrics.stall_cycles, metrics.rob_full_cycles,
+            metrics.branch_mispredictions, metrics.get_ipc(),
+            simulator.branch_predictor.get_accuracy(),
+        ))
+    return chunk
+
+
+class SweepTable:
+    """Resultados de uma varredura paralela, lidos do arquivo gravado"""
+
+    def __init__(self, path: str, simulated: int = 0):
+        with open(path, 'rb') as f:
+            header = f.read(HEADER_SIZE)
+            magic, width, points, _ = HEADER.unpack(header[:HEADER.size])
+            if magic != MAGIC or width != len(COLUMNS):
+                raise ValueError(f"{path} não é um arquivo de varredura válido")
+            flags, = FLAGS.unpack_from(header, HEADER.size)
+            self._rows = array('d')
+            self._rows.frombytes(f.read())
+        self.points = points
+        self.simulated = simulated  # Pontos simulados nesta execução (os demais foram retomados)
+        # Trace parado em max_instructions: as linhas cobrem só esse prefixo
+        self.truncated = bool(flags & FLAG_TRUNCATED)
+
+    def __len__(self):
+        return len(self._rows) // len(COLUMNS)
+
+    def row(self, index: int) -> Dict[str, float]:
+        width = len(COLUMNS)
+        return dict(zip(COLUMNS, self._rows[index * width:(index + 1) * width]))
+
+    def column(self, name: str) -> array:
+        width = len(COLUMNS)
+        return self._rows[COLUMNS.index(name)::width]
+
+    def to_numpy(self) -> 'numpy.ndarray':
+        """Linhas como matriz do NumPy, sem cópia (requer o NumPy instalado)"""
+        import numpy
+        return numpy.frombuffer(self._rows, dtype=numpy.float64).reshape(-1, len(COLUMNS))
+
+
+def run_parallel_sweep(instructions: List[Instruction], configs: List[Dict], path: str,
+                       workers: int = None, chunk_size: int = 16,
+                       flush_interval: float = 1.0, resume: bool = True,
+                       max_instructions: int = 1_000_000) -> SweepTable:
+    """
+    Simula cada configuração em processos workers, gravando as linhas em `path`
+
+    Args:
+        instructions: Programa já decodificado
+        configs: Configurações do TomasuloSimulator (o índice é o id do ponto)
+        path: Arquivo de resultados (também o ponto de retomada)
+        workers: Processos workers (None = núcleos da máquina)
+        chunk_size: Pontos por tarefa enviada a um worker
+        flush_interval: Segundos entre gravações do prefixo pronto
+        resume: Retoma a partir das linhas já gravadas em `path`
+        max_instructions: Limite de instruções dinâmicas do trace (programas
+            que não terminam); se atingido, `SweepTable.truncated` é True
+
+    Returns:
+        SweepTable com uma linha por configuração
+    """
+    points = len(configs)
+    header = HEADER.pack(MAGIC, len(COLUMNS), points,
+                         _sweep_hash(instructions, configs, max_instructions))
+    header = header.ljust(HEADER_SIZE, b'\0')
+
+    # Retomada: linhas completas já gravadas (um cabeçalho ausente ou
+    # incompleto é de uma varredura interrompida antes de gravar qualquer linha)
+    existing = b''
+    if resume and os.path.exists(path):
+        with open(path, 'rb') as f:
+            existing = f.read(HEADER_SIZE)
+        if len(existing) == HEADER_SIZE and existing[:HEADER.size] != header[:HEADER.size]:
+            raise ValueError(f"{path} pertence a outra varredura")
+    flushed = 0
+    if len(existing) == HEADER_SIZE:
+        flushed = min((os.path.getsize(path) - HEADER_SIZE) // ROW_BYTES, points)
+        output = open(path, 'r+b')
+        output.truncate(HEADER_SIZE + flushed * ROW_BYTES)
+        output.seek(0, os.SEEK_END)
+    else:
+        output = open(path, 'wb')
+        output.write(header)
+        output.flush()
+        os.fsync(output.fileno())
+    if flushed == points:
+        output.close()
+        return SweepTable(path)
+
+    fd, trace_path = tempfile.mkstemp(suffix='.trace')
+    os.close(fd)
+    shm = shared_memory.SharedMemory(create=True, size=max(points * ROW_BYTES, 1))
+    pool = None
+    try:
+        if not record_trace(instructions, trace_path,
+                            max_instructions=max_instructions).finished:
+            output.seek(HEADER.size)
+            output.write(FLAGS.pack(FLAG_TRUNCATED))
+            output.seek(0, os.SEEK_END)
+        chunks = [(start, min(start + chunk_size, points))
+                  for start in range(flushed, points, chunk_size)]
+        done = {}  # Início do bloco -> fim, para blocos concluídos fora de ordem
+        last_flush = time.perf_counter()
+
+        def flush(upto):
+            nonlocal flushed, last_flush
+            if upto > flushed:
+                output.write(shm.buf[flushed * ROW_BYTES:upto * ROW_BYTES])
+                output.flush()
+                os.fsync(output.fileno())
+                flushed = upto
+            last_flush = time.perf_counter()
+
+        initargs = (shm, trace_path, instructions, configs)
+        if workers == 1:
+            _init_worker(*initargs)
+            completed = map(_run_chunk, chunks)
+        else:
+            pool = Pool(workers, initializer=_init_worker, initargs=initargs)
+            completed = pool.imap_unordered(_run_chunk, chunks)
+
+        ready = flushed  # Fim do prefixo contínuo de pontos prontos
+        for start, stop in completed:
+            done[start] = stop
+            while ready in done:
+                ready = done.pop(ready)
+            if time.perf_counter() - last_flush >= flush_interval:
+                flush(ready)
+        simulated = points - flushed
+        flush(ready)
+    finally:
+        # Em caso de interrupção, o prefixo pronto já gravado permite retomar
+        if pool is not None:
+            pool.terminate()
+            pool.join()
+        if 'rows' in _worker:
+            _worker['rows'].release()
+            _worker['trace'].close()
+        _worker.clear()
+        output.close()
+        shm.close()
+        shm.unlink()
+        os.remove(trace_path)
+    return SweepTable(path, simulated)
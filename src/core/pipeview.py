@@ -0,0 +1,209 @@
+"""
+Exportação para visualizadores de pipeline (Konata e O3PipeView do gem5)
+
+Os escritores recebem os eventos de temporização do simulador (ver
+TomasuloSimulator.timing_listeners) e gravam a saída durante a simulação: o
+formato Kanata é escrito evento a evento, o O3PipeView uma instrução por vez,
+no commit ou no descarte. Assim a memória usada não cresce com o tamanho da
+execução.
+
+Estágios: issue (despacho para RS/ROB), dispatch/execute (envio à unidade
+funcional e execução), writeback (broadcast no CDB), commit e squash.
+
+Ao desfazer ciclos (step_back) ou restaurar um estado, o que já foi gravado
+permanece no arquivo: os escritores reabrem as instruções em voo no estado
+restaurado e seguem a partir do ciclo dele.
+"""
+from typing import Dict, TextIO
+from src.core.structures import Instruction
+
+
+class KonataWriter:
+    """Grava o log no formato Kanata 0004, lido pelo Konata
+
+    Estágios mostrados: Is (na RS aguardando operandos/unidade), Ex (em
+    execução), Wb (resultado escrito, aguardando commit).
+    """
+
+    def __init__(self, stream: TextIO):
+        self.stream = stream
+        self._cycle = None
+        self._next_id = 0
+        self._next_retire = 0
+        self._in_flight: Dict[int, list] = {}  # Entrada do ROB -> [id, estágio atual]
+        stream.write('Kanata\t0004\n')
+
+    def reset(self):
+        self._in_flight.clear()
+        self._cycle = None
+
+    def rewind(self, simulator):
+        """Encerra os registros abertos e reabre as instruções em voo no ciclo restaurado"""
+        for uid, stage in self._in_flight.values():
+            self.stream.write(f'E\t{uid}\t0\t{stage}\nR\t{uid}\t0\t1\n')
+        self._in_flight.clear()
+        self._cycle = None
+        for entry in simulator._in_flight_entries():
+            self.issue(entry.entry_id, simulator.current_cycle, entry.instruction)
+            stage = _live_stage(simulator, entry)
+            if stage != 'Is':
+                self._stage(entry.entry_id, simulator.current_cycle, stage)
+
+    def _advance(self, cycle: int):
+        if self._cycle is None:
+            self.stream.write(f'C=\t{cycle}\n')
+        elif cycle > self._cycle:
+            self.stream.write(f'C\t{cycle - self._cycle}\n')
+        self._cycle = cycle
+
+    def _stage(self, rob_id: int, cycle: int, stage: str):
+        self._advance(cycle)
+        record = self._in_flight[rob_id]
+        self.stream.write(f'E\t{record[0]}\t0\t{record[1]}\nS\t{record[0]}\t0\t{stage}\n')
+        record[1] = stage
+
+    def issue(self, rob_id: int, cycle: int, inst: Instruction):
+        self._advance(cycle)
+        uid = self._next_id
+        self._next_id += 1
+        self._in_flight[rob_id] = [uid, 'Is']
+        self.stream.write(f'I\t{uid}\t{uid}\t0\n'
+                          f'L\t{uid}\t0\t{inst.pc}: {inst}\n'
+                          f'S\t{uid}\t0\tIs\n')
+
+    def execute_start(self, rob_id: int, cycle: int):
+        self._stage(rob_id, cycle, 'Ex')
+
+    def execute_end(self, rob_id: int, cycle: int):
+        pass
+
+    def write(self, rob_id: int, cycle: int):
+        self._stage(rob_id, cycle, 'Wb')
+
+    def commit(self, rob_id: int, cycle: int):
+        self._retire(rob_id, cycle, flush=False)
+
+    def squash(self, rob_id: int, cycle: int):
+        self._retire(rob_id, cycle, flush=True)
+
+    def _retire(self, rob_id: int, cycle: int, flush: bool):
+        self._advance(cycle)
+        uid, stage = self._in_flight.pop(rob_id)
+        if flush:
+            retire_id, kind = 0, 1
+        else:
+            retire_id, kind = self._next_retire, 0
+            self._next_retire += 1
+        self.stream.write(f'E\t{uid}\t0\t{stage}\nR\t{uid}\t{retire_id}\t{kind}\n')
+
+
+class O3PipeViewWriter:
+    """Grava o formato O3PipeView do gem5 (util/o3-pipeview.py)
+
+    Cada instrução é escrita quando faz commit ou é descartada (retire 0).
+    fetch/decode/rename/dispatch correspondem ao issue do Tomasulo, issue ao
+    envio à unidade funcional e complete ao writeback. Os ciclos são
+    convertidos em ticks por `ticks_per_cycle`.
+    """
+
+    def __init__(self, stream: TextIO, ticks_per_cycle: int = 1000):
+        self.stream = stream
+        self.ticks_per_cycle = ticks_per_cycle
+        self._next_seq = 1
+        self._in_flight: Dict[int, list] = {}  # Entrada do ROB -> [seq, inst, issue, exec, write]
+
+    def reset(self):
+        self._in_flight.clear()
+
+    def rewind(self, simulator):
+        """Realinha as instruções em voo ao estado restaurado do simulador
+
+        Registros da mesma instrução despachada até o ciclo restaurado são
+        mantidos, sem os eventos posteriores a ele; as demais instruções em voo
+        recebem um registro novo com issue no ciclo restaurado.
+        """
+        cycle = simulator.current_cycle
+        in_flight = {}
+        for entry in simulator._in_flight_entries():
+            record = self._in_flight.get(entry.entry_id)
+            if record is None or record[1] is not entry.instruction or record[2] > cycle:
+                record = [self._next_seq, entry.instruction, cycle, None, None]
+                self._next_seq += 1
+            for index in (3, 4):
+                if record[index] is not None and record[index] > cycle:
+                    record[index] = None
+            if record[3] is None and _live_stage(simulator, entry) != 'Is':
+                record[3] = cycle
+            in_flight[entry.entry_id] = record
+        self._in_flight = in_flight
+
+    def issue(self, rob_id: int, cycle: int, inst: Instruction):
+        self._in_flight[rob_id] = [self._next_seq, inst, cycle, None, None]
+        self._next_seq += 1
+
+    def execute_start(self, rob_id: int, cycle: int):
+        self._in_flight[rob_id][3] = cycle
+
+    def execute_end(self, rob_id: int, cycle: int):
+        pass
+
+    def write(self, rob_id: int, cycle: int):
+        self._in_flight[rob_id][4] = cycle
+
+    def commit(self, rob_id: int, cycle: int):
+        self._emit(self._in_flight.pop(rob_id), cycle)
+
+    def squash(self, rob_id: int, cycle: int):
+        self._emit(self._in_flight.pop(rob_id), None)
+
+    def _emit(self, record: list, retire):
+        seq, inst, issue, execute, write = record
+        tick = self.ticks_per_cycle
+        front = issue * tick
+        # Instruções sem execução (J, NOP) completam no próprio issue
+        execute = execute * tick if execute is not None else front
+        complete = write * tick if write is not None else execute
+        retire = retire * tick if retire is not None else 0
+        self.stream.write(
+            f'O3PipeView:fetch:{front}:0x{inst.pc * 4:08x}:0:{seq}:{inst}\n'
+            f'O3PipeView:decode:{front}\n'
+            f'O3PipeView:rename:{front}\n'
+            f'O3PipeView:dispatch:{front}\n'
+            f'O3PipeView:issue:{execute}\n'
+            f'O3PipeView:complete:{complete}\n'
+            f'O3PipeView:retire:{retire}:store:0\n'
+        )
+
+
+def _live_stage(simulator, entry) -> str:
+    """Estágio (Is, Ex, Wb) de uma instrução em voo, lido do estado do simulador"""
+    if entry.state == 'Commit':
+        return 'Wb'
+    if entry.state == 'Write':
+        return 'Ex'
+    for rs in simulator._all_rs():
+        if (rs.busy and rs.dest == entry.entry_id
+                and rs.cycles_remaining < simulator.latencies.get(rs.op, 1)):
+            return 'Ex'
+    return 'Is'
+
+
+FORMATS = {'konata': KonataWriter, 'o3pipeview': O3PipeViewWriter}
+
+
+def attach_pipeview(simulator, stream: TextIO, fmt: str = 'konata'):
+    """
+    Registra um escritor de pipeline no simulador
+
+    Args:
+        stream: Arquivo de texto aberto para escrita (fechado por quem o abriu)
+        fmt: 'konata' ou 'o3pipeview'
+
+    Returns:
+        O escritor registrado (remova-o de simulator.timing_listeners para parar)
+    """
+    if fmt not in FORMATS:
+        raise ValueError(f"Formato de pipeline desconhecido: {fmt}")
+    writer = FORMATS[fmt](stream)
+    simulator.timing_listeners.append(writer)
+    return writer
@@ -0,0 +1,226 @@
+"""
+Cache persistente de resultados de simulação
+
+Resultados finais (métricas, taxa de acerto do preditor, registradores e
+memória) ficam em um banco SQLite local, endereçados pelo hash do programa
+decodificado, da configuração normalizada (valores padrão explícitos), da
+versão do modelo temporal e, se houver, do estado que `reset()` preserva
+(memória e tabela do preditor, ver `warm_state`). O tamanho total é limitado por remoção LRU.
+Várias instâncias, inclusive em processos diferentes, podem usar o mesmo
+arquivo ao mesmo tempo (modo WAL com transações imediatas nas escritas).
+"""
+import hashlib
+import json
+import os
+import sqlite3
+import time
+from typing import List, Dict, Optional
+from src.core.structures import Instruction, PerformanceMetrics
+from src.core.simulator import TomasuloSimulator
+
+
+DEFAULT_PATH = os.path.join(os.path.expanduser('~'), '.cache', 'tomasulo', 'results.sqlite')
+
+# Chaves de configuração que não alteram o resultado
+IGNORED_KEYS = ('loop_acceleration',)
+
+
+class SimulationResult:
+    """Estado final de uma simulação, na forma guardada pelo cache"""
+
+    def __init__(self, metrics: PerformanceMetrics, predictions: int, correct_predictions: int,
+                 registers: Dict[str, int], memory: Dict[int, int], finished: bool):
+        self.metrics = metrics
+        self.predictions = predictions
+        self.correct_predictions = correct_predictions
+        self.registers = registers
+        self.memory = memory
+        self.finished = finished
+
+    @classmethod
+    def from_simulator(cls, simulator: TomasuloSimulator) -> 'SimulationResult':
+        metrics = PerformanceMetrics()
+        vars(metrics).update(vars(simulator.metrics))
+        bp = simulator.branch_predictor
+        return cls(metrics, bp.predictions, bp.correct_predictions,
+                   dict(simulator.registers), dict(simulator.memory), simulator.finished)
+
+    @property
+    def branch_accuracy(self) -> float:
+        if self.predictions == 0:
+            return 0.0
+        return self.correct_predictions / self.predictions
+
+    def to_json(self) -> str:
+        return json.dumps({
+            'metrics': vars(self.metrics),
+            'predictor': [self.predictions, self.correct_predictions],
+            'registers': self.registers,
+            'memory': sorted(self.memory.items()),
+            'finished': self.finished,
+        }, separators=(',', ':'))
+
+    @classmethod
+    def from_json(cls, text: str) -> 'SimulationResult':
+        data = json.loads(text)
+        metrics = PerformanceMetrics()
+        vars(metrics).update(data['metrics'])
+        predictions, correct = data['predictor']
+        return cls(metrics, predictions, correct, data['registers'],
+                   {address: value for address, value in data['memory']}, data['finished'])
+
+    def apply_to(self, simulator: TomasuloSimulator):
+        """
+        Leva um simulador no ciclo 0 ao estado final guardado (resultados concluídos)
+
+        Registradores, memória, métricas, contadores do preditor e ciclo vêm do
+        resultado; RS e ROB ficam vazios, como ao fim de qualquer simulação. A
+        temporização por instrução não é guardada e fica em branco.
+        """
+        if not self.finished:
+            raise ValueError("Resultado incompleto não pode ser aplicado ao simulador")
+        simulator.registers = dict(self.registers)
+        simulator.memory = dict(self.memory)
+        vars(simulator.metrics).update(vars(self.metrics))
+        simulator.branch_predictor.predictions = self.predictions
+        simulator.branch_predictor.correct_predictions = self.correct_predictions
+        simulator.current_cycle = self.metrics.total_cycles
+        simulator.pc = len(simulator.instructions)
+        simulator.finished = True
+        simulator._state_replaced()
+
+
+def normalize_config(config: Dict = None) -> Dict:
+    """Configuração efetiva, com os valores padrão do simulador explícitos"""
+    simulator = TomasuloSimulator({key: value for key, value in (config or {}).items()
+                                   if key not in IGNORED_KEYS})
+    normalized = {
+        'add_rs': simulator.num_add_rs,
+        'mul_rs': simulator.num_mul_rs,
+        'load_rs': simulator.num_load_rs,
+        'store_rs': simulator.num_store_rs,
+        'rob_size': simulator.rob_size,
+        'functional_units': simulator.functional_units,
+        'latencies': {inst_type.value: latency for inst_type, latency in simulator.latencies.items()},
+        'scheduler': simulator.scheduler,
+        'max_cycles': simulator.max_cycles,
+        'max_instructions': simulator.max_instructions,
+    }
+    if simulator.scheduler == 'random':
+        normalized['scheduler_seed'] = simulator.scheduler_seed
+    return normalized
+
+
+def warm_state(simulator: TomasuloSimulator) -> Dict:
+    """
+    Estado preservado por `reset()` que altera o resultado: memória e tabela do
+    preditor (vazio para um simulador recém-criado)
+    """
+    warm = {}
+    if simulator.memory:
+        warm['memory'] = sorted(simulator.memory.items())
+    if simulator.branch_predictor.table:
+        warm['predictor'] = sorted(simulator.branch_predictor.table.items())
+    return warm
+
+
+def result_key(instructions: List[Instruction], config: Dict = None, warm: Dict = None) -> str:
+    """Hash do programa decodificado, da configuração normalizada, da versão do modelo e do estado aquecido"""
+    program = [(inst.type.value, inst.dest, inst.src1, inst.src2, inst.immediate,
+                inst.offset, inst.target) for inst in instructions]
+    data = {
+        'version': TomasuloSimulator.MODEL_VERSION,
+        'program': program,
+        'config': normalize_config(config),
+    }
+    if warm:
+        data['warm'] = warm
+    payload = json.dumps(data, sort_keys=True, separators=(',', ':'))
+    return hashlib.sha256(payload.encode()).hexdigest()
+
+
+class ResultCache:
+    """Cache de resultados em SQLite com remoção LRU por tamanho"""
+
+    def __init__(self, path: str = DEFAULT_PATH, max_bytes: int = 64 * 1024 * 1024):
+        directory = os.path.dirname(path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        self.path = path
+        self.max_bytes = max_bytes
+        self.hits = 0
+        self.misses = 0
+        self._db = sqlite3.connect(path, timeout=30, isolation_level=None,
+                                   check_same_thread=False)
+        self._db.execute('PRAGMA journal_mode=WAL')
+        self._db.execute('CREATE TABLE IF NOT EXISTS results ('
+                         'key TEXT PRIMARY KEY, value TEXT NOT NULL, '
+                         'size INTEGER NOT NULL, last_used REAL NOT NULL)')
+        self._db.execute('CREATE INDEX IF NOT EXISTS results_lru ON results (last_used)')
+
+    def get(self, instructions: List[Instruction], config: Dict = None,
+            warm: Dict = None) -> Optional[SimulationResult]:
+        """Resultado guardado para o par (programa, configuração), ou None"""
+        key = result_key(instructions, config, warm)
+        row = self._db.execute('SELECT value FROM results WHERE key = ?', (key,)).fetchone()
+        if row is None:
+            self.misses += 1
+            return None
+        self.hits += 1
+        self._db.execute('UPDATE results SET last_used = ? WHERE key = ?', (time.time(), key))
+        return SimulationResult.from_json(row[0])
+
+    def put(self, instructions: List[Instruction], config: Dict, result: SimulationResult,
+            warm: Dict = None):
+        """Guarda um resultado, removendo os menos usados se o limite for excedido"""
+        key = result_key(instructions, config, warm)
+        value = result.to_json()
+        db = self._db
+        db.execute('BEGIN IMMEDIATE')
+        try:
+            db.execute('INSERT OR REPLACE INTO results VALUES (?, ?, ?, ?)',
+                       (key, value, len(value), time.time()))
+            excess = db.execute('SELECT COALESCE(SUM(size), 0) FROM results').fetchone()[0] - self.max_bytes
+            if excess > 0:
+                victims = []
+                for victim, size in db.execute('SELECT key, size FROM results WHERE key != ? '
+                                               'ORDER BY last_used, rowid', (key,)):
+                    if excess <= 0:
+                        break
+                    victims.append((victim,))
+                    excess -= size
+                db.executemany('DELETE FROM results WHERE key = ?', victims)
+            db.execute('COMMIT')
+        except BaseException:
+            db.execute('ROLLBACK')
+            raise
+
+    def run(self, instructions: List[Instruction], config: Dict = None) -> SimulationResult:
+        """Consulta o cache e, se necessário, simula e guarda o resultado"""
+        result = self.get(instructions, config)
+        if result is None:
+            from src.core.compiled import CompiledSimulator
+            simulator = CompiledSimulator(config)
+            simulator.load_program(instructions)
+            simulator.run_until_complete()
+            result = SimulationResult.from_simulator(simulator)
+            self.put(instructions, config, result)
+        return result
+
+    def clear(self):
+        self._db.execute('DELETE FROM results')
+
+    def size_bytes(self) -> int:
+        return self._db.execute('SELECT COALESCE(SUM(size), 0) FROM results').fetchone()[0]
+
+    def __len__(self):
+        return self._db.execute('SELECT COUNT(*) FROM results').fetchone()[0]
+
+    def close(self):
+        self._db.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
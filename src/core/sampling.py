@@ -0,0 +1,125 @@
+"""
+Simulação amostrada (estilo SMARTS)
+
+O programa é executado pelo simulador funcional, que mantém o preditor de
+desvios aquecido. A cada `period` instruções, uma janela detalhada roda no
+TomasuloSimulator a partir do estado arquitetural corrente: `warmup`
+instruções para encher o pipeline (não medidas) e `window` instruções
+medidas. O IPC é estimado a partir do CPI médio das janelas, com intervalo
+de confiança pela aproximação normal.
+"""
+import math
+from statistics import NormalDist, mean, stdev
+from typing import List, Dict, Optional
+from src.core.structures import Instruction, BranchPredictor
+from src.core.simulator import TomasuloSimulator
+from src.core.functional import FunctionalSimulator
+
+
+class SamplingResult:
+    """Estimativa de IPC obtida por amostragem"""
+
+    def __init__(self, samples: List[float], instructions: int, confidence: float):
+        self.samples = samples  # CPI de cada janela medida
+        self.instructions = instructions  # Instruções executadas (funcional + detalhado)
+        self.confidence = confidence
+
+        self.cpi = mean(samples) if samples else 0.0
+        self.cpi_stdev = stdev(samples) if len(samples) > 1 else 0.0
+        z = NormalDist().inv_cdf((1 + confidence) / 2)
+        self.cpi_half_width = z * self.cpi_stdev / math.sqrt(len(samples)) if samples else 0.0
+
+    @property
+    def ipc(self) -> float:
+        return 1 / self.cpi if self.cpi > 0 else 0.0
+
+    @property
+    def ipc_low(self) -> float:
+        """Limite inferior do intervalo de confiança do IPC"""
+        high_cpi = self.cpi + self.cpi_half_width
+        return 1 / high_cpi if high_cpi > 0 else 0.0
+
+    @property
+    def ipc_high(self) -> float:
+        """Limite superior do intervalo de confiança do IPC"""
+        low_cpi = self.cpi - self.cpi_half_width
+        return 1 / low_cpi if low_cpi > 0 else math.inf
+
+    @property
+    def relative_error(self) -> float:
+        """Meia largura do intervalo relativa ao CPI médio"""
+        return self.cpi_half_width / self.cpi if self.cpi > 0 else 0.0
+
+    def __str__(self):
+        return (f"IPC: {self.ipc:.3f} [{self.ipc_low:.3f}, {self.ipc_high:.3f}] "
+                f"({self.confidence * 100:.0f}% de confiança, {len(self.samples)} amostras, "
+                f"{self.instructions} instruções)")
+
+
+def run_sampled(instructions: List[Instruction], config: Dict = None,
+                period: int = 10000, warmup: int = 1000, window: int = 1000,
+                confidence: float = 0.95, registers: Dict[str, int] = None,
+                memory: Dict[int, int] = None) -> SamplingResult:
+    """
+    Estima o IPC do programa por amostragem
+
+    Args:
+        instructions: Programa já decodificado
+        config: Configuração do TomasuloSimulator usada nas janelas detalhadas
+        period: Instruções entre o início de duas janelas consecutivas
+        warmup: Instruções detalhadas não medidas no início de cada janela
+        window: Instruções medidas por janela
+        confidence: Nível de confiança do intervalo
+    """
+    if window <= 0 or warmup < 0 or warmup + window > period:
+        raise ValueError("É preciso 0 < window e warmup + window <= period")
+
+    functional = FunctionalSimulator(instructions, registers, memory)
+    predictor = BranchPredictor()
+    samples = []
+    while not functional.finished():
+        functional.run(period - warmup - window, predictor)
+        if functional.finished():
+            break
+        cpi = _detailed_window(instructions, config, functional, predictor, warmup, window)
+        if cpi is None:
+            break
+        samples.append(cpi)
+
+    return SamplingResult(samples, functional.executed, confidence)
+
+
+def _detailed_window(instructions: List[Instruction], config: Optional[Dict],
+                     functional: FunctionalSimulator, predictor: BranchPredictor,
+                     warmup: int, window: int) -> Optional[float]:
+    """
+    Roda uma janela detalhada a partir do estado do simulador funcional
+
+    O simulador detalhado compartilha registradores, memória e preditor com o
+    funcional; ao fim, o funcional retoma da primeira instrução sem commit.
+
+    Returns:
+        CPI da parte medida, ou None se o programa terminou antes
+    """
+    simulator = TomasuloSimulator(config)
+    simulator.load_program(instructions)
+    simulator.registers = functional.registers
+    simulator.memory = functional.memory
+    simulator.branch_predictor = predictor
+    simulator.pc = functional.pc
+
+    metrics = simulator.metrics
+    start_cycle = 0 if warmup == 0 else None
+    while not simulator.finished and metrics.instructions_completed < warmup + window:
+        simulator.step()
+        if start_cycle is None and metrics.instructions_completed >= warmup:
+            start_cycle = simulator.current_cycle
+
+    # Retomar o modo funcional a partir do estado arquitetural (instruções em voo são descartadas)
+    head = simulator.rob[simulator.rob_head]
+    functional.pc = head.instruction.pc if head.busy else simulator.pc
+    functional.executed += metrics.instructions_completed
+
+    if metrics.instructions_completed < warmup + window:
+        return None
+    return (simulator.current_cycle - start_cycle) / window
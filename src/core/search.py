@@ -0,0 +1,194 @@
+"""
+Busca automática no espaço de configurações
+
+Em vez de simular a grade completa de parâmetros, `search` procura a
+configuração mais barata (segundo uma função de custo fornecida pelo
+usuário) cujo IPC fica a no máximo `tolerance` do melhor IPC da carga:
+
+1. a maior configuração do espaço dá o IPC de referência;
+2. a partir dela, uma descida de encosta (hill-climbing) no custo avalia em
+   paralelo os vizinhos que reduzem um parâmetro em um passo e segue para o
+   vizinho mais barato que ainda atende ao IPC mínimo, até nenhum atender.
+
+Vizinhos cujo limite de IPC da análise de fluxo de dados já fica abaixo do
+mínimo são descartados sem simular; resultados repetidos vêm da memória da
+busca ou de um ResultCache.
+"""
+from concurrent.futures import ProcessPoolExecutor
+from typing import List, Dict, Callable, Optional
+from src.core.structures import Instruction
+from src.core.dataflow import DataflowGraph
+from src.core.compiled import CompiledSimulator
+from src.core.result_cache import SimulationResult
+
+
+# Valores de cada parâmetro, do menor (mais barato) ao maior
+DEFAULT_SPACE = {
+    'add_rs': (1, 2, 3, 4, 6),
+    'mul_rs': (1, 2, 3, 4),
+    'load_rs': (1, 2, 3, 4),
+    'store_rs': (1, 2, 3, 4),
+    'rob_size': (4, 8, 16, 32),
+}
+
+# Área relativa de cada unidade de recurso (ver area_cost)
+AREA_WEIGHTS = {
+    'add_rs': 1.0,
+    'mul_rs': 3.0,
+    'load_rs': 1.5,
+    'store_rs': 1.5,
+    'rob_size': 0.5,
+}
+
+
+def area_cost(config: Dict) -> float:
+    """Custo de área aproximado: soma ponderada de estações e entradas do ROB"""
+    return sum(weight * config.get(key, 0) for key, weight in AREA_WEIGHTS.items())
+
+
+def _simulate(job) -> SimulationResult:
+    """Avalia uma configuração (executa nos processos workers)"""
+    instructions, config = job
+    simulator = CompiledSimulator(config)
+    simulator.load_program(instructions)
+    simulator.run_until_complete()
+    return SimulationResult.from_simulator(simulator)
+
+
+class SearchResult:
+    """Resultado de uma busca no espaço de configurações"""
+
+    def __init__(self, config: Dict, ipc: float, cost: float, reference_ipc: float,
+                 evaluations: Dict[tuple, Optional[float]], simulations: int, grid_size: int):
+        self.config = config  # Configuração mais barata encontrada
+        self.ipc = ipc
+        self.cost = cost
+        self.reference_ipc = reference_ipc  # Melhor IPC observado
+        self.evaluations = evaluations  # Configuração -> IPC (None = descartada pelo limite)
+        self.simulations = simulations  # Simulações efetivamente executadas
+        self.grid_size = grid_size  # Tamanho da grade completa
+
+    def __str__(self):
+        return (f"{self.config}: IPC {self.ipc:.3f} ({self.ipc / self.reference_ipc * 100:.1f}% "
+                f"do melhor), custo {self.cost:.1f}, {self.simulations} simulações "
+                f"(grade: {self.grid_size})")
+
+
+class _Evaluator:
+    """Avaliação de configurações com memória, poda por limite, cache e paralelismo"""
+
+    def __init__(self, instructions, base_config, workers, cache):
+        self.instructions = instructions
+        self.base_config = base_config
+        self.cache = cache
+        self.results: Dict[tuple, Optional[float]] = {}
+        self.simulations = 0
+        self.graph = DataflowGraph(instructions)
+        if self.graph.truncated:
+            self.graph = None
+        self.pool = ProcessPoolExecutor(workers) if workers != 1 else None
+
+    def config(self, point: tuple, keys: List[str]) -> Dict:
+        config = dict(self.base_config)
+        config.update(zip(keys, point))
+        return config
+
+    def evaluate(self, points: List[tuple], keys: List[str], minimum: float = 0.0):
+        """Avalia os pontos ainda desconhecidos; os abaixo de `minimum` pelo limite são descartados"""
+        jobs = []
+        for point in dict.fromkeys(points):
+            if point in self.results:
+                continue
+            config = self.config(point, keys)
+            if self.graph is not None and minimum > 0 and self.graph.bound(config).ipc_bound < minimum:
+                self.results[point] = None
+                continue
+            if self.cache is not None:
+                cached = self.cache.get(self.instructions, config)
+                if cached is not None:
+                    self.results[point] = cached.metrics.get_ipc()
+                    continue
+            jobs.append((point, config))
+
+        args = [(self.instructions, config) for _, config in jobs]
+        results = self.pool.map(_simulate, args) if self.pool is not None else map(_simulate, args)
+        for (point, config), result in zip(jobs, results):
+            self.results[point] = result.metrics.get_ipc()
+            self.simulations += 1
+            if self.cache is not None:
+                self.cache.put(self.instructions, config, result)
+
+    def close(self):
+        if self.pool is not None:
+            self.pool.shutdown()
+
+
+def search(instructions: List[Instruction], tolerance: float = 0.05,
+           cost: Callable[[Dict], float] = area_cost, space: Dict[str, tuple] = None,
+           base_config: Dict = None, workers: Optional[int] = None, cache=None) -> SearchResult:
+    """
+    Procura a configuração mais barata com IPC a até `tolerance` do melhor
+
+    Args:
+        instructions: Programa já decodificado (a carga de trabalho)
+        tolerance: Perda de IPC aceitável em relação ao melhor (0.05 = 5%)
+        cost: Função de custo/área de uma configuração (menor é melhor)
+        space: Parâmetro -> valores em ordem crescente (padrão: DEFAULT_SPACE)
+        base_config: Parâmetros fixos (latências, unidades funcionais, ...)
+        workers: Processos para avaliar candidatos (None = núcleos da máquina, 1 = sem processos)
+        cache: ResultCache consultado e alimentado pelas avaliações
+    """
+    space = space or DEFAULT_SPACE
+    keys = list(space)
+    grid_size = 1
+    for values in space.values():
+        grid_size *= len(values)
+
+    evaluator = _Evaluator(instructions, base_config or {}, workers, cache)
+    try:
+        # Maior configuração: referência de IPC
+        current = tuple(len(space[key]) - 1 for key in keys)
+
+        def point(indices):
+            return tuple(space[key][i] for key, i in zip(keys, indices))
+
+        def point_cost(indices):
+            return cost(evaluator.config(point(indices), keys))
+
+        evaluator.evaluate([point(current)], keys)
+        reference = evaluator.results[point(current)]
+
+        while True:
+            minimum = reference * (1 - tolerance)
+            neighbors = []
+            for position in range(len(keys)):
+                if current[position] > 0:
+                    neighbor = list(current)
+                    neighbor[position] -= 1
+                    neighbors.append(tuple(neighbor))
+            evaluator.evaluate([point(n) for n in neighbors], keys, minimum)
+
+            # Um vizinho melhor que a referência (IPC não monotônico) eleva o mínimo
+            ipcs = {n: evaluator.results[point(n)] for n in neighbors}
+            best = max((ipc for ipc in ipcs.values() if ipc is not None), default=0.0)
+            if best > reference:
+                reference = best
+                minimum = reference * (1 - tolerance)
+
+            feasible = [n for n, ipc in ipcs.items() if ipc is not None and ipc >= minimum]
+            if not feasible:
+                break
+            current = min(feasible, key=point_cost)
+
+        # A referência pode ter subido depois de a configuração atual ser aceita, e
+        # um custo não monotônico pode deixá-la mais cara que pontos já avaliados:
+        # fica o ponto avaliado mais barato que atende ao mínimo final
+        minimum = reference * (1 - tolerance)
+        feasible = [p for p, ipc in evaluator.results.items() if ipc is not None and ipc >= minimum]
+        feasible.sort(key=lambda p: p != point(current))  # Empate de custo: fica a atual
+        chosen = min(feasible, key=lambda p: cost(evaluator.config(p, keys)))
+        config = evaluator.config(chosen, keys)
+        return SearchResult(config, evaluator.results[chosen], cost(config), reference,
+                            dict(evaluator.results), evaluator.simulations, grid_size)
+    finally:
+        evaluator.close()
@@ -0,0 +1,549 @@
+"""
+Servidor local de simulação com workers aquecidos
+
+Um processo de longa duração escuta em um socket Unix e executa os jobs em
+processos workers já iniciados (módulos importados, programas decodificados
+em cache e ResultCache aberto), de modo que cada execução curta custa
+milissegundos em vez de um interpretador novo.
+
+Protocolo: JSON-RPC 2.0, uma mensagem JSON por linha. Métodos:
+
+- run {source, config}: simula o programa até o fim; o resultado tem o
+  formato de SimulationResult.to_json
+- sweep {source, configs}: uma simulação por configuração, distribuídas entre
+  os workers; o resultado é a lista de resultados na ordem de configs
+- cancel {id}: cancela o job iniciado pela requisição `id` da mesma conexão
+- status: número de workers, tarefas em execução e tarefas na fila
+- shutdown: encerra o servidor
+
+Os jobs entram em uma fila única (ordem de chegada). Enquanto um job
+executa, o servidor envia notificações `progress` com o id da requisição:
+{id, cycle} para run e {id, done, total} para sweep.
+
+Uso: python -m src.core.server [--socket CAMINHO] [--workers N] [--no-cache]
+"""
+import argparse
+import hashlib
+import json
+import multiprocessing
+import os
+import queue
+import socket
+import socketserver
+import threading
+import time
+from collections import OrderedDict
+from typing import List, Dict, Callable, Optional
+from src.core.compiled import CompiledSimulator
+from src.core.result_cache import ResultCache, SimulationResult, DEFAULT_PATH as CACHE_PATH
+from src.mips.parser import MIPSParser
+
+
+DEFAULT_SOCKET = os.path.join(os.path.expanduser('~'), '.cache', 'tomasulo', 'server.sock')
+
+# Códigos de erro (os negativos acima de -32100 são os do JSON-RPC)
+PARSE_ERROR = -32700
+INVALID_REQUEST = -32600
+METHOD_NOT_FOUND = -32601
+INVALID_PARAMS = -32602
+SIMULATION_ERROR = -32000
+CANCELLED = -32800
+
+# Ciclos entre verificações de cancelamento nos workers
+BATCH_CYCLES = 4096
+# Intervalo mínimo entre notificações de progresso (segundos)
+PROGRESS_INTERVAL = 0.1
+
+
+class ServerError(RuntimeError):
+    """Erro devolvido pelo servidor para uma requisição"""
+
+    def __init__(self, code: int, message: str):
+        super().__init__(message)
+        self.code = code
+
+
+# Processos workers
+
+def _simulate(conn, instructions, config, report) -> Optional[SimulationResult]:
+    """Simula até o fim ou um orçamento; None se o job for cancelado"""
+    simulator = CompiledSimulator(config)
+    simulator.load_program(instructions)
+    last_report = time.perf_counter()
+    while not simulator.finished and not simulator._budget_exhausted():
+        simulator.step()
+        if simulator.current_cycle % BATCH_CYCLES == 0:
+            if conn.poll() and conn.recv() == 'cancel':
+                return None
+            now = time.perf_counter()
+            if report and now - last_report >= PROGRESS_INTERVAL:
+                last_report = now
+                conn.send(('progress', simulator.current_cycle))
+    return SimulationResult.from_simulator(simulator)
+
+
+def _worker(conn, cache_path: Optional[str], program_cache: int):
+    """Laço de um processo worker: recebe tarefas pelo pipe até receber None"""
+    parser = MIPSParser()
+    programs = OrderedDict()  # Hash do código -> instruções decodificadas (LRU)
+    cache = ResultCache(cache_path) if cache_path else None
+    while True:
+        message = conn.recv()
+        if message is None:
+            break
+        if message == 'cancel':
+            continue  # A tarefa já havia terminado
+        key, source, config, report = message
+        try:
+            instructions = programs.pop(key, None)
+            if instructions is None:
+                instructions = parser.parse_program(source)
+            programs[key] = instructions
+            if len(programs) > program_cache:
+                programs.popitem(last=False)
+
+            result = cache.get(instructions, config) if cache is not None else None
+            if result is None:
+                result = _simulate(conn, instructions, config, report)
+                if result is None:
+                    conn.send(('cancelled',))
+                    continue
+                if cache is not None and result.finished:
+                    cache.put(instructions, config, result)
+            conn.send(('done', json.loads(result.to_json())))
+        except Exception as e:
+            conn.send(('error', f'{type(e).__name__}: {e}'))
+    if cache is not None:
+        cache.close()
+
+
+# Servidor
+
+class _Connection:
+    """Conexão de um cliente; escritas de várias threads serializadas"""
+
+    def __init__(self, wfile):
+        self.wfile = wfile
+        self.lock = threading.Lock()
+        self.jobs: Dict[object, '_Job'] = {}  # Id da requisição -> job em andamento
+        self.closed = False
+
+    def send(self, message: Dict):
+        data = (json.dumps(message, separators=(',', ':')) + '\n').encode()
+        with self.lock:
+            if self.closed:
+                return
+            try:
+                self.wfile.write(data)
+                self.wfile.flush()
+            except (OSError, ValueError):
+                self.closed = True
+
+    def close(self):
+        with self.lock:
+            self.closed = True
+
+    def respond(self, request_id, result=None, error: ServerError = None):
+        message = {'jsonrpc': '2.0', 'id': request_id}
+        if error is not None:
+            message['error'] = {'code': error.code, 'message': str(error)}
+        else:
+            message['result'] = result
+        self.send(message)
+
+    def notify(self, method: str, params: Dict):
+        self.send({'jsonrpc': '2.0', 'method': method, 'params': params})
+
+
+class _Job:
+    """Job de run ou sweep: uma tarefa por configuração"""
+
+    def __init__(self, connection: _Connection, request_id, method: str,
+                 source: str, configs: List[Dict]):
+        self.connection = connection
+        self.request_id = request_id
+        self.method = method
+        self.key = hashlib.sha256(source.encode()).hexdigest()
+        self.source = source
+        self.configs = configs
+        self.results = [None] * len(configs)
+        self.remaining = len(configs)
+        self.cancelled = False
+        self.error = None
+        self.lock = threading.Lock()
+
+    def progress(self, cycle: int):
+        self.connection.notify('progress', {'id': self.request_id, 'cycle': cycle})
+
+    def complete(self, index: int, result: Dict = None, error: ServerError = None):
+        """Registra o fim de uma tarefa; responde quando todas terminarem"""
+        with self.lock:
+            if error is not None and self.error is None:
+                self.error = error
+                self.cancelled = True  # As demais tarefas são descartadas
+            self.results[index] = result
+            self.remaining -= 1
+            finished = self.remaining == 0
+            # Notificado com o lock adquirido: nunca depois da resposta final
+            if self.method == 'sweep' and result is not None:
+                self.connection.notify('progress', {'id': self.request_id,
+                                                    'done': len(self.configs) - self.remaining,
+                                                    'total': len(self.configs)})
+        connection = self.connection
+        if not finished:
+            return
+        connection.jobs.pop(self.request_id, None)
+        if self.error is not None:
+            connection.respond(self.request_id, error=self.error)
+        elif self.cancelled:
+            connection.respond(self.request_id, error=ServerError(CANCELLED, 'Job cancelado'))
+        else:
+            connection.respond(self.request_id,
+                               self.results[0] if self.method == 'run' else self.results)
+
+
+class _Handler(socketserver.StreamRequestHandler):
+    """Lê as requisições de uma conexão, uma por linha"""
+
+    def handle(self):
+        simulation = self.server.simulation
+        connection = _Connection(self.wfile)
+        try:
+            for line in self.rfile:
+                if line.strip():
+                    simulation._handle(connection, line)
+        except OSError:
+            pass
+        finally:
+            # Cliente desconectado: seus jobs não têm mais a quem responder
+            connection.close()
+            for job in list(connection.jobs.values()):
+                job.cancelled = True
+
+
+class _UnixServer(socketserver.ThreadingMixIn, socketserver.UnixStreamServer):
+    daemon_threads = True
+
+
+class SimulationServer:
+    """Servidor de simulação em um socket Unix com um pool de workers aquecidos"""
+
+    def __init__(self, path: str = DEFAULT_SOCKET, workers: int = None,
+                 cache_path: Optional[str] = CACHE_PATH, program_cache: int = 64):
+        """
+        Args:
+            path: Caminho do socket Unix
+            workers: Processos workers (None = núcleos da máquina)
+            cache_path: ResultCache consultado pelos workers (None = sem cache)
+            program_cache: Programas decodificados mantidos por worker
+        """
+        self.path = path
+        self.workers = workers or os.cpu_count() or 1
+        self.cache_path = cache_path
+        self.program_cache = program_cache
+        self._tasks = queue.Queue()  # (job, índice da configuração)
+        self._running: Dict[object, _Job] = {}  # Pipe do worker -> job em execução
+        self._processes = []
+        self._threads = []
+        self._server = None
+        self._stopped = threading.Event()
+        self._close_lock = threading.Lock()
+
+    def start(self):
+        """Inicia os workers e passa a aceitar conexões"""
+        directory = os.path.dirname(self.path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        if os.path.exists(self.path):
+            if server_available(self.path):
+                raise RuntimeError(f"Já há um servidor em {self.path}")
+            os.remove(self.path)  # Socket de um servidor encerrado sem limpeza
+
+        # Os processos são criados antes de qualquer thread do servidor
+        pipes = []
+        for _ in range(self.workers):
+            process, conn = self._spawn_worker(multiprocessing)
+            self._processes.append(process)
+            pipes.append(conn)
+
+        for slot, conn in enumerate(pipes):
+            thread = threading.Thread(target=self._dispatch, args=(slot, conn), daemon=True)
+            thread.start()
+            self._threads.append(thread)
+
+        self._server = _UnixServer(self.path, _Handler)
+        self._server.simulation = self
+        thread = threading.Thread(target=self._server.serve_forever, daemon=True)
+        thread.start()
+        self._threads.append(thread)
+        return self
+
+    def serve_forever(self):
+        """Inicia o servidor e bloqueia até `shutdown`"""
+        self.start()
+        try:
+            self._stopped.wait()
+        finally:
+            self.close()
+
+    def close(self):
+        """Encerra o servidor, cancelando os jobs em andamento"""
+        with self._close_lock:
+            if self._server is not None:
+                self._close()
+
+    def _close(self):
+        server, self._server = self._server, None
+        server.shutdown()
+        server.server_close()
+        for job in list(self._running.values()):
+            job.cancelled = True
+        while True:
+            try:
+                job, index = self._tasks.get_nowait()
+            except queue.Empty:
+                break
+            job.cancelled = True
+            job.complete(index)
+        for _ in self._processes:
+            self._tasks.put(None)
+        for thread in self._threads:
+            thread.join()
+        for process in self._processes:
+            process.join()
+        self._processes.clear()
+        self._threads.clear()
+        if os.path.exists(self.path):
+            os.remove(self.path)
+        self._stopped.set()
+
+    def _spawn_worker(self, context):
+        """Inicia um processo worker; devolve o processo e a ponta do pipe do servidor"""
+        parent, child = context.Pipe()
+        process = context.Process(target=_worker, daemon=True,
+                                  args=(child, self.cache_path, self.program_cache))
+        process.start()
+        child.close()
+        return process, parent
+
+    def __enter__(self):
+        return self.start()
+
+    def __exit__(self, *exc):
+        self.close()
+
+    # Requisições
+
+    def _handle(self, connection: _Connection, line: bytes):
+        try:
+            request = json.loads(line)
+        except ValueError:
+            connection.respond(None, error=ServerError(PARSE_ERROR, 'JSON inválido'))
+            return
+        if not isinstance(request, dict) or not isinstance(request.get('method'), str):
+            connection.respond(None, error=ServerError(INVALID_REQUEST, 'Requisição inválida'))
+            return
+        request_id = request.get('id')
+        method = request['method']
+        params = request.get('params') or {}
+        try:
+            if method == 'run':
+                self._submit(connection, request_id, 'run', params['source'],
+                             [params.get('config')])
+                return
+            if method == 'sweep':
+                self._submit(connection, request_id, 'sweep', params['source'],
+                             list(params['configs']))
+                return
+            if method == 'cancel':
+                job = connection.jobs.get(params['id'])
+                if job is not None:
+                    job.cancelled = True
+                result = job is not None
+            elif method == 'status':
+                result = {'workers': len(self._processes), 'running': len(self._running),
+                          'queued': self._tasks.qsize()}
+            elif method == 'shutdown':
+                # Responde antes de fechar; o encerramento espera as threads do
+                # servidor e não pode rodar na thread desta conexão
+                if request_id is not None:
+                    connection.respond(request_id, True)
+                threading.Thread(target=self.close, daemon=True).start()
+                return
+            else:
+                raise ServerError(METHOD_NOT_FOUND, f"Método desconhecido: {method}")
+        except (KeyError, TypeError) as e:
+            connection.respond(request_id, error=ServerError(INVALID_PARAMS, f"Parâmetros inválidos: {e}"))
+            return
+        except ServerError as e:
+            connection.respond(request_id, error=e)
+            return
+        if request_id is not None:
+            connection.respond(request_id, result)
+
+    def _submit(self, connection, request_id, method, source, configs):
+        if not isinstance(source, str):
+            raise TypeError('source deve ser texto')
+        job = _Job(connection, request_id, method, source, configs)
+        if not configs:
+            connection.respond(request_id, [])
+            return
+        connection.jobs[request_id] = job
+        for index in range(len(configs)):
+            self._tasks.put((job, index))
+
+    def _dispatch(self, slot: int, conn):
+        """Envia as tarefas da fila a um worker; executa em uma thread por worker"""
+        while True:
+            task = self._tasks.get()
+            if task is None:
+                conn.send(None)
+                conn.close()
+                return
+            job, index = task
+            if job.cancelled:
+                job.complete(index)
+                continue
+
+            self._running[conn] = job
+            try:
+                conn.send((job.key, job.source, job.configs[index], job.method == 'run'))
+                cancel_sent = False
+                while True:
+                    if not conn.poll(0.05):
+                        if job.cancelled and not cancel_sent:
+                            conn.send('cancel')
+                            cancel_sent = True
+                        continue
+                    message = conn.recv()
+                    if message[0] == 'progress':
+                        job.progress(message[1])
+                        continue
+                    break
+            except (EOFError, OSError):
+                # Worker encerrado no meio da tarefa (sinal, falta de memória...):
+                # a tarefa falha e um worker novo assume esta thread. Com threads
+                # em execução o processo não é criado por fork
+                del self._running[conn]
+                conn.close()
+                self._processes[slot].join()
+                self._processes[slot], conn = self._spawn_worker(multiprocessing.get_context('spawn'))
+                job.complete(index, error=ServerError(SIMULATION_ERROR, 'Worker encerrado inesperadamente'))
+                continue
+            del self._running[conn]
+            if message[0] == 'done':
+                job.complete(index, message[1])
+            elif message[0] == 'error':
+                job.complete(index, error=ServerError(SIMULATION_ERROR, message[1]))
+            else:
+                job.complete(index)
+
+
+# Cliente
+
+def server_available(path: str = DEFAULT_SOCKET) -> bool:
+    """Indica se há um servidor aceitando conexões em `path`"""
+    try:
+        with socket.socket(socket.AF_UNIX, socket.SOCK_STREAM) as sock:
+            sock.connect(path)
+        return True
+    except OSError:
+        return False
+
+
+class Job:
+    """Job submetido ao servidor (uma conexão própria por job)"""
+
+    def __init__(self, path: str, method: str, params: Dict):
+        self._sock = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+        self._sock.connect(path)
+        self._file = self._sock.makefile('rb')
+        self.method = method
+        self.response = None
+        self._send({'jsonrpc': '2.0', 'id': 1, 'method': method, 'params': params})
+
+    def _send(self, message: Dict):
+        self._sock.sendall((json.dumps(message, separators=(',', ':')) + '\n').encode())
+
+    def events(self):
+        """Notificações de progresso até a resposta final (guardada em `response`)"""
+        while self.response is None:
+            line = self._file.readline()
+            if not line:
+                raise ServerError(SIMULATION_ERROR, 'Conexão com o servidor encerrada')
+            message = json.loads(line)
+            if message.get('method') == 'progress':
+                yield message['params']
+            elif message.get('id') == 1:
+                self.response = message
+                self.close()
+
+    def cancel(self):
+        """Solicita o cancelamento (pode ser chamado de outra thread)"""
+        try:
+            self._send({'jsonrpc': '2.0', 'id': 2, 'method': 'cancel', 'params': {'id': 1}})
+        except OSError:
+            pass  # O job já terminou
+
+    def result(self, progress: Callable[[Dict], None] = None):
+        """Espera o fim do job; lança ServerError em caso de erro ou cancelamento"""
+        for params in self.events():
+            if progress is not None:
+                progress(params)
+        if 'error' in self.response:
+            error = self.response['error']
+            raise ServerError(error['code'], error['message'])
+        result = self.response['result']
+        if self.method == 'run':
+            return SimulationResult.from_json(json.dumps(result))
+        if self.method == 'sweep':
+            return [SimulationResult.from_json(json.dumps(item)) for item in result]
+        return result
+
+    def close(self):
+        self._file.close()
+        self._sock.close()
+
+
+class SimulationClient:
+    """Cliente do servidor de simulação"""
+
+    def __init__(self, path: str = DEFAULT_SOCKET):
+        self.path = path
+
+    def submit(self, method: str, **params) -> Job:
+        return Job(self.path, method, params)
+
+    def run(self, source: str, config: Dict = None,
+            progress: Callable[[Dict], None] = None) -> SimulationResult:
+        """Simula um programa MIPS (texto) até o fim"""
+        return self.submit('run', source=source, config=config).result(progress)
+
+    def sweep(self, source: str, configs: List[Dict],
+              progress: Callable[[Dict], None] = None) -> List[SimulationResult]:
+        """Simula um programa para cada configuração, em paralelo nos workers"""
+        return self.submit('sweep', source=source, configs=configs).result(progress)
+
+    def status(self) -> Dict:
+        return self.submit('status').result()
+
+    def shutdown(self):
+        self.submit('shutdown').result()
+
+
+def main(argv: List[str] = None):
+    parser = argparse.ArgumentParser(description='Servidor local de simulação de Tomasulo')
+    parser.add_argument('--socket', default=DEFAULT_SOCKET, help='caminho do socket Unix')
+    parser.add_argument('--workers', type=int, default=None, help='processos workers')
+    parser.add_argument('--no-cache', action='store_true', help='não usar o cache de resultados')
+    args = parser.parse_args(argv)
+    server = SimulationServer(args.socket, args.workers, None if args.no_cache else CACHE_PATH)
+    print(f"Servidor de simulação em {args.socket} ({server.workers} workers)")
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+
+
+if __name__ == '__main__':
+    main()
@@ -1,6 +1,7 @@
 """
 Simulador do Algoritmo de Tomasulo
 """
+import pickle
 from typing import List, Dict, Optional
 from src.core.structures import (
     Instruction, InstructionType, InstructionStage,
@@ -9,9 +10,53 @@ from src.core.structures import (
 )
 
 
+# Marca de "chave ausente" no log de desfazer
+MISSING = object()
+
+# Políticas de seleção do estágio de execução
+SCHEDULERS = ('oldest_first', 'random', 'critical_path')
+
+
+class SimulationStalled(RuntimeError):
+    """A simulação não pode mais progredir (deadlock ou livelock)
+
+    `diagnosis` descreve o estado que bloqueia a simulação (ver
+    TomasuloSimulator.diagnose).
+    """
+    
+    def __init__(self, diagnosis: Dict):
+        self.diagnosis = diagnosis
+        super().__init__(format_diagnosis(diagnosis))
+
+
+def format_diagnosis(diagnosis: Dict) -> str:
+    """Descrição legível de um diagnóstico de bloqueio"""
+    kind = 'Deadlock' if diagnosis['reason'] == 'deadlock' else 'Livelock'
+    lines = [f"{kind} no ciclo {diagnosis['cycle']}: {diagnosis['detail']}"]
+    head = diagnosis['rob_head']
+    if head is not None:
+        lines.append(f"  Head do ROB: ROB{head['entry']} {head['instruction']} "
+                     f"(estado {head['state']}, RS {head['station'] or '-'})")
+        for operand in head['missing_operands']:
+            lines.append(f"    {operand['operand']} ({operand['register']}) aguarda "
+                         f"ROB{operand['producer']}: {operand['producer_instruction']} "
+                         f"(estado {operand['producer_state']})")
+        if head['blocking_store'] is not None:
+            lines.append(f"    Load aguarda o store ROB{head['blocking_store']}")
+    issue = diagnosis['issue_blocked']
+    if issue is not None:
+        lines.append(f"  Despacho bloqueado: {issue['instruction']} ({issue['reason']})")
+    return '\n'.join(lines)
+
+
 class TomasuloSimulator:
     """Simulador do algoritmo de Tomasulo com ROB e especulação"""
     
+    CHECKPOINT_VERSION = 2
+    # Versão do modelo temporal: incrementar quando uma mudança alterar resultados
+    # (invalida o cache de resultados)
+    MODEL_VERSION = 1
+    
     def __init__(self, config: Dict = None):
         """
         Inicializa o simulador
@@ -29,6 +74,26 @@ class TomasuloSimulator:
         self.num_store_rs = config.get('store_rs', 2)
         self.rob_size = config.get('rob_size', 16)
         
+        # Unidades funcionais por classe de RS (None = uma por reservation station)
+        self.functional_units = {
+            'Add': config.get('add_fus'),
+            'Mult': config.get('mul_fus'),
+            'Load': config.get('load_fus'),
+            'Store': config.get('store_fus'),
+        }
+        
+        # Política de seleção quando há mais instruções prontas que unidades livres
+        self.scheduler = config.get('scheduler', 'oldest_first')
+        if self.scheduler not in SCHEDULERS:
+            raise ValueError(f"Política de escalonamento desconhecida: {self.scheduler}")
+        self.scheduler_seed = config.get('scheduler_seed', 0)
+        
+        # Orçamentos de run_until_complete (None = sem limite) e detecção de bloqueio
+        self.max_cycles = config.get('max_cycles')
+        self.max_instructions = config.get('max_instructions')
+        self.deadlock_cycles = config.get('deadlock_cycles', 100)  # Ciclos sem atividade
+        self.livelock_detection = config.get('livelock_detection', True)
+        
         # Latências de execução
         self.latencies = {
             InstructionType.ADD: config.get('add_latency', 2),
@@ -51,6 +116,13 @@ class TomasuloSimulator:
         
         self._initialize_rs()
         
+        # Filas de prontas por classe: RS com operandos disponíveis que ainda não
+        # terminaram a execução (atualizadas no despacho, no broadcast e no término)
+        self._ready_queues: Dict[str, Dict[str, ReservationStation]] = {
+            op_type: {} for op_type in self.functional_units
+        }
+        self._critical_path: List[int] = []
+        
         # Reorder Buffer
         self.rob: List[ROBEntry] = [ROBEntry(i) for i in range(self.rob_size)]
         self.rob_head = 0  # Próxima entrada para commit
@@ -74,6 +146,10 @@ class TomasuloSimulator:
         self.pc = 0
         self.current_cycle = 0
         self.finished = False
+        self.idle_cycles = 0  # Ciclos consecutivos sem commit, broadcast ou atividade de FU
+        self._active = False
+        self._back_edge = False
+        self._reset_livelock()
         
         # Métricas
         self.metrics = PerformanceMetrics()
@@ -82,6 +158,29 @@ class TomasuloSimulator:
         self.speculating = False
         self.speculation_rob = None  # ROB entry do desvio especulativo
         
+        # Histórico para execução reversa (desabilitado por padrão)
+        self.history = None
+        self._undo_log = None  # Escritas esparsas do ciclo atual (registradores, memória, ...)
+        
+        # Receptores dos eventos de temporização por instrução (ver enable_timing_log)
+        self.timing_listeners = []
+        self.timing_log = None
+        
+        # Série temporal de estatísticas por intervalo (ver enable_interval_stats)
+        self.interval_stats = None
+        
+        # Versões por estrutura para snapshots incrementais (ver enable_versions)
+        self.versions = None
+        
+        # Breakpoints e watchpoints (ver enable_breakpoints)
+        self.breakpoints = None
+        
+        # Extrapolação de laços em regime estacionário (desabilitada por padrão)
+        self.loop_accelerator = None
+        if config.get('loop_acceleration', False):
+            from src.core.loop_accel import LoopAccelerator
+            self.loop_accelerator = LoopAccelerator(self)
+        
     def _initialize_rs(self):
         """Inicializa as reservation stations"""
         for i in range(self.num_add_rs):
@@ -96,6 +195,7 @@ class TomasuloSimulator:
     def load_program(self, instructions: List[Instruction]):
         """Carrega um programa para execução"""
         self.instructions = instructions
+        self._critical_path = self._critical_path_lengths(instructions)
         self.reset()
         
     def reset(self):
@@ -103,6 +203,7 @@ class TomasuloSimulator:
         # Limpar reservation stations
         for rs in self.add_rs + self.mul_rs + self.load_rs + self.store_rs:
             rs.clear()
+        self._rebuild_ready_queues()
             
         # Limpar ROB
         for entry in self.rob:
@@ -120,19 +221,134 @@ class TomasuloSimulator:
         self.pc = 0
         self.current_cycle = 0
         self.finished = False
+        self.idle_cycles = 0
         self.speculating = False
         self.speculation_rob = None
+        self._reset_livelock()
         
         # Resetar métricas
         self.metrics = PerformanceMetrics()
         
+        if self.history is not None:
+            self.history.clear()
+        if self.loop_accelerator is not None:
+            self.loop_accelerator.reset()
+        for listener in self.timing_listeners:
+            listener.reset()
+        if self.interval_stats is not None:
+            self.interval_stats.reset()
+        if self.versions is not None:
+            self.versions.invalidate()
+        if self.breakpoints is not None:
+            self.breakpoints.hits.clear()
+            self.breakpoints.rewind()
+        
     def step(self):
-        """Executa um ciclo do simulador"""
+        """
+        Executa um ciclo do simulador
+        
+        Raises:
+            SimulationStalled: se a simulação não puder mais progredir
+        """
+        if self.history is not None:
+            result = self.history.record_step()
+        else:
+            result = self._step_cycle()
+        if self.versions is not None:
+            self.versions.sync()
+        breakpoints = self.breakpoints
+        if breakpoints is not None and self.current_cycle >= breakpoints.next_cycle:
+            breakpoints.cycle_reached()
+        self._check_progress()
+        return result
+        
+    def enable_history(self, budget_bytes: int = 16 * 1024 * 1024):
+        """Passa a registrar deltas por ciclo, permitindo voltar ciclos com step_back"""
+        from src.core.history import StepHistory
+        self.history = StepHistory(self, budget_bytes)
+        
+    def enable_timing_log(self, capacity: int = 1024):
+        """Passa a registrar os ciclos de cada instrução dinâmica em colunas"""
+        from src.core.timing_log import TimingLog
+        if self.timing_log is not None:
+            self.timing_listeners.remove(self.timing_log)
+        self.timing_log = TimingLog(capacity)
+        self.timing_listeners.append(self.timing_log)
+        return self.timing_log
+        
+    def enable_interval_stats(self, interval: int = 1000, sample_every: int = 16):
+        """Passa a registrar estatísticas a cada `interval` ciclos (ver IntervalStats)"""
+        from src.core.interval_stats import IntervalStats
+        self.interval_stats = IntervalStats(self, interval, sample_every)
+        return self.interval_stats
+        
+    def enable_versions(self):
+        """Passa a manter versões por estrutura, permitindo snapshots incrementais"""
+        from src.core.snapshot import StateVersions
+        if self.versions is None:
+            self.versions = StateVersions(self)
+        return self.versions
+        
+    def snapshot(self, since: Optional[int] = None):
+        """
+        Estado tipado do simulador (StateSnapshot)
+        
+        Com versões habilitadas e `since` informado, contém apenas o que mudou
+        depois da versão `since`; caso contrário, o estado completo.
+        """
+        if self.versions is None:
+            from src.core.snapshot import full_snapshot
+            return full_snapshot(self)
+        return self.versions.snapshot(since)
+        
+    def enable_breakpoints(self):
+        """Passa a verificar breakpoints e watchpoints nos eventos do pipeline"""
+        from src.core.breakpoints import BreakpointSet
+        if self.loop_accelerator is not None:
+            raise ValueError("Breakpoints não podem ser combinados com aceleração de laços")
+        if self.breakpoints is None:
+            self.breakpoints = BreakpointSet(self)
+        return self.breakpoints
+        
+    def _breakpoints_changed(self):
+        """Gancho chamado quando o conjunto de breakpoints muda (ver CompiledSimulator)"""
+        
+    def _notify(self, event: str, rob_id: int, *args):
+        """Repassa um evento de temporização (issue, execute_start, execute_end,
+        write, commit, squash) aos receptores registrados
+
+        Os receptores também recebem `rewind(simulator)` quando o estado é
+        substituído fora do ciclo (step_back, checkpoint, resultado do cache)
+        e `reset()` no reset do simulador.
+        """
+        for listener in self.timing_listeners:
+            getattr(listener, event)(rob_id, self.current_cycle, *args)
+            
+    def step_back(self, cycles: int = 1) -> int:
+        """Desfaz até `cycles` ciclos; retorna quantos foram desfeitos"""
+        if self.history is None:
+            return 0
+        undone = self.history.step_back(cycles)
+        if self.interval_stats is not None:
+            self.interval_stats.rewind()
+        if self.versions is not None and undone:
+            self.versions.sync(self.history.last_touched)
+        if undone:
+            for listener in self.timing_listeners:
+                listener.rewind(self)
+        if self.breakpoints is not None:
+            self.breakpoints.rewind()
+        return undone
+        
+    def _step_cycle(self):
+        """Executa um ciclo (sem registro de histórico)"""
         if self.finished:
             return False
             
         self.current_cycle += 1
         self.metrics.total_cycles += 1
+        self._active = False
+        self._back_edge = False
         
         # 1. Commit (primeiro para liberar recursos)
         self._commit_stage()
@@ -146,30 +362,48 @@ class TomasuloSimulator:
         # 4. Issue (despacho de novas instruções)
         self._issue_stage()
         
+        if self.loop_accelerator is not None:
+            self.loop_accelerator.end_cycle()
+            
+        self.idle_cycles = 0 if self._active else self.idle_cycles + 1
+            
         # Verificar se terminou
         if self._is_finished():
             self.finished = True
-            return False
             
-        return True
+        if self.interval_stats is not None:
+            self.interval_stats.end_cycle()
+            
+        return not self.finished
         
     def _issue_stage(self):
         """Estágio de Issue - despacha instruções para RS e ROB"""
         # Verificar se há espaço no ROB
+        breakpoints = self.breakpoints
         if self._rob_full():
+            if not self._fetch_exhausted():
+                self.metrics.rob_full_cycles += 1
+                # Só na transição: retomar com o ROB ainda cheio não para de novo
+                if breakpoints is not None:
+                    if breakpoints.rob_full is not None and not breakpoints.rob_stalled:
+                        breakpoints.hit(breakpoints.rob_full, self.pc)
+                    breakpoints.rob_stalled = True
             return
+        if breakpoints is not None:
+            breakpoints.rob_stalled = False
             
-        # Verificar se ainda há instruções para despachar
-        if self.pc >= len(self.instructions):
+        # Buscar próxima instrução a despachar
+        inst = self._fetch()
+        if inst is None:
             return
-            
-        inst = self.instructions[self.pc]
         
-        # Obter reservation station apropriada
-        rs = self._get_free_rs(inst.type)
-        if rs is None:
-            self.metrics.stall_cycles += 1
-            return
+        # Obter reservation station apropriada (J e NOP são resolvidas no despacho)
+        rs = None
+        if inst.type not in (InstructionType.J, InstructionType.NOP):
+            rs = self._get_free_rs(inst.type)
+            if rs is None:
+                self.metrics.stall_cycles += 1
+                return
             
         # Alocar entrada no ROB
         rob_entry = self._allocate_rob()
@@ -190,64 +424,192 @@ class TomasuloSimulator:
                         InstructionType.MUL, InstructionType.DIV,
                         InstructionType.ADDI, InstructionType.LW]:
             rob_entry.dest = inst.dest
-            # Atualizar register status
-            self.register_status.set_dependency(inst.dest, rob_entry.entry_id)
         elif inst.type == InstructionType.SW:
             rob_entry.dest = f"Mem[{inst.offset}]"
             
-        # Configurar reservation station
-        rs.busy = True
-        rs.op = inst.type
-        rs.dest = rob_entry.entry_id
-        rs.instruction = inst
-        rs.cycles_remaining = self.latencies.get(inst.type, 1)
-        
-        # Obter valores dos operandos
-        self._setup_operands(rs, inst, rob_entry)
+        if rs is not None:
+            # Configurar reservation station
+            rs.busy = True
+            rs.op = inst.type
+            rs.dest = rob_entry.entry_id
+            rs.instruction = inst
+            rs.cycles_remaining = self.latencies.get(inst.type, 1)
+            
+            # Obter valores dos operandos
+            self._setup_operands(rs, inst, rob_entry)
+            if rs.is_ready():
+                self._ready_queues[rs.op_type][rs.name] = rs
+        else:
+            # Sem execução: pronta para commit
+            rob_entry.ready = True
+            rob_entry.state = "Commit"
+            
+        # Atualizar register status (após ler os operandos: ADD R4, R4, R1
+        # depende do produtor anterior de R4, não de si mesma)
+        if rob_entry.dest and inst.type != InstructionType.SW:
+            self.register_status.set_dependency(inst.dest, rob_entry.entry_id)
         
-        # Atualizar instrução
+        # Atualizar instrução (uma nova instância dinâmica da instrução estática)
+        if self._undo_log is not None:
+            self._undo_log.append(('inst', inst.pc, self._inst_state(inst)))
         inst.issue_cycle = self.current_cycle
+        inst.exec_start_cycle = None
+        inst.exec_end_cycle = None
+        inst.write_cycle = None
+        inst.commit_cycle = None
         inst.stage = InstructionStage.ISSUED
         inst.rob_entry = rob_entry.entry_id
-        inst.rs_entry = rs.name
+        inst.rs_entry = rs.name if rs is not None else None
+        if self.timing_listeners:
+            self._notify('issue', rob_entry.entry_id, inst)
+        if self.breakpoints is not None and inst.pc in self.breakpoints.issue:
+            self.breakpoints.hit(self.breakpoints.issue[inst.pc], inst.pc)
         
         # Especulação de desvios
         if inst.type in [InstructionType.BEQ, InstructionType.BNE]:
             predicted = self.branch_predictor.predict(inst.pc)
             rob_entry.branch_predicted = predicted
             
-            if predicted:
-                # Desvio predito como tomado - começar especulação
+            # Instruções seguintes são especulativas até o desvio ser resolvido
+            if not self.speculating:
                 self.speculating = True
                 self.speculation_rob = rob_entry.entry_id
                 
         # Avançar PC
-        self.pc += 1
+        self._advance_fetch(inst, rob_entry)
         self.metrics.instructions_issued += 1
         
+    def _fetch(self) -> Optional[Instruction]:
+        """Retorna a próxima instrução a despachar (ou None se não houver)"""
+        if self._fetch_exhausted():
+            return None
+        return self.instructions[self.pc]
+        
+    def _fetch_exhausted(self) -> bool:
+        """Verifica se todas as instruções já foram despachadas"""
+        return self.pc >= len(self.instructions)
+        
+    def _advance_fetch(self, inst: Instruction, rob_entry: ROBEntry):
+        """Avança o PC após o despacho de uma instrução, seguindo a predição de desvios"""
+        if inst.type in (InstructionType.BEQ, InstructionType.BNE):
+            self.pc = self._branch_target(inst, rob_entry.branch_predicted)
+        elif inst.type == InstructionType.J:
+            self.pc = self._branch_target(inst, True)
+        else:
+            self.pc += 1
+            
+    def _branch_target(self, inst: Instruction, taken: bool) -> int:
+        """PC seguinte a um desvio, conforme tomado ou não"""
+        if taken and inst.target is not None:
+            return inst.target
+        return inst.pc + 1
+        
+    def _redirect(self, pc: int):
+        """Redireciona a busca após uma misprediction"""
+        self.pc = pc
+        
+    def _fast_forward(self, instructions: int):
+        """Avisa que `instructions` instruções dinâmicas foram saltadas pela aceleração de laços"""
+        
     def _execute_stage(self):
-        """Estágio de Execute - executa instruções prontas"""
-        all_rs = self.add_rs + self.mul_rs + self.load_rs + self.store_rs
+        """Estágio de Execute - executa instruções prontas, limitado pelas unidades funcionais"""
+        for op_type, queue in self._ready_queues.items():
+            if queue:
+                for rs in self._select_ready(op_type, queue):
+                    self._execute_station(rs)
+                    
+    def _select_ready(self, op_type: str, queue: Dict[str, ReservationStation]) -> List[ReservationStation]:
+        """
+        Estações da fila de prontas que usam uma unidade funcional neste ciclo
         
-        for rs in all_rs:
-            if not rs.busy:
-                continue
+        Instruções que já começaram a executar mantêm sua unidade até terminar;
+        as unidades livres vão para as instruções escolhidas pela política. O
+        início é detectado pela própria estação: instâncias dinâmicas da mesma
+        instrução estática (laços) compartilham os campos de ciclo da Instruction.
+        """
+        units = self.functional_units[op_type]
+        if units is None or len(queue) <= units:
+            return list(queue.values())
+        running = []
+        waiting = []
+        for rs in queue.values():
+            if rs.cycles_remaining < self.latencies.get(rs.op, 1):
+                running.append(rs)
+            else:
+                waiting.append(rs)
+        free = units - len(running)
+        if free <= 0:
+            return running
+        waiting.sort(key=self._schedule_key)
+        return running + waiting[:free]
+        
+    def _schedule_key(self, rs: ReservationStation) -> tuple:
+        """Prioridade de uma estação pronta (menor primeiro) segundo a política"""
+        age = (rs.dest - self.rob_head) % self.rob_size
+        if self.scheduler == 'critical_path':
+            return (-self._critical_path[rs.instruction.pc], age)
+        if self.scheduler == 'random':
+            # Sem estado: a escolha depende só do ciclo e da entrada do ROB, o que a
+            # mantém reproduzível em checkpoints e na execução reversa
+            return (hash((self.scheduler_seed, self.current_cycle, rs.dest)), age)
+        return (age,)
+        
+    def _execute_station(self, rs: ReservationStation):
+        """Avança um ciclo de execução de uma estação pronta"""
+        if rs.cycles_remaining > 0:
+            if self.timing_listeners and rs.cycles_remaining == self.latencies.get(rs.op, 1):
+                self._notify('execute_start', rs.dest)
+            rs.cycles_remaining -= 1
+            self._active = True
+            if rs.instruction:
+                rs.instruction.stage = InstructionStage.EXECUTING
+                if rs.instruction.exec_start_cycle is None:
+                    rs.instruction.exec_start_cycle = self.current_cycle
+                    
+        # Se terminou execução
+        if rs.cycles_remaining == 0:
+            # Loads esperam stores mais antigos resolverem endereço
+            if rs.op == InstructionType.LW and self._load_blocked(rs):
+                return
+            self._execute_operation(rs)
+            del self._ready_queues[rs.op_type][rs.name]
+            self._active = True
+            if rs.instruction:
+                rs.instruction.exec_end_cycle = self.current_cycle
+            if self.timing_listeners:
+                self._notify('execute_end', rs.dest)
                 
-            # Verificar se está pronta para executar
-            if rs.is_ready():
-                if rs.cycles_remaining > 0:
-                    rs.cycles_remaining -= 1
-                    if rs.instruction:
-                        rs.instruction.stage = InstructionStage.EXECUTING
-                        if rs.instruction.exec_start_cycle is None:
-                            rs.instruction.exec_start_cycle = self.current_cycle
-                            
-                # Se terminou execução
-                if rs.cycles_remaining == 0:
-                    self._execute_operation(rs)
-                    if rs.instruction:
-                        rs.instruction.exec_end_cycle = self.current_cycle
-                        
+    def _rebuild_ready_queues(self):
+        """Reconstrói as filas de prontas a partir do estado das reservation stations
+        
+        Necessário sempre que o estado das RS é restaurado diretamente
+        (checkpoints, execução reversa, cache de blocos).
+        """
+        for queue in self._ready_queues.values():
+            queue.clear()
+        for rs in self._all_rs():
+            if rs.is_ready() and not self.rob[rs.dest].ready:
+                self._ready_queues[rs.op_type][rs.name] = rs
+                
+    def _critical_path_lengths(self, instructions: List[Instruction]) -> List[int]:
+        """
+        Comprimento do caminho crítico (soma de latências) de cada instrução
+        até o fim do programa, pelas dependências RAW em ordem estática
+        """
+        lengths = [0] * len(instructions)
+        readers: Dict[str, int] = {}  # Maior caminho entre os leitores seguintes de cada registrador
+        for index in range(len(instructions) - 1, -1, -1):
+            inst = instructions[index]
+            length = self.latencies.get(inst.type, 1)
+            if inst.dest and inst.type != InstructionType.SW:
+                length += readers.get(inst.dest, 0)
+                readers[inst.dest] = 0
+            for src in (inst.src1, inst.src2):
+                if src:
+                    readers[src] = max(readers.get(src, 0), length)
+            lengths[index] = length
+        return lengths
+        
     def _execute_operation(self, rs: ReservationStation):
         """Executa a operação e calcula o resultado"""
         inst = rs.instruction
@@ -270,33 +632,50 @@ class TomasuloSimulator:
             rob_entry.ready = True
         elif inst.type == InstructionType.LW:
             address = rs.vj + inst.offset
-            rob_entry.value = self.memory.get(address, 0)
+            rs.address = address
+            rob_entry.value = self._load_value(rs.dest, address)
             rob_entry.ready = True
         elif inst.type == InstructionType.SW:
             address = rs.vj + inst.offset
             rs.address = address
+            rob_entry.address = address
             rob_entry.value = rs.vk  # Valor a armazenar
             rob_entry.ready = True
         elif inst.type in [InstructionType.BEQ, InstructionType.BNE]:
             # Avaliar condição de desvio
-            if inst.type == InstructionType.BEQ:
-                taken = (rs.vj == rs.vk)
-            else:  # BNE
-                taken = (rs.vj != rs.vk)
-                
-            rob_entry.branch_actual = taken
+            # (o preditor é atualizado e mispredictions tratadas no commit)
+            rob_entry.branch_actual = self._branch_outcome(rs, inst)
             rob_entry.ready = True
-            
-            # Atualizar preditor
-            self.branch_predictor.update(inst.pc, taken)
-            
-            # Verificar misprediction
-            if rob_entry.branch_predicted != taken:
-                self.metrics.branch_mispredictions += 1
-                # O flush será feito no commit
                 
         rob_entry.state = "Write"
         
+    def _branch_outcome(self, rs: ReservationStation, inst: Instruction) -> bool:
+        """Avalia se o desvio é tomado"""
+        if inst.type == InstructionType.BEQ:
+            return rs.vj == rs.vk
+        return rs.vj != rs.vk  # BNE
+        
+    def _load_blocked(self, rs: ReservationStation) -> bool:
+        """Verifica se há store mais antigo no ROB ainda sem endereço/valor"""
+        idx = self.rob_head
+        while idx != rs.dest:
+            entry = self.rob[idx]
+            if entry.busy and entry.instruction.type == InstructionType.SW and not entry.ready:
+                return True
+            idx = (idx + 1) % self.rob_size
+        return False
+        
+    def _load_value(self, rob_id: int, address: int) -> int:
+        """Lê a memória, encaminhando o valor do store mais recente ao mesmo endereço"""
+        value = self.memory.get(address, 0)
+        idx = self.rob_head
+        while idx != rob_id:
+            entry = self.rob[idx]
+            if entry.busy and entry.instruction.type == InstructionType.SW and entry.address == address:
+                value = entry.value
+            idx = (idx + 1) % self.rob_size
+        return value
+        
     def _write_result_stage(self):
         """Estágio de Write Result - broadcast de resultados"""
         all_rs = self.add_rs + self.mul_rs + self.load_rs + self.store_rs
@@ -311,19 +690,24 @@ class TomasuloSimulator:
             if rob_entry.ready and rob_entry.state == "Write":
                 # Broadcast para outras reservation stations
                 for other_rs in all_rs:
-                    if other_rs.busy:
+                    if other_rs.busy and rs.dest in (other_rs.qj, other_rs.qk):
                         if other_rs.qj == rs.dest:
                             other_rs.vj = rob_entry.value
                             other_rs.qj = None
                         if other_rs.qk == rs.dest:
                             other_rs.vk = rob_entry.value
                             other_rs.qk = None
+                        if other_rs.is_ready():
+                            self._ready_queues[other_rs.op_type][other_rs.name] = other_rs
                             
                 # Marcar como escrito
                 rob_entry.state = "Commit"
+                self._active = True
                 if rs.instruction:
                     rs.instruction.write_cycle = self.current_cycle
                     rs.instruction.stage = InstructionStage.WRITE_RESULT
+                if self.timing_listeners:
+                    self._notify('write', rs.dest)
                     
                 # Liberar reservation station
                 rs.clear()
@@ -337,16 +721,29 @@ class TomasuloSimulator:
             return
             
         inst = rob_entry.instruction
+        self._active = True
         
-        # Verificar misprediction de desvio
-        if inst.type in [InstructionType.BEQ, InstructionType.BNE]:
-            if rob_entry.branch_predicted != rob_entry.branch_actual:
-                # Flush de instruções especulativas
-                self._flush_speculative_instructions()
-                # Corrigir PC
-                # (simplificado - em implementação real calcularia endereço correto)
-                self.speculating = False
-                self.speculation_rob = None
+        # Resolver desvio: treinar o preditor e tratar misprediction
+        is_branch = inst.type in [InstructionType.BEQ, InstructionType.BNE]
+        if is_branch:
+            taken = rob_entry.branch_actual
+            correct = rob_entry.branch_predicted == taken
+            self._update_predictor(inst.pc, taken)
+            self.branch_predictor.record_prediction(correct)
+            if not correct:
+                self.metrics.branch_mispredictions += 1
+                if self.breakpoints is not None and self.breakpoints.mispredict is not None:
+                    self.breakpoints.hit(self.breakpoints.mispredict, inst.pc)
+                # Descartar tudo o que foi buscado depois do desvio e corrigir o PC
+                self._flush_speculative_instructions(rob_entry)
+                self._redirect(self._branch_target(inst, taken))
+            if self.loop_accelerator is not None:
+                self.loop_accelerator.back_edge_committed(inst, taken, correct)
+                
+        # Laços só podem repetir estado em desvios para trás
+        if inst.target is not None and inst.target <= inst.pc and (
+                inst.type == InstructionType.J or (is_branch and rob_entry.branch_actual)):
+            self._back_edge = True
                 
         # Commit baseado no tipo de instrução
         if inst.type in [InstructionType.ADD, InstructionType.SUB,
@@ -354,29 +751,59 @@ class TomasuloSimulator:
                         InstructionType.ADDI, InstructionType.LW]:
             # Escrever no registrador
             if rob_entry.dest:
-                self.registers[rob_entry.dest] = rob_entry.value
+                self._write_register(rob_entry.dest, rob_entry.value)
                 # Limpar dependência se ainda aponta para este ROB
                 if self.register_status.get_producer(rob_entry.dest) == rob_entry.entry_id:
                     self.register_status.clear_dependency(rob_entry.dest)
                     
         elif inst.type == InstructionType.SW:
-            # Escrever na memória
-            # Encontrar o endereço calculado
-            for rs in self.store_rs:
-                if rs.instruction == inst and rs.address is not None:
-                    self.memory[rs.address] = rob_entry.value
-                    break
+            # Escrever na memória (endereço calculado na execução)
+            if rob_entry.address is not None:
+                self._write_memory(rob_entry.address, rob_entry.value)
                     
         # Atualizar instrução
         inst.commit_cycle = self.current_cycle
         inst.stage = InstructionStage.COMMIT
+        if self.timing_listeners:
+            self._notify('commit', rob_entry.entry_id)
+        if self.breakpoints is not None and inst.pc in self.breakpoints.commit:
+            self.breakpoints.hit(self.breakpoints.commit[inst.pc], inst.pc)
         
         # Liberar ROB entry
         rob_entry.clear()
         self.rob_head = (self.rob_head + 1) % self.rob_size
         
+        if is_branch:
+            self._update_speculation()
+            
         self.metrics.instructions_completed += 1
         
+    def _write_register(self, reg: str, value: int):
+        """Escreve no banco de registradores (registrando o valor antigo, se necessário)"""
+        if self._undo_log is not None:
+            self._undo_log.append(('reg', reg, self.registers.get(reg, MISSING)))
+        if self.versions is not None:
+            self.versions.touch_register(reg)
+        self.registers[reg] = value
+        if self.breakpoints is not None and reg in self.breakpoints.registers:
+            self.breakpoints.hit(self.breakpoints.registers[reg], value)
+        
+    def _write_memory(self, address: int, value: int):
+        """Escreve na memória (registrando o valor antigo, se necessário)"""
+        if self._undo_log is not None:
+            self._undo_log.append(('mem', address, self.memory.get(address, MISSING)))
+        if self.versions is not None:
+            self.versions.touch_memory(address)
+        self.memory[address] = value
+        if self.breakpoints is not None and address in self.breakpoints.memory:
+            self.breakpoints.hit(self.breakpoints.memory[address], value)
+        
+    def _update_predictor(self, pc: int, taken: bool):
+        """Atualiza o preditor (registrando o estado antigo, se necessário)"""
+        if self._undo_log is not None:
+            self._undo_log.append(('bp', pc, self.branch_predictor.table.get(pc, MISSING)))
+        self.branch_predictor.update(pc, taken)
+        
     def _setup_operands(self, rs: ReservationStation, inst: Instruction, rob_entry: ROBEntry):
         """Configura os operandos da reservation station"""
         # Operando J (src1)
@@ -403,35 +830,44 @@ class TomasuloSimulator:
             else:
                 rs.vk = self.registers.get(inst.src2, 0)
                 
-    def _get_free_rs(self, inst_type: InstructionType) -> Optional[ReservationStation]:
-        """Retorna uma reservation station livre do tipo apropriado"""
+    def _rs_pool(self, inst_type: InstructionType) -> List[ReservationStation]:
+        """Reservation stations que podem receber o tipo de instrução"""
         if inst_type in [InstructionType.ADD, InstructionType.SUB, InstructionType.ADDI]:
-            for rs in self.add_rs:
-                if not rs.busy:
-                    return rs
+            return self.add_rs
         elif inst_type in [InstructionType.MUL, InstructionType.DIV]:
-            for rs in self.mul_rs:
-                if not rs.busy:
-                    return rs
+            return self.mul_rs
         elif inst_type == InstructionType.LW:
-            for rs in self.load_rs:
-                if not rs.busy:
-                    return rs
+            return self.load_rs
         elif inst_type == InstructionType.SW:
-            for rs in self.store_rs:
-                if not rs.busy:
-                    return rs
+            return self.store_rs
         elif inst_type in [InstructionType.BEQ, InstructionType.BNE]:
             # Desvios podem usar Add RS
-            for rs in self.add_rs:
-                if not rs.busy:
-                    return rs
+            return self.add_rs
+        return []
+        
+    def _get_free_rs(self, inst_type: InstructionType) -> Optional[ReservationStation]:
+        """Retorna uma reservation station livre do tipo apropriado"""
+        for rs in self._rs_pool(inst_type):
+            if not rs.busy:
+                return rs
         return None
         
     def _rob_full(self) -> bool:
         """Verifica se o ROB está cheio"""
-        next_tail = (self.rob_tail + 1) % self.rob_size
-        return next_tail == self.rob_head and self.rob[self.rob_tail].busy
+        # O tail aponta para a próxima entrada livre; se está ocupada, o ROB está cheio
+        return self.rob[self.rob_tail].busy
+        
+    def _in_flight_entries(self) -> List[ROBEntry]:
+        """Entradas ocupadas do ROB, da mais antiga (head) à mais nova"""
+        entries = []
+        idx = self.rob_head
+        for _ in range(self.rob_size):
+            entry = self.rob[idx]
+            if not entry.busy:
+                break
+            entries.append(entry)
+            idx = (idx + 1) % self.rob_size
+        return entries
         
     def _allocate_rob(self) -> Optional[ROBEntry]:
         """Aloca uma entrada do ROB"""
@@ -442,44 +878,219 @@ class TomasuloSimulator:
         self.rob_tail = (self.rob_tail + 1) % self.rob_size
         return entry
         
-    def _flush_speculative_instructions(self):
-        """Limpa instruções especulativas após misprediction"""
-        # Limpar reservation stations com instruções especulativas
+    def _flush_speculative_instructions(self, branch_entry: ROBEntry):
+        """Limpa as instruções buscadas após um desvio com misprediction"""
+        flushed = set()
+        idx = (branch_entry.entry_id + 1) % self.rob_size
+        while idx != self.rob_tail and self.rob[idx].busy:
+            flushed.add(idx)
+            if self.timing_listeners:
+                self._notify('squash', idx)
+            self.rob[idx].clear()
+            idx = (idx + 1) % self.rob_size
+        self.rob_tail = (branch_entry.entry_id + 1) % self.rob_size
+        
+        # Limpar reservation stations das instruções descartadas
         for rs in self.add_rs + self.mul_rs + self.load_rs + self.store_rs:
-            if rs.busy and rs.instruction and rs.instruction.rob_entry is not None:
-                rob_entry = self.rob[rs.instruction.rob_entry]
-                if rob_entry.speculative:
-                    rs.clear()
-                    
-        # Limpar ROB entries especulativas
-        for entry in self.rob:
-            if entry.busy and entry.speculative:
-                # Limpar dependências de registradores
-                if entry.dest and entry.dest.startswith('R'):
-                    if self.register_status.get_producer(entry.dest) == entry.entry_id:
-                        self.register_status.clear_dependency(entry.dest)
-                entry.clear()
+            if rs.busy and rs.dest in flushed:
+                self._ready_queues[rs.op_type].pop(rs.name, None)
+                rs.clear()
                 
+        # Reconstruir o status de registradores a partir das entradas restantes
+        self.register_status = RegisterStatus()
+        idx = self.rob_head
+        while idx != self.rob_tail:
+            entry = self.rob[idx]
+            if entry.busy and entry.dest and entry.instruction.type not in (
+                    InstructionType.SW, InstructionType.BEQ, InstructionType.BNE):
+                self.register_status.set_dependency(entry.dest, idx)
+            idx = (idx + 1) % self.rob_size
+            
+    def _update_speculation(self):
+        """Aponta a especulação para o desvio pendente mais antigo, ou a encerra"""
+        idx = self.rob_head
+        for _ in range(self.rob_size):
+            entry = self.rob[idx]
+            if not entry.busy:
+                break
+            if entry.instruction.type in (InstructionType.BEQ, InstructionType.BNE):
+                self.speculation_rob = idx
+                return
+            idx = (idx + 1) % self.rob_size
+        self.speculating = False
+        self.speculation_rob = None
+        for entry in self.rob:
+            entry.speculative = False
         
     def _is_finished(self) -> bool:
         """Verifica se a simulação terminou"""
         # Terminou se todas as instruções foram despachadas e ROB está vazio
-        if self.pc >= len(self.instructions):
+        if self._fetch_exhausted():
             for entry in self.rob:
                 if entry.busy:
                     return False
             return True
         return False
         
-    def run_until_complete(self):
-        """Executa até completar todas as instruções"""
+    def run_until_complete(self) -> bool:
+        """
+        Executa até completar todas as instruções, respeitando os orçamentos
+        de ciclos e instruções da configuração
+        
+        Returns:
+            True se terminou, False se um orçamento foi atingido antes
+            
+        Raises:
+            SimulationStalled: se a simulação não puder mais progredir
+        """
         while not self.finished:
+            if self._budget_exhausted():
+                return False
             self.step()
-            # Proteção contra loop infinito
-            if self.current_cycle > 10000:
-                print("Aviso: Simulação excedeu 10000 ciclos")
-                break
+        return True
+        
+    def run_to_breakpoint(self) -> list:
+        """
+        Executa até o fim do ciclo em que algum breakpoint é atingido, até
+        completar ou até esgotar um orçamento
+        
+        Returns:
+            BreakpointHit atingidos no ciclo da parada (vazia se não houve)
+            
+        Raises:
+            SimulationStalled: se a simulação não puder mais progredir
+        """
+        breakpoints = self.breakpoints
+        if breakpoints is None:
+            self.run_until_complete()
+            return []
+        hits = breakpoints.hits
+        hits.clear()
+        while not self.finished and not hits and not self._budget_exhausted():
+            self.step()
+        return list(hits)
+        
+    def _budget_exhausted(self) -> bool:
+        """Orçamentos de ciclos e instruções da configuração"""
+        return ((self.max_cycles is not None and self.current_cycle >= self.max_cycles)
+                or (self.max_instructions is not None
+                    and self.metrics.instructions_completed >= self.max_instructions))
+        
+    # Detecção de deadlock e livelock
+    
+    def _check_progress(self):
+        """Aborta a simulação se ela estiver comprovadamente bloqueada"""
+        if self.finished:
+            return
+        if self.deadlock_cycles and self.idle_cycles >= self.deadlock_cycles:
+            raise SimulationStalled(self.diagnose(
+                'deadlock', f'{self.idle_cycles} ciclos sem commit, broadcast ou atividade de FU'))
+        if self._back_edge and self.livelock_detection:
+            self._check_livelock()
+            
+    def _reset_livelock(self):
+        self._lasso_reference = None
+        self._lasso_power = 1
+        self._lasso_count = 0
+        
+    def _livelock_key(self) -> tuple:
+        """Estado completo que determina o futuro (sem ciclo, métricas nem memória)"""
+        control = self._control_state()
+        return (control[:3] + control[4:],
+                tuple(self._rs_state(rs) for rs in self._all_rs()),
+                tuple(self._rob_state(entry) for entry in self.rob),
+                tuple(sorted(self.register_status.reorder.items())),
+                tuple(sorted(self.registers.items())),
+                tuple(sorted(self.branch_predictor.table.items())))
+                
+    def _check_livelock(self):
+        """
+        Detecção de ciclos de estado (algoritmo de Brent) nos desvios para trás
+        
+        Um estado completo repetido significa que a simulação repete o mesmo
+        trecho indefinidamente. A memória só é comparada quando o restante coincide.
+        """
+        key = self._livelock_key()
+        reference = self._lasso_reference
+        if reference is not None and reference[0] == key and reference[1] == self.memory:
+            raise SimulationStalled(self.diagnose(
+                'livelock', f'estado repetido após {self.current_cycle - reference[2]} ciclos'))
+        self._lasso_count += 1
+        if self._lasso_count >= self._lasso_power:
+            self._lasso_reference = (key, dict(self.memory), self.current_cycle)
+            self._lasso_power *= 2
+            self._lasso_count = 0
+            
+    def diagnose(self, reason: str = 'deadlock', detail: str = '') -> Dict:
+        """
+        Diagnóstico estruturado do que impede o progresso
+        
+        Returns:
+            Dicionário com o motivo, a entrada na cabeça do ROB (operandos
+            ausentes e seus produtores, store que bloqueia um load) e o motivo
+            de o despacho estar bloqueado, quando for o caso
+        """
+        head = self.rob[self.rob_head]
+        head_info = None
+        if head.busy:
+            inst = head.instruction
+            rs = next((rs for rs in self._all_rs() if rs.busy and rs.dest == head.entry_id), None)
+            missing = []
+            if rs is not None:
+                for operand, producer, register in (('Vj', rs.qj, inst.src1), ('Vk', rs.qk, inst.src2)):
+                    if producer is None:
+                        continue
+                    producer_entry = self.rob[producer]
+                    missing.append({
+                        'operand': operand,
+                        'register': register,
+                        'producer': producer,
+                        'producer_instruction': (str(producer_entry.instruction)
+                                                 if producer_entry.busy else '-'),
+                        'producer_state': producer_entry.state if producer_entry.busy else 'Livre',
+                    })
+            blocking_store = None
+            if rs is not None and rs.op == InstructionType.LW and rs.is_ready():
+                idx = self.rob_head
+                while idx != rs.dest:
+                    entry = self.rob[idx]
+                    if entry.busy and entry.instruction.type == InstructionType.SW and not entry.ready:
+                        blocking_store = idx
+                        break
+                    idx = (idx + 1) % self.rob_size
+            head_info = {
+                'entry': head.entry_id,
+                'instruction': str(inst),
+                'pc': inst.pc,
+                'state': head.state,
+                'ready': head.ready,
+                'station': rs.name if rs is not None else None,
+                'missing_operands': missing,
+                'blocking_store': blocking_store,
+            }
+            
+        issue_info = None
+        inst = self._fetch()
+        if inst is not None:
+            if self._rob_full():
+                issue_info = {'instruction': str(inst), 'pc': inst.pc, 'reason': 'ROB cheio'}
+            elif (inst.type not in (InstructionType.J, InstructionType.NOP)
+                    and self._get_free_rs(inst.type) is None):
+                pool = self._rs_pool(inst.type)
+                blocked = (f'nenhuma reservation station para {inst.type.value}' if not pool
+                           else f'todas as {len(pool)} reservation stations ocupadas')
+                issue_info = {'instruction': str(inst), 'pc': inst.pc, 'reason': blocked,
+                              'stations': [rs.name for rs in pool]}
                 
+        return {
+            'reason': reason,
+            'detail': detail,
+            'cycle': self.current_cycle,
+            'pc': self.pc,
+            'rob_head': head_info,
+            'issue_blocked': issue_info,
+        }
+        
     def get_state_snapshot(self) -> Dict:
         """Retorna um snapshot do estado atual do simulador"""
         return {
@@ -497,3 +1108,142 @@ class TomasuloSimulator:
             'metrics': str(self.metrics),
             'finished': self.finished
         }
+        
+    def _rs_state(self, rs: ReservationStation) -> tuple:
+        """Estado de uma reservation station como tupla"""
+        return (rs.busy, rs.op, rs.vj, rs.vk, rs.qj, rs.qk, rs.dest, rs.address,
+                rs.instruction.pc if rs.instruction else None, rs.cycles_remaining)
+                
+    def _set_rs_state(self, rs: ReservationStation, state: tuple):
+        (rs.busy, rs.op, rs.vj, rs.vk, rs.qj, rs.qk, rs.dest, rs.address,
+         inst_pc, rs.cycles_remaining) = state
+        rs.instruction = self.instructions[inst_pc] if inst_pc is not None else None
+        
+    def _rob_state(self, entry: ROBEntry) -> tuple:
+        """Estado de uma entrada do ROB como tupla"""
+        return (entry.busy, entry.instruction.pc if entry.instruction else None,
+                entry.state, entry.dest, entry.value, entry.address, entry.ready,
+                entry.speculative, entry.branch_predicted, entry.branch_actual)
+                
+    def _set_rob_state(self, entry: ROBEntry, state: tuple):
+        (entry.busy, inst_pc, entry.state, entry.dest, entry.value, entry.address,
+         entry.ready, entry.speculative, entry.branch_predicted,
+         entry.branch_actual) = state
+        entry.instruction = self.instructions[inst_pc] if inst_pc is not None else None
+        
+    def _inst_state(self, inst: Instruction) -> tuple:
+        """Campos de execução de uma instrução como tupla"""
+        return (inst.stage, inst.issue_cycle, inst.exec_start_cycle, inst.exec_end_cycle,
+                inst.write_cycle, inst.commit_cycle, inst.rob_entry, inst.rs_entry)
+                
+    def _set_inst_state(self, inst: Instruction, state: tuple):
+        (inst.stage, inst.issue_cycle, inst.exec_start_cycle, inst.exec_end_cycle,
+         inst.write_cycle, inst.commit_cycle, inst.rob_entry, inst.rs_entry) = state
+         
+    def _control_state(self) -> tuple:
+        """Escalares de controle (PC, ciclo, head/tail do ROB, especulação)"""
+        return (self.rob_head, self.rob_tail, self.pc, self.current_cycle,
+                self.finished, self.speculating, self.speculation_rob, self.idle_cycles)
+                
+    def _set_control_state(self, state: tuple):
+        (self.rob_head, self.rob_tail, self.pc, self.current_cycle,
+         self.finished, self.speculating, self.speculation_rob, self.idle_cycles) = state
+        self._reset_livelock()
+         
+    def _all_rs(self) -> List[ReservationStation]:
+        """Todas as reservation stations, em ordem fixa"""
+        return self.add_rs + self.mul_rs + self.load_rs + self.store_rs
+        
+    def capture_state(self) -> Dict:
+        """
+        Captura o estado completo do simulador (exceto o programa e a configuração)
+        
+        Instruções são referenciadas pelo índice (PC) no programa carregado.
+        """
+        return {
+            'version': self.CHECKPOINT_VERSION,
+            'program_size': len(self.instructions),
+            'rob_size': self.rob_size,
+            'rs_counts': [len(l) for l in (self.add_rs, self.mul_rs, self.load_rs, self.store_rs)],
+            'rs': [self._rs_state(rs) for rs in self._all_rs()],
+            'rob': [self._rob_state(entry) for entry in self.rob],
+            'instructions': [self._inst_state(inst) for inst in self.instructions],
+            'control': self._control_state(),
+            'register_status': dict(self.register_status.reorder),
+            'registers': dict(self.registers),
+            'memory': dict(self.memory),
+            'predictor': (dict(self.branch_predictor.table),
+                          self.branch_predictor.predictions,
+                          self.branch_predictor.correct_predictions),
+            'metrics': dict(vars(self.metrics)),
+        }
+        
+    def restore_state(self, state: Dict):
+        """Restaura um estado obtido com capture_state"""
+        if state.get('version') != self.CHECKPOINT_VERSION:
+            raise ValueError("Versão de checkpoint incompatível")
+        if state['program_size'] != len(self.instructions):
+            raise ValueError("Checkpoint não corresponde ao programa carregado")
+        rs_counts = [len(l) for l in (self.add_rs, self.mul_rs, self.load_rs, self.store_rs)]
+        if state['rob_size'] != self.rob_size or state['rs_counts'] != rs_counts:
+            raise ValueError("Checkpoint não corresponde ao número de RS/entradas do ROB")
+            
+        for rs, saved in zip(self._all_rs(), state['rs']):
+            self._set_rs_state(rs, saved)
+        for entry, saved in zip(self.rob, state['rob']):
+            self._set_rob_state(entry, saved)
+        for inst, saved in zip(self.instructions, state['instructions']):
+            self._set_inst_state(inst, saved)
+            
+        self._set_control_state(state['control'])
+        self.register_status.reorder = dict(state['register_status'])
+        self.registers = dict(state['registers'])
+        self.memory = dict(state['memory'])
+        
+        table, predictions, correct = state['predictor']
+        self.branch_predictor.table = dict(table)
+        self.branch_predictor.predictions = predictions
+        self.branch_predictor.correct_predictions = correct
+        
+        vars(self.metrics).update(state['metrics'])
+        self._rebuild_ready_queues()
+        self._state_replaced()
+        
+    def _state_replaced(self):
+        """Estado substituído por fora do ciclo (checkpoint, resultado do cache...)"""
+        # Deltas, laço observado e série anteriores não valem para o novo estado
+        if self.history is not None:
+            self.history.clear()
+        if self.loop_accelerator is not None:
+            self.loop_accelerator.reset()
+        if self.interval_stats is not None:
+            self.interval_stats.reset()
+        for listener in self.timing_listeners:
+            listener.rewind(self)
+        if self.versions is not None:
+            self.versions.invalidate()
+        if self.breakpoints is not None:
+            self.breakpoints.rewind()
+
+    def save_checkpoint(self) -> bytes:
+        """Serializa o estado completo do simulador"""
+        return pickle.dumps(self.capture_state(), protocol=pickle.HIGHEST_PROTOCOL)
+        
+    def load_checkpoint(self, data: bytes):
+        """
+        Restaura um checkpoint gerado por save_checkpoint
+        
+        O programa deve estar carregado e o número de RS/entradas do ROB deve ser
+        o mesmo; latências podem diferir (warm start de varreduras com prefixo comum).
+        """
+        self.restore_state(pickle.loads(data))
+        
+    def save_checkpoint_file(self, path: str):
+        """Grava um checkpoint em arquivo"""
+        with open(path, 'wb') as f:
+            f.write(self.save_checkpoint())
+            
+    def load_checkpoint_file(self, path: str):
+        """Restaura um checkpoint gravado com save_checkpoint_file"""
+        with open(path, 'rb') as f:
+            self.load_checkpoint(f.read())
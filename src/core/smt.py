@@ -0,0 +1,325 @@
+"""
+Multithreading simultâneo (SMT): vários programas em um mesmo núcleo
+
+Cada thread tem seu PC, registradores, status de registradores, memória
+(espaços de endereçamento independentes) e preditor de desvios. Reservation
+stations, unidades funcionais, CDB e ROB são compartilhados.
+
+O ROB é um conjunto de entradas; cada thread mantém a ordem de programa das
+suas entradas, o que permite commit em ordem e descarte por misprediction
+independentes por thread. Com partição 'static' cada thread pode ocupar no
+máximo sua fração do ROB; com 'shared' qualquer entrada livre serve.
+
+A cada ciclo há um despacho e um commit, como no núcleo de uma thread. A
+política de busca ('round_robin' ou 'icount') ordena as threads candidatas
+ao despacho; se a escolhida estiver bloqueada, a próxima é tentada. ICOUNT
+prioriza a thread com menos instruções aguardando ou em execução nas RS. O
+commit alterna entre as threads com instrução pronta no head.
+
+A implementação reaproveita os estágios do TomasuloSimulator ativando o
+contexto da thread (PC, registradores, etc.) antes de cada operação.
+"""
+import copy
+from typing import List, Dict, Optional
+from src.core.structures import (
+    Instruction, InstructionType, ReservationStation, ROBEntry,
+    RegisterStatus, BranchPredictor, PerformanceMetrics
+)
+from src.core.simulator import TomasuloSimulator
+
+
+FETCH_POLICIES = ('round_robin', 'icount')
+ROB_PARTITIONS = ('shared', 'static')
+
+
+class ThreadContext:
+    """Estado arquitetural e de busca de uma thread"""
+
+    def __init__(self, tid: int, instructions: List[Instruction], critical_path: List[int]):
+        self.tid = tid
+        self.instructions = instructions
+        self.critical_path = critical_path
+        self.pc = 0
+        self.registers = {f'R{i}': 0 for i in range(32)}
+        self.memory = {}
+        self.register_status = RegisterStatus()
+        self.branch_predictor = BranchPredictor()
+        self.speculating = False
+        self.speculation_rob = None
+        self.entries: List[int] = []  # Entradas do ROB da thread, em ordem de programa
+        self.metrics = PerformanceMetrics()  # total_cycles = ciclo em que a thread terminou
+        self.finished = False
+
+
+class SMTSimulator(TomasuloSimulator):
+    """Núcleo de Tomasulo compartilhado por várias threads
+
+    Configuração adicional: 'fetch_policy' ('round_robin' ou 'icount') e
+    'rob_partition' ('shared' ou 'static'). Histórico, checkpoints,
+    aceleração de laços e detecção de livelock não são suportados.
+    """
+
+    def __init__(self, config: Dict = None):
+        config = dict(config or {})
+        if config.get('loop_acceleration'):
+            raise ValueError("Aceleração de laços não é suportada com SMT")
+        super().__init__(config)
+        self.fetch_policy = config.get('fetch_policy', 'round_robin')
+        if self.fetch_policy not in FETCH_POLICIES:
+            raise ValueError(f"Política de busca desconhecida: {self.fetch_policy}")
+        self.rob_partition = config.get('rob_partition', 'shared')
+        if self.rob_partition not in ROB_PARTITIONS:
+            raise ValueError(f"Partição do ROB desconhecida: {self.rob_partition}")
+        # O estado de livelock incluiria só a thread ativa
+        self.livelock_detection = False
+
+        self.threads: List[ThreadContext] = []
+        self._programs: List[List[Instruction]] = []
+        self._thread_of: Dict[Instruction, ThreadContext] = {}
+        self._thread: Optional[ThreadContext] = None
+        self._free: List[int] = []
+        self._entry_seq = [0] * self.rob_size  # Ordem de despacho de cada entrada (idade)
+        self._issue_count = 0
+        self._last_issue = -1
+        self._last_commit = -1
+
+    # Carga e contexto
+
+    def load_program(self, instructions: List[Instruction]):
+        self.load_programs([instructions])
+
+    def load_programs(self, programs: List[List[Instruction]]):
+        """Carrega um programa por thread (as instruções são copiadas)"""
+        if not programs:
+            raise ValueError("É preciso ao menos um programa")
+        self._programs = [[copy.copy(inst) for inst in program] for program in programs]
+        self.instructions = self._programs[0]
+        self.reset()
+
+    def reset(self):
+        self._thread = None
+        super().reset()
+        self.threads = [
+            ThreadContext(tid, program, self._critical_path_lengths(program))
+            for tid, program in enumerate(self._programs)
+        ]
+        self._thread_of = {inst: ctx for ctx in self.threads for inst in ctx.instructions}
+        self._free = list(range(self.rob_size))
+        self._issue_count = 0
+        self._last_issue = -1
+        self._last_commit = -1
+        if self.threads:
+            self._activate(self.threads[0])
+
+    def enable_history(self, budget_bytes: int = 0):
+        raise ValueError("Execução reversa não é suportada com SMT")
+
+    def capture_state(self) -> Dict:
+        raise ValueError("Checkpoints não são suportados com SMT")
+
+    def _activate(self, ctx: ThreadContext):
+        """Torna `ctx` a thread cujo estado os estágios herdados enxergam"""
+        if self._thread is ctx:
+            return
+        self._sync()
+        self._thread = ctx
+        self.instructions = ctx.instructions
+        self.pc = ctx.pc
+        self.registers = ctx.registers
+        self.memory = ctx.memory
+        self.register_status = ctx.register_status
+        self.branch_predictor = ctx.branch_predictor
+        self.speculating = ctx.speculating
+        self.speculation_rob = ctx.speculation_rob
+
+    def _sync(self):
+        """Grava no contexto o estado da thread ativa"""
+        ctx = self._thread
+        if ctx is None:
+            return
+        ctx.pc = self.pc
+        ctx.registers = self.registers
+        ctx.memory = self.memory
+        ctx.register_status = self.register_status
+        ctx.branch_predictor = self.branch_predictor
+        ctx.speculating = self.speculating
+        ctx.speculation_rob = self.speculation_rob
+
+    # Ciclo
+
+    def _step_cycle(self):
+        result = super()._step_cycle()
+        self._sync()
+        for ctx in self.threads:
+            if not ctx.finished and ctx.pc >= len(ctx.instructions) and not ctx.entries:
+                ctx.finished = True
+                ctx.metrics.total_cycles = self.current_cycle
+        return result
+
+    def _issue_stage(self):
+        metrics = self.metrics
+        before = (metrics.instructions_issued, metrics.stall_cycles, metrics.rob_full_cycles)
+        for ctx in self._issue_order():
+            self._activate(ctx)
+            super()._issue_stage()
+            if metrics.instructions_issued != before[0]:
+                ctx.metrics.instructions_issued += 1
+                self._last_issue = ctx.tid
+                metrics.stall_cycles, metrics.rob_full_cycles = before[1:]
+                return
+        # Nenhuma thread despachou: no máximo um ciclo de stall de cada tipo
+        metrics.stall_cycles = min(metrics.stall_cycles, before[1] + 1)
+        metrics.rob_full_cycles = min(metrics.rob_full_cycles, before[2] + 1)
+
+    def _issue_order(self) -> List[ThreadContext]:
+        """Threads com instruções a despachar, em ordem de prioridade"""
+        self._sync()
+        count = len(self.threads)
+        start = self._last_issue + 1
+        order = [self.threads[(start + i) % count] for i in range(count)]
+        order = [ctx for ctx in order if ctx.pc < len(ctx.instructions)]
+        if self.fetch_policy == 'icount':
+            order.sort(key=self._icount)
+        return order
+
+    def _icount(self, ctx: ThreadContext) -> int:
+        """Instruções da thread nas reservation stations (aguardando ou executando)"""
+        rob = self.rob
+        return sum(1 for entry_id in ctx.entries if rob[entry_id].state == "Issue")
+
+    def _commit_stage(self):
+        count = len(self.threads)
+        start = self._last_commit + 1
+        for i in range(count):
+            ctx = self.threads[(start + i) % count]
+            if ctx.entries and self.rob[ctx.entries[0]].state == "Commit":
+                break
+        else:
+            self.metrics.bubble_cycles += 1
+            return
+
+        self._activate(ctx)
+        entry_id = ctx.entries[0]
+        self.rob_head = entry_id
+        completed = self.metrics.instructions_completed
+        mispredictions = self.metrics.branch_mispredictions
+        super()._commit_stage()
+        ctx.entries.pop(0)
+        self._free.append(entry_id)
+        self._last_commit = ctx.tid
+        ctx.metrics.instructions_completed += self.metrics.instructions_completed - completed
+        ctx.metrics.branch_mispredictions += self.metrics.branch_mispredictions - mispredictions
+
+    def _execute_station(self, rs: ReservationStation):
+        self._activate(self._thread_of[rs.instruction])
+        super()._execute_station(rs)
+
+    def _is_finished(self) -> bool:
+        self._sync()
+        return all(ctx.pc >= len(ctx.instructions) and not ctx.entries for ctx in self.threads)
+
+    # ROB compartilhado
+
+    def _rob_quota(self, ctx: ThreadContext) -> int:
+        if self.rob_partition == 'shared':
+            return self.rob_size
+        share, extra = divmod(self.rob_size, len(self.threads))
+        return share + (1 if ctx.tid < extra else 0)
+
+    def _rob_full(self) -> bool:
+        ctx = self._thread
+        return not self._free or len(ctx.entries) >= self._rob_quota(ctx)
+
+    def _allocate_rob(self) -> Optional[ROBEntry]:
+        if self._rob_full():
+            return None
+        entry_id = self._free.pop(0)
+        self._thread.entries.append(entry_id)
+        self._entry_seq[entry_id] = self._issue_count
+        self._issue_count += 1
+        return self.rob[entry_id]
+
+    def _flush_speculative_instructions(self, branch_entry: ROBEntry):
+        """Descarta as entradas da thread mais novas que o desvio"""
+        ctx = self._thread
+        position = ctx.entries.index(branch_entry.entry_id)
+        flushed = ctx.entries[position + 1:]
+        del ctx.entries[position + 1:]
+        for entry_id in flushed:
+            if self.timing_listeners:
+                self._notify('squash', entry_id)
+            self.rob[entry_id].clear()
+            self._free.append(entry_id)
+
+        flushed = set(flushed)
+        for rs in self._all_rs():
+            if rs.busy and rs.dest in flushed:
+                self._ready_queues[rs.op_type].pop(rs.name, None)
+                rs.clear()
+
+        self.register_status = RegisterStatus()
+        for entry_id in ctx.entries:
+            entry = self.rob[entry_id]
+            if entry.busy and entry.dest and entry.instruction.type not in (
+                    InstructionType.SW, InstructionType.BEQ, InstructionType.BNE):
+                self.register_status.set_dependency(entry.dest, entry_id)
+
+    def _update_speculation(self):
+        ctx = self._thread
+        for entry_id in ctx.entries:
+            entry = self.rob[entry_id]
+            if entry.busy and entry.instruction.type in (InstructionType.BEQ, InstructionType.BNE):
+                self.speculation_rob = entry_id
+                return
+        self.speculating = False
+        self.speculation_rob = None
+        for entry_id in ctx.entries:
+            self.rob[entry_id].speculative = False
+
+    def _older_entries(self, rob_id: int) -> List[int]:
+        """Entradas da thread ativa mais antigas que `rob_id`"""
+        entries = self._thread.entries
+        return entries[:entries.index(rob_id)]
+
+    def _load_blocked(self, rs: ReservationStation) -> bool:
+        for entry_id in self._older_entries(rs.dest):
+            entry = self.rob[entry_id]
+            if entry.instruction.type == InstructionType.SW and not entry.ready:
+                return True
+        return False
+
+    def _load_value(self, rob_id: int, address: int) -> int:
+        value = self.memory.get(address, 0)
+        for entry_id in self._older_entries(rob_id):
+            entry = self.rob[entry_id]
+            if entry.instruction.type == InstructionType.SW and entry.address == address:
+                value = entry.value
+        return value
+
+    def _schedule_key(self, rs: ReservationStation) -> tuple:
+        age = self._entry_seq[rs.dest]
+        if self.scheduler == 'critical_path':
+            return (-self._thread_of[rs.instruction].critical_path[rs.instruction.pc], age)
+        if self.scheduler == 'random':
+            return (hash((self.scheduler_seed, self.current_cycle, rs.dest)), age)
+        return (age,)
+
+    # Métricas
+
+    def thread_ipc(self, tid: int) -> float:
+        """IPC da thread até o seu término (ou até o ciclo atual)"""
+        ctx = self.threads[tid]
+        cycles = ctx.metrics.total_cycles if ctx.finished else self.current_cycle
+        return ctx.metrics.instructions_completed / cycles if cycles else 0.0
+
+    def thread_summary(self) -> List[Dict]:
+        """Métricas por thread"""
+        return [{
+            'thread': ctx.tid,
+            'cycles': ctx.metrics.total_cycles if ctx.finished else self.current_cycle,
+            'issued': ctx.metrics.instructions_issued,
+            'committed': ctx.metrics.instructions_completed,
+            'ipc': self.thread_ipc(ctx.tid),
+            'mispredictions': ctx.metrics.branch_mispredictions,
+            'branch_accuracy': ctx.branch_predictor.get_accuracy(),
+        } for ctx in self.threads]
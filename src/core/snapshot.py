@@ -0,0 +1,231 @@
+"""
+Snapshots tipados e incrementais do estado do simulador
+
+Com `TomasuloSimulator.enable_versions`, o simulador mantém um contador de
+versão global (incrementado a cada ciclo, step_back ou reset) e a versão da
+última mudança de cada registrador, página de memória, reservation station,
+entrada do ROB e instrução. `snapshot(since=V)` devolve apenas o que mudou
+depois da versão V; sem versões (ou com V anterior a um reset), o snapshot é
+completo.
+
+Registradores e memória são marcados no momento da escrita; RS, ROB e
+instruções em voo são comparados uma vez por ciclo (dezenas de entradas, sem
+percorrer a memória). Código que altera o estado fora de step, step_back e
+reset deve chamar `StateVersions.invalidate`.
+"""
+from typing import Dict, NamedTuple, Optional, Any
+from src.core.structures import PerformanceMetrics
+
+
+class StationState(NamedTuple):
+    """Estado de uma reservation station (mesma ordem de TomasuloSimulator._rs_state)"""
+    busy: bool
+    op: Any
+    vj: Optional[int]
+    vk: Optional[int]
+    qj: Optional[int]
+    qk: Optional[int]
+    dest: Optional[int]
+    address: Optional[int]
+    pc: Optional[int]
+    cycles_remaining: int
+
+
+class ROBSlotState(NamedTuple):
+    """Estado de uma entrada do ROB (mesma ordem de TomasuloSimulator._rob_state)"""
+    busy: bool
+    pc: Optional[int]
+    state: Any
+    dest: Optional[str]
+    value: Optional[int]
+    address: Optional[int]
+    ready: bool
+    speculative: bool
+    branch_predicted: Optional[bool]
+    branch_actual: Optional[bool]
+
+
+class InstructionState(NamedTuple):
+    """Estado de execução de uma instrução (mesma ordem de TomasuloSimulator._inst_state)"""
+    stage: Any
+    issue_cycle: Optional[int]
+    exec_start_cycle: Optional[int]
+    exec_end_cycle: Optional[int]
+    write_cycle: Optional[int]
+    commit_cycle: Optional[int]
+    rob_entry: Optional[int]
+    rs_entry: Optional[str]
+
+
+class StateSnapshot:
+    """Estado do simulador (completo) ou mudanças desde uma versão (incremental)"""
+
+    def __init__(self, version: Optional[int], since: Optional[int], full: bool, cycle: int,
+                 pc: int, finished: bool, rob_head: int, rob_tail: int,
+                 registers: Dict[str, Optional[int]], memory_pages: Dict[int, Dict[int, int]],
+                 stations: Dict[int, StationState], rob: Dict[int, ROBSlotState],
+                 instructions: Dict[int, InstructionState], metrics: PerformanceMetrics):
+        self.version = version  # Versão do estado (passar como `since` no próximo snapshot)
+        self.since = since
+        self.full = full
+        self.cycle = cycle
+        self.pc = pc
+        self.finished = finished
+        self.rob_head = rob_head
+        self.rob_tail = rob_tail
+        self.registers = registers  # Registrador -> valor (None = removido)
+        self.memory_pages = memory_pages  # Página -> conteúdo completo da página
+        self.stations = stations  # Índice em _all_rs -> estado
+        self.rob = rob  # Índice da entrada -> estado
+        self.instructions = instructions  # PC -> estado
+        self.metrics = metrics
+
+    @property
+    def memory(self) -> Dict[int, int]:
+        """Conteúdo das páginas incluídas, como um único mapa endereço -> valor"""
+        memory = {}
+        for page in self.memory_pages.values():
+            memory.update(page)
+        return memory
+
+
+class StateVersions:
+    """Versões por registrador, página de memória, RS, entrada do ROB e instrução"""
+
+    PAGE_SHIFT = 6  # Páginas de 64 endereços
+
+    def __init__(self, simulator):
+        self.simulator = simulator
+        self.version = 0
+        self.invalidate()
+
+    def invalidate(self):
+        """Marca todo o estado como alterado (o próximo snapshot incremental é completo)"""
+        sim = self.simulator
+        self.version += 1
+        self.reset_version = self.version
+        version = self.version
+        self.registers = {reg: version for reg in sim.registers}
+        self.pages: Dict[int, int] = {}
+        self._page_addresses: Dict[int, set] = {}
+        for address in sim.memory:
+            self._add_address(address, version)
+        self._station_states = [sim._rs_state(rs) for rs in sim._all_rs()]
+        self.stations = [version] * len(self._station_states)
+        self._rob_states = [sim._rob_state(entry) for entry in sim.rob]
+        self.rob = [version] * len(self._rob_states)
+        self.instructions = [version] * len(sim.instructions)
+        self._inst_states = {}
+        self._in_flight = self._flight_pcs()
+        self._registers_ref = sim.registers
+        self._memory_ref = sim.memory
+
+    def _add_address(self, address: int, version: int):
+        page = address >> self.PAGE_SHIFT
+        self.pages[page] = version
+        addresses = self._page_addresses.get(page)
+        if addresses is None:
+            addresses = self._page_addresses[page] = set()
+        addresses.add(address)
+
+    def _flight_pcs(self) -> set:
+        return {entry.instruction.pc for entry in self.simulator.rob
+                if entry.busy and entry.instruction}
+
+    # Escritas durante o ciclo (recebem a versão que o ciclo vai publicar)
+
+    def touch_register(self, reg: str):
+        self.registers[reg] = self.version + 1
+
+    def touch_memory(self, address: int):
+        self._add_address(address, self.version + 1)
+
+    def sync(self, touched_instructions=()):
+        """Fecha uma versão: compara RS, ROB e instruções em voo (e as `touched_instructions`)"""
+        sim = self.simulator
+        if (sim.registers is not self._registers_ref or sim.memory is not self._memory_ref
+                or len(sim.instructions) != len(self.instructions)
+                or len(sim.rob) != len(self.rob)):
+            # Registradores/memória substituídos (checkpoint, amostragem, extrapolação...)
+            self.invalidate()
+            return
+        self.version += 1
+        version = self.version
+
+        for i, rs in enumerate(sim._all_rs()):
+            state = sim._rs_state(rs)
+            if state != self._station_states[i]:
+                self._station_states[i] = state
+                self.stations[i] = version
+        for i, entry in enumerate(sim.rob):
+            state = sim._rob_state(entry)
+            if state != self._rob_states[i]:
+                self._rob_states[i] = state
+                self.rob[i] = version
+
+        in_flight = self._flight_pcs()
+        instructions = sim.instructions
+        for pc in in_flight.union(self._in_flight, touched_instructions):
+            state = sim._inst_state(instructions[pc])
+            if state != self._inst_states.get(pc):
+                self._inst_states[pc] = state
+                self.instructions[pc] = version
+        self._in_flight = in_flight
+
+    def changed(self, structure: str, since: Optional[int]) -> Optional[list]:
+        """
+        Chaves de uma estrutura alteradas depois da versão `since`
+
+        Args:
+            structure: 'registers', 'pages', 'stations', 'rob' ou 'instructions'
+
+        Returns:
+            Lista de chaves (nome, página ou índice), ou None se `since` for
+            anterior ao último reset/invalidação (tudo deve ser relido).
+        """
+        if since is None or since < self.reset_version:
+            return None
+        versions = getattr(self, structure)
+        items = versions.items() if isinstance(versions, dict) else enumerate(versions)
+        return [key for key, version in items if version > since]
+
+    def snapshot(self, since: Optional[int] = None) -> StateSnapshot:
+        """Mudanças com versão maior que `since` (completo se None ou anterior a um reset)"""
+        if since is None or since < self.reset_version:
+            return full_snapshot(self.simulator, self.version)
+        sim = self.simulator
+        registers = {reg: sim.registers.get(reg) for reg in self.changed('registers', since)}
+        memory = sim.memory
+        memory_pages = {page: {address: memory[address]
+                               for address in self._page_addresses[page] if address in memory}
+                        for page in self.changed('pages', since)}
+        all_rs = sim._all_rs()
+        stations = {i: StationState(*sim._rs_state(all_rs[i]))
+                    for i in self.changed('stations', since)}
+        rob = {i: ROBSlotState(*sim._rob_state(sim.rob[i])) for i in self.changed('rob', since)}
+        instructions = {pc: InstructionState(*sim._inst_state(sim.instructions[pc]))
+                        for pc in self.changed('instructions', since)}
+        return _make_snapshot(sim, self.version, since, False, registers, memory_pages,
+                              stations, rob, instructions)
+
+
+def full_snapshot(sim, version: Optional[int] = None) -> StateSnapshot:
+    """Snapshot completo (percorre toda a memória)"""
+    memory_pages: Dict[int, Dict[int, int]] = {}
+    for address, value in sim.memory.items():
+        page = address >> StateVersions.PAGE_SHIFT
+        memory_pages.setdefault(page, {})[address] = value
+    stations = {i: StationState(*sim._rs_state(rs)) for i, rs in enumerate(sim._all_rs())}
+    rob = {i: ROBSlotState(*sim._rob_state(entry)) for i, entry in enumerate(sim.rob)}
+    instructions = {inst.pc: InstructionState(*sim._inst_state(inst)) for inst in sim.instructions}
+    return _make_snapshot(sim, version, None, True, dict(sim.registers), memory_pages,
+                          stations, rob, instructions)
+
+
+def _make_snapshot(sim, version, since, full, registers, memory_pages, stations, rob,
+                   instructions) -> StateSnapshot:
+    metrics = PerformanceMetrics()
+    vars(metrics).update(vars(sim.metrics))
+    return StateSnapshot(version, since, full, sim.current_cycle, sim.pc, sim.finished,
+                         sim.rob_head, sim.rob_tail, registers, memory_pages, stations, rob,
+                         instructions, metrics)
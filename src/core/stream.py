@@ -0,0 +1,418 @@
+"""
+Fluxo assíncrono de mudanças de estado do simulador
+
+`StateStream` avança o simulador em uma thread do executor do asyncio (sem
+bloquear o laço de eventos) e publica, a cada lote de ciclos, um
+`StateBatch` com apenas o que mudou: registradores, memória, reservation
+stations, entradas do ROB, estados das instruções e métricas. Vários
+consumidores assinam o mesmo fluxo, cada um no seu ritmo:
+
+- assinaturas sem perdas (`lossless=True`) aplicam contrapressão: com a fila
+  cheia, a simulação espera o consumidor (ex.: gravação em arquivo), que
+  deve fechar a assinatura (`close`) se parar de consumir antes do fim;
+- assinaturas com perdas juntam os lotes pendentes em um só quando a fila
+  enche, e a simulação segue sem esperar (ex.: interface, visualizadores).
+
+Cada assinatura começa com o estado completo já publicado, de modo que um
+consumidor que chega no meio da execução reconstrói o estado aplicando os
+lotes em ordem. Sem assinaturas, nenhum lote é calculado: o próximo lote
+publicado cobre tudo o que mudou desde o último.
+"""
+import asyncio
+import json
+import time
+from collections import deque
+from enum import Enum
+from typing import Dict, Optional
+
+
+class StateBatch:
+    """Mudanças de estado acumuladas entre dois ciclos publicados"""
+
+    __slots__ = ('full', 'first_cycle', 'cycle', 'pc', 'finished', 'rob_head', 'rob_tail',
+                 'registers', 'memory', 'stations', 'rob', 'instructions', 'metrics')
+
+    def __init__(self, full: bool, first_cycle: int, cycle: int, pc: int, finished: bool,
+                 rob_head: int, rob_tail: int, registers: Dict, memory: Dict, stations: Dict,
+                 rob: Dict, instructions: Dict, metrics: Dict):
+        self.full = full  # Estado completo (substitui o anterior em vez de ser aplicado sobre ele)
+        self.first_cycle = first_cycle  # Ciclo do estado ao qual o lote se aplica
+        self.cycle = cycle
+        self.pc = pc
+        self.finished = finished
+        self.rob_head = rob_head
+        self.rob_tail = rob_tail
+        self.registers = registers  # Registrador -> valor
+        self.memory = memory  # Endereço -> valor
+        self.stations = stations  # Índice em _all_rs -> TomasuloSimulator._rs_state
+        self.rob = rob  # Índice -> TomasuloSimulator._rob_state
+        self.instructions = instructions  # PC -> TomasuloSimulator._inst_state
+        self.metrics = metrics  # Campo de PerformanceMetrics -> valor
+
+    def merged(self, later: 'StateBatch') -> 'StateBatch':
+        """Um único lote equivalente a aplicar este e depois `later`"""
+        if later.full:
+            return later
+        return StateBatch(
+            self.full, self.first_cycle, later.cycle, later.pc, later.finished,
+            later.rob_head, later.rob_tail,
+            {**self.registers, **later.registers}, {**self.memory, **later.memory},
+            {**self.stations, **later.stations}, {**self.rob, **later.rob},
+            {**self.instructions, **later.instructions}, {**self.metrics, **later.metrics},
+        )
+
+    def to_dict(self) -> Dict:
+        """Forma serializável em JSON (enums pelo valor, mapas com chave inteira como pares)"""
+        return {
+            'full': self.full,
+            'first_cycle': self.first_cycle,
+            'cycle': self.cycle,
+            'pc': self.pc,
+            'finished': self.finished,
+            'rob_head': self.rob_head,
+            'rob_tail': self.rob_tail,
+            'registers': self.registers,
+            'memory': sorted(self.memory.items()),
+            'stations': [[i, _plain(state)] for i, state in sorted(self.stations.items())],
+            'rob': [[i, _plain(state)] for i, state in sorted(self.rob.items())],
+            'instructions': [[pc, _plain(state)] for pc, state in sorted(self.instructions.items())],
+            'metrics': self.metrics,
+        }
+
+
+def _plain(state: tuple) -> list:
+    return [value.value if isinstance(value, Enum) else value for value in state]
+
+
+class StateTracker:
+    """Calcula os lotes de mudanças comparando com o último estado publicado
+
+    Com versões habilitadas no simulador (`enable_versions`), apenas as
+    estruturas alteradas desde o último lote são comparadas.
+    """
+
+    def __init__(self, simulator):
+        self.simulator = simulator
+        self._capture()
+
+    def _capture(self):
+        sim = self.simulator
+        self._version = sim.versions.version if sim.versions is not None else None
+        self._cycle = sim.current_cycle
+        self._control = (sim.pc, sim.finished, sim.rob_head, sim.rob_tail)
+        self._registers = dict(sim.registers)
+        self._memory = dict(sim.memory)
+        self._stations = [sim._rs_state(rs) for rs in sim._all_rs()]
+        self._rob = [sim._rob_state(entry) for entry in sim.rob]
+        self._instructions = [sim._inst_state(inst) for inst in sim.instructions]
+        self._metrics = dict(vars(sim.metrics))
+
+    def published(self) -> StateBatch:
+        """Estado completo publicado por último (não acessa o simulador)"""
+        pc, finished, rob_head, rob_tail = self._control
+        return StateBatch(True, self._cycle, self._cycle, pc, finished, rob_head, rob_tail,
+                          dict(self._registers), dict(self._memory),
+                          dict(enumerate(self._stations)), dict(enumerate(self._rob)),
+                          dict(enumerate(self._instructions)), dict(self._metrics))
+
+    def delta(self) -> StateBatch:
+        """Mudanças desde a última chamada (estado completo após reset ou troca de programa)"""
+        sim = self.simulator
+        if (sim.current_cycle < self._cycle or len(sim.instructions) != len(self._instructions)
+                or len(sim.rob) != len(self._rob)):
+            self._capture()
+            return self.published()
+
+        first_cycle = self._cycle
+        versions = sim.versions
+        if versions is not None and self._version is not None and self._version >= versions.reset_version:
+            snapshot = versions.snapshot(self._version)
+            registers = _changed_items(snapshot.registers, self._registers)
+            memory = _changed_items(snapshot.memory, self._memory)
+            stations = _changed_indexed(snapshot.stations, self._stations)
+            rob = _changed_indexed(snapshot.rob, self._rob)
+            instructions = _changed_indexed(snapshot.instructions, self._instructions)
+        else:
+            registers = _changed_items(sim.registers, self._registers)
+            memory = _changed_items(sim.memory, self._memory)
+            stations = _changed_states(sim._all_rs(), self._stations, sim._rs_state)
+            rob = _changed_states(sim.rob, self._rob, sim._rob_state)
+            instructions = _changed_states(sim.instructions, self._instructions, sim._inst_state)
+        metrics = _changed_items(vars(sim.metrics), self._metrics)
+        self._version = versions.version if versions is not None else None
+
+        self._cycle = sim.current_cycle
+        self._control = (sim.pc, sim.finished, sim.rob_head, sim.rob_tail)
+        return StateBatch(False, first_cycle, sim.current_cycle, sim.pc, sim.finished,
+                          sim.rob_head, sim.rob_tail, registers, memory, stations, rob,
+                          instructions, metrics)
+
+
+def _changed_items(current: Dict, previous: Dict) -> Dict:
+    """Itens de `current` diferentes de `previous` (atualizando `previous`)"""
+    if current == previous:
+        return {}
+    changed = {key: value for key, value in current.items() if previous.get(key) != value}
+    previous.update(changed)
+    return changed
+
+
+def _changed_states(items, previous: list, state) -> Dict:
+    """Índice -> estado dos itens cujo estado mudou (atualizando `previous`)"""
+    changed = {}
+    for i, item in enumerate(items):
+        new = state(item)
+        if new != previous[i]:
+            previous[i] = changed[i] = new
+    return changed
+
+
+def _changed_indexed(states: Dict, previous: list) -> Dict:
+    """Como _changed_states, para estados já calculados (índice -> estado)"""
+    changed = {}
+    for i, new in states.items():
+        if new != previous[i]:
+            previous[i] = changed[i] = new
+    return changed
+
+
+class Subscription:
+    """Consumidor de um StateStream (iterador assíncrono de StateBatch)"""
+
+    def __init__(self, stream: 'StateStream', maxsize: int, lossless: bool, initial: StateBatch):
+        self.stream = stream
+        self.maxsize = max(1, maxsize)
+        self.lossless = lossless
+        self.coalesced = 0  # Lotes juntados por falta de espaço (só sem contrapressão)
+        self.closed = False
+        self._pending = deque([initial])
+        self._done = False
+        self._ready = asyncio.Event()
+        self._ready.set()
+        self._space = asyncio.Event()
+
+    def _offer(self, batch: StateBatch) -> bool:
+        """Enfileira um lote; False se a fila estiver cheia (só assinaturas sem perdas)"""
+        if len(self._pending) >= self.maxsize:
+            if self.lossless:
+                self._space.clear()
+                return False
+            self._pending[-1] = self._pending[-1].merged(batch)
+            self.coalesced += 1
+        else:
+            self._pending.append(batch)
+        self._ready.set()
+        return True
+
+    def _finish(self):
+        self._done = True
+        self._ready.set()
+
+    def __aiter__(self):
+        return self
+
+    async def __anext__(self) -> StateBatch:
+        while not self._pending:
+            if self._done or self.closed:
+                raise StopAsyncIteration
+            self._ready.clear()
+            await self._ready.wait()
+        batch = self._pending.popleft()
+        self._space.set()
+        return batch
+
+    def close(self):
+        """Cancela a assinatura (a simulação deixa de esperar por ela)"""
+        self.closed = True
+        self._pending.clear()
+        self._ready.set()
+        self._space.set()
+        if self in self.stream._subscribers:
+            self.stream._subscribers.remove(self)
+
+
+class StateStream:
+    """Executa um simulador publicando lotes de mudanças para várias assinaturas"""
+
+    def __init__(self, simulator, lock=None, cycles_per_second: float = 0,
+                 batch_time: float = 0.01):
+        """
+        Args:
+            simulator: TomasuloSimulator (ou subclasse) já com o programa carregado
+            lock: Lock adquirido enquanto o simulador é avançado (ex.: o da interface)
+            cycles_per_second: Velocidade alvo; 0 significa sem limite
+            batch_time: Duração máxima de um lote (segundos), isto é, o tempo
+                máximo em que o lock fica adquirido de cada vez
+        """
+        self.simulator = simulator
+        self.lock = lock
+        self.cycles_per_second = cycles_per_second
+        self.batch_time = batch_time
+        self.stop_reason = None  # Breakpoints atingidos na última parada
+        self.tracker = StateTracker(simulator)
+        self._subscribers = []
+        self._stopped = False
+
+    def subscribe(self, maxsize: int = 8, lossless: bool = False) -> Subscription:
+        """Nova assinatura, começando pelo estado completo já publicado"""
+        subscription = Subscription(self, maxsize, lossless, self.tracker.published())
+        self._subscribers.append(subscription)
+        return subscription
+
+    def set_speed(self, cycles_per_second: float):
+        """Altera a velocidade alvo (pode ser chamado de qualquer thread)"""
+        self.cycles_per_second = cycles_per_second
+
+    def stop(self):
+        """Interrompe a execução no fim do lote atual (pode ser chamado de qualquer thread)"""
+        self._stopped = True
+
+    async def run(self) -> bool:
+        """
+        Avança o simulador até terminar, esgotar um orçamento, `stop` ou um
+        breakpoint do simulador (ver `enable_breakpoints`; motivo em `stop_reason`)
+
+        Em modo limitado, cada lote executa os ciclos devidos desde o início:
+        um por lote em câmera lenta, ou os de `batch_time` segundos em
+        velocidades altas; atrasos maiores que um lote não são compensados
+        com rajadas.
+
+        Returns:
+            True se a simulação terminou
+
+        Raises:
+            SimulationStalled: se a simulação não puder mais progredir
+        """
+        loop = asyncio.get_running_loop()
+        simulator = self.simulator
+        self.stop_reason = None
+        if simulator.breakpoints is not None:
+            simulator.breakpoints.hits.clear()
+        speed, origin, done = None, 0.0, 0
+        try:
+            while not self._stopped and not simulator.finished and not self._exhausted():
+                if self.cycles_per_second != speed:
+                    speed, origin, done = self.cycles_per_second, time.perf_counter(), 0
+                if speed > 0:
+                    # Ciclos acumulados até completar um lote (ou um ciclo, em câmera lenta)
+                    elapsed = time.perf_counter() - origin
+                    due = int(elapsed * speed) - done
+                    target = max(1, int(speed * self.batch_time))
+                    if due < target:
+                        await asyncio.sleep(min((done + target) / speed - elapsed, 0.05))
+                        continue
+                    batch, cycles = await loop.run_in_executor(
+                        None, self._advance, self.batch_time, due)
+                    done += cycles
+                    lag = (time.perf_counter() - origin) * speed - done
+                    if lag > max(1, speed * self.batch_time):
+                        origin += lag / speed
+                else:
+                    batch, _ = await loop.run_in_executor(None, self._advance, self.batch_time)
+                await self._publish(batch)
+                if self.stop_reason is not None:
+                    break
+            return simulator.finished
+        finally:
+            for subscription in self._subscribers:
+                subscription._finish()
+
+    def _exhausted(self) -> bool:
+        """Orçamentos de ciclos e instruções da configuração (ver run_until_complete)"""
+        return self.simulator._budget_exhausted()
+
+    def _advance(self, duration: float, max_cycles: Optional[int] = None):
+        """
+        Até `max_cycles` ciclos, por no máximo `duration` segundos (ao menos
+        um); executa no executor
+
+        Returns:
+            (lote de mudanças ou None sem assinaturas, ciclos executados)
+        """
+        simulator = self.simulator
+        breakpoints = simulator.breakpoints
+        if self.lock is not None:
+            self.lock.acquire()
+        try:
+            start = simulator.current_cycle
+            deadline = time.perf_counter() + duration
+            cycles = 0
+            while True:
+                simulator.step()
+                cycles += 1
+                if breakpoints is not None and breakpoints.hits:
+                    self.stop_reason = '; '.join(str(hit) for hit in breakpoints.hits)
+                    break
+                if (simulator.finished or self._exhausted() or cycles == max_cycles
+                        or time.perf_counter() >= deadline):
+                    break
+            # Sem assinaturas, o lote não teria destino (o rastreador continua
+            # no último estado publicado)
+            batch = self.tracker.delta() if self._subscribers else None
+            return batch, simulator.current_cycle - start
+        finally:
+            if self.lock is not None:
+                self.lock.release()
+
+    async def _publish(self, batch: StateBatch):
+        """Entrega o lote a todas as assinaturas, esperando as sem perdas que estiverem cheias"""
+        if batch is None:
+            return
+        for subscription in list(self._subscribers):
+            while not subscription.closed and not subscription._offer(batch):
+                await subscription._space.wait()
+
+
+async def stream_states(simulator, lock=None, **options):
+    """
+    Gerador assíncrono: executa a simulação e produz seus lotes de mudanças
+
+    O primeiro lote é o estado completo inicial. O consumidor único controla o
+    ritmo (a simulação espera quando ele atrasa). Aceita as opções de StateStream.
+    """
+    stream = StateStream(simulator, lock, **options)
+    subscription = stream.subscribe(maxsize=2, lossless=True)
+    task = asyncio.ensure_future(stream.run())
+    try:
+        async for batch in subscription:
+            yield batch
+        await task
+    finally:
+        stream.stop()
+        subscription.close()
+        if not task.done():
+            await asyncio.gather(task, return_exceptions=True)
+
+
+async def record_batches(subscription: Subscription, file):
+    """Consumidor sem interface: grava cada lote como uma linha JSON em `file`"""
+    try:
+        async for batch in subscription:
+            file.write(json.dumps(batch.to_dict(), separators=(',', ':')) + '\n')
+    finally:
+        subscription.close()
+
+
+async def serve_batches(stream: StateStream, path: str, maxsize: int = 4):
+    """
+    Publica o fluxo em um socket Unix para visualizadores remotos
+
+    Cada conexão recebe o estado completo e depois os lotes, como linhas JSON;
+    um visualizador lento recebe lotes juntados sem atrasar a simulação.
+
+    Returns:
+        asyncio.Server (feche com close() ao final)
+    """
+    async def handle(reader, writer):
+        subscription = stream.subscribe(maxsize)
+        try:
+            async for batch in subscription:
+                writer.write((json.dumps(batch.to_dict(), separators=(',', ':')) + '\n').encode())
+                await writer.drain()
+        except ConnectionError:
+            pass
+        finally:
+            subscription.close()
+            writer.close()
+
+    return await asyncio.start_unix_server(handle, path)
@@ -33,7 +33,8 @@ class Instruction:
     """Representa uma instrução MIPS"""
     def __init__(self, inst_type: InstructionType, dest: str = None, 
                  src1: str = None, src2: str = None, immediate: int = None,
-                 offset: int = None, label: str = None, pc: int = 0):
+                 offset: int = None, label: str = None, pc: int = 0,
+                 target: int = None):
         self.type = inst_type
         self.dest = dest  # Registrador de destino
         self.src1 = src1  # Primeiro operando
@@ -42,6 +43,7 @@ class Instruction:
         self.offset = offset  # Offset para loads/stores
         self.label = label  # Label para desvios
         self.pc = pc  # Program counter
+        self.target = target  # PC de destino do desvio (label resolvido)
         
         # Informações de execução
         self.stage = InstructionStage.WAITING
@@ -118,6 +120,7 @@ class ROBEntry:
         self.state = "Issue"  # Issue, Execute, Write, Commit
         self.dest = None  # Registrador ou endereço de destino
         self.value = None  # Valor a ser escrito
+        self.address = None  # Endereço efetivo (stores)
         self.ready = False  # Se o valor está pronto
         self.speculative = False  # Se é uma instrução especulativa
         self.branch_predicted = None  # Para desvios: True (taken) / False (not taken)
@@ -130,6 +133,7 @@ class ROBEntry:
         self.state = "Issue"
         self.dest = None
         self.value = None
+        self.address = None
         self.ready = False
         self.speculative = False
         self.branch_predicted = None
@@ -211,6 +215,7 @@ class PerformanceMetrics:
         self.instructions_completed = 0
         self.bubble_cycles = 0
         self.stall_cycles = 0
+        self.rob_full_cycles = 0  # Ciclos sem despacho por ROB cheio
         self.branch_mispredictions = 0
         
     def get_ipc(self) -> float:
@@ -227,4 +232,5 @@ class PerformanceMetrics:
   IPC: {self.get_ipc():.2f}
   Ciclos de Bolha: {self.bubble_cycles}
   Ciclos de Stall: {self.stall_cycles}
+  Ciclos com ROB Cheio: {self.rob_full_cycles}
   Mispredictions de Desvio: {self.branch_mispredictions}"""
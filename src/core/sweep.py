@@ -0,0 +1,91 @@
+"""
+Varredura de configurações do simulador
+"""
+import os
+import tempfile
+from typing import List, Dict
+from src.core.structures import Instruction, PerformanceMetrics
+from src.core.trace import TraceReader, TraceReplaySimulator, record_trace
+from src.core.result_cache import SimulationResult
+from src.core.dataflow import DataflowGraph
+
+
+class SweepResults(list):
+    """Métricas por configuração; `truncated` lista os pontos simulados com o trace truncado"""
+
+    def __init__(self, results, truncated=()):
+        super().__init__(results)
+        self.truncated = list(truncated)
+
+
+def run_sweep(instructions: List[Instruction], configs: List[Dict],
+              trace_path: str = None, cache=None, prune: bool = False,
+              max_instructions: int = 1_000_000) -> SweepResults:
+    """
+    Simula o programa para cada configuração
+
+    O programa é executado funcionalmente uma única vez e o trace resultante
+    é reproduzido no modelo temporal para cada configuração. O trace para em
+    `max_instructions` instruções dinâmicas (programas que não terminam); os
+    pontos simulados com um trace truncado cobrem só esse prefixo, ficam em
+    `truncated` e não são guardados no cache.
+
+    Args:
+        instructions: Programa já decodificado
+        configs: Lista de configurações do TomasuloSimulator
+        trace_path: Onde gravar o trace (arquivo temporário se omitido)
+        cache: ResultCache consultado antes de simular cada configuração
+        prune: Simula em ordem decrescente do limite de IPC da análise de fluxo
+            de dados e descarta as configurações cujo limite não supera o
+            melhor IPC já obtido
+        max_instructions: Limite de instruções dinâmicas do trace (e da análise
+            de fluxo de dados)
+
+    Returns:
+        SweepResults com as métricas de desempenho, na mesma ordem de configs
+        (None para as configurações descartadas por prune)
+    """
+    results = [None] * len(configs)
+    if cache is not None:
+        for index, config in enumerate(configs):
+            cached = cache.get(instructions, config)
+            if cached is not None:
+                results[index] = cached.metrics
+    pending = [index for index, metrics in enumerate(results) if metrics is None]
+    if not pending:
+        return SweepResults(results)
+
+    bounds = None
+    if prune:
+        graph = DataflowGraph(instructions, max_instructions)
+        if not graph.truncated:
+            bounds = {index: graph.bound(configs[index]).ipc_bound for index in pending}
+            pending.sort(key=lambda index: -bounds[index])
+            best = max((metrics.get_ipc() for metrics in results if metrics is not None), default=0.0)
+
+    temporary = trace_path is None
+    if temporary:
+        fd, trace_path = tempfile.mkstemp(suffix='.trace')
+        os.close(fd)
+
+    try:
+        truncated = not record_trace(instructions, trace_path,
+                                     max_instructions=max_instructions).finished
+        simulated = []
+        with TraceReader(trace_path) as trace:
+            for index in pending:
+                if bounds is not None and bounds[index] <= best:
+                    continue
+                simulator = TraceReplaySimulator(trace, configs[index])
+                simulator.load_program(instructions)
+                simulator.run_until_complete()
+                results[index] = simulator.metrics
+                simulated.append(index)
+                if bounds is not None:
+                    best = max(best, simulator.metrics.get_ipc())
+                if cache is not None and not truncated:
+                    cache.put(instructions, configs[index], SimulationResult.from_simulator(simulator))
+        return SweepResults(results, sorted(simulated) if truncated else ())
+    finally:
+        if temporary:
+            os.remove(trace_path)
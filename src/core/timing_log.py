@@ -0,0 +1,237 @@
+"""
+Registro colunar da temporização por instrução dinâmica
+
+Cada instrução despachada recebe um número de sequência dinâmico (a ordem de
+despacho, incluindo as descartadas por misprediction) e uma linha em colunas
+de inteiros de 64 bits pré-alocadas que crescem por duplicação. Ciclos que não
+ocorreram (uma instrução descartada nunca faz commit, J e NOP não executam)
+valem -1.
+
+O registro pode ser exportado em .npz (arquivos .npy escritos diretamente, sem
+depender do NumPy) ou CSV, e oferece resumos das distribuições de latência.
+Ciclos saltados pela aceleração de laços ou pelo cache de blocos não geram
+eventos. Desfazer ciclos com step_back (ou restaurar um checkpoint da mesma
+execução) descarta as linhas e eventos posteriores ao ciclo restaurado; as
+instruções em voo de um estado de outra execução ganham linhas novas, com
+issue -1.
+"""
+import math
+import sys
+import zipfile
+from array import array
+from collections import Counter
+from typing import Dict, List, Optional
+from src.core.structures import Instruction
+
+
+# Colunas registradas, além do número de sequência (o índice da linha)
+COLUMNS = ('pc', 'issue', 'exec_start', 'exec_end', 'write', 'commit', 'squash')
+
+# Linhas formatadas por escrita ao gravar CSV
+CSV_CHUNK_ROWS = 65536
+
+# Intervalos resumidos por `summary`
+INTERVALS = (
+    ('issue', 'exec_start'),   # Espera por operandos e unidade funcional
+    ('exec_start', 'exec_end'),
+    ('exec_end', 'write'),
+    ('write', 'commit'),       # Espera pelo commit em ordem
+    ('issue', 'commit'),
+)
+
+
+class TimingLog:
+    """Colunas de ciclos por instrução dinâmica, alimentadas pelos eventos do simulador
+
+    Ver TomasuloSimulator.enable_timing_log.
+    """
+
+    def __init__(self, capacity: int = 1024):
+        self._capacity = max(capacity, 1)
+        self._length = 0
+        self._columns = {name: array('q', [-1]) * self._capacity for name in COLUMNS}
+        self._rob_seq: Dict[int, int] = {}  # Entrada do ROB -> sequência da instrução nela
+
+    def __len__(self):
+        return self._length
+
+    def reset(self):
+        """Descarta todas as linhas"""
+        self._length = 0
+        for column in self._columns.values():
+            column[:] = array('q', [-1]) * self._capacity
+        self._rob_seq.clear()
+
+    def rewind(self, simulator):
+        """Realinha o registro ao estado restaurado do simulador (ver TomasuloSimulator._notify)"""
+        cycle = simulator.current_cycle
+        columns = self._columns
+        issue, commit = columns['issue'], columns['commit']
+        # Linhas despachadas depois do ciclo restaurado deixam de existir
+        length = self._length
+        while length and issue[length - 1] > cycle:
+            length -= 1
+        for column in columns.values():
+            column[length:self._length] = array('q', [-1]) * (self._length - length)
+        self._length = length
+
+        # Eventos posteriores ao ciclo só podem estar depois do último commit
+        # anterior a ele (commits em ordem; descartes e execuções ocorrem antes)
+        start = length
+        while start and not 0 <= commit[start - 1] <= cycle:
+            start -= 1
+        pending = []
+        for seq in range(start, length):
+            for name in COLUMNS[2:]:
+                if columns[name][seq] > cycle:
+                    columns[name][seq] = -1
+            if commit[seq] < 0 and columns['squash'][seq] < 0:
+                pending.append(seq)
+
+        # Instruções em voo: as linhas pendentes, se forem as mesmas instruções
+        entries = simulator._in_flight_entries()
+        self._rob_seq.clear()
+        if [columns['pc'][seq] for seq in pending] == [e.instruction.pc for e in entries]:
+            self._rob_seq.update((e.entry_id, seq) for e, seq in zip(entries, pending))
+        else:
+            for entry in entries:
+                self.issue(entry.entry_id, -1, entry.instruction)
+
+    def column(self, name: str) -> array:
+        """Coluna com uma posição por número de sequência"""
+        if name == 'seq':
+            return array('q', range(self._length))
+        return self._columns[name][:self._length]
+
+    def seq(self, rob_id: int) -> Optional[int]:
+        """Número de sequência da instrução que ocupa a entrada do ROB"""
+        return self._rob_seq.get(rob_id)
+
+    # Eventos do simulador
+
+    def issue(self, rob_id: int, cycle: int, inst: Instruction):
+        if self._length == self._capacity:
+            self._grow()
+        seq = self._length
+        self._length += 1
+        self._rob_seq[rob_id] = seq
+        self._columns['pc'][seq] = inst.pc
+        self._columns['issue'][seq] = cycle
+
+    def execute_start(self, rob_id: int, cycle: int):
+        self._columns['exec_start'][self._rob_seq[rob_id]] = cycle
+
+    def execute_end(self, rob_id: int, cycle: int):
+        self._columns['exec_end'][self._rob_seq[rob_id]] = cycle
+
+    def write(self, rob_id: int, cycle: int):
+        self._columns['write'][self._rob_seq[rob_id]] = cycle
+
+    def commit(self, rob_id: int, cycle: int):
+        self._columns['commit'][self._rob_seq.pop(rob_id)] = cycle
+
+    def squash(self, rob_id: int, cycle: int):
+        self._columns['squash'][self._rob_seq.pop(rob_id)] = cycle
+
+    def _grow(self):
+        for column in self._columns.values():
+            column.extend(array('q', [-1]) * self._capacity)
+        self._capacity *= 2
+
+    # Resumos
+
+    def latencies(self, start: str = 'issue', end: str = 'commit') -> array:
+        """Diferenças end - start das instruções em que os dois eventos ocorreram"""
+        return array('q', [b - a for a, b in zip(self.column(start), self.column(end))
+                           if a >= 0 and b >= 0])
+
+    def summary(self) -> Dict[str, Dict[str, float]]:
+        """
+        Distribuição de cada intervalo entre eventos
+
+        Returns:
+            {'issue->commit': {'count', 'mean', 'min', 'p50', 'p90', 'p99', 'max'}, ...}
+        """
+        result = {}
+        for start, end in INTERVALS:
+            values = sorted(self.latencies(start, end))
+            stats = {'count': len(values)}
+            if values:
+                stats.update(
+                    mean=sum(values) / len(values), min=values[0],
+                    p50=_percentile(values, 50), p90=_percentile(values, 90),
+                    p99=_percentile(values, 99), max=values[-1],
+                )
+            result[f'{start}->{end}'] = stats
+        return result
+
+    def histogram(self, start: str = 'issue', end: str = 'commit',
+                  bin_width: int = 1) -> Dict[int, int]:
+        """Histograma de end - start: início de cada faixa -> número de instruções"""
+        counts = Counter(value // bin_width * bin_width for value in self.latencies(start, end))
+        return dict(sorted(counts.items()))
+
+    def to_numpy(self) -> Dict[str, 'numpy.ndarray']:
+        """Colunas como arrays do NumPy (requer o NumPy instalado)"""
+        import numpy
+        return {name: numpy.frombuffer(self.column(name), dtype=numpy.int64)
+                for name in ('seq',) + COLUMNS}
+
+    # Exportação
+
+    def save_npz(self, path: str):
+        """Grava as colunas em um .npz (carregável com numpy.load)"""
+        save_npz(path, {name: self.column(name) for name in ('seq',) + COLUMNS})
+
+    def save_csv(self, path: str, instructions: List[Instruction] = None):
+        """
+        Grava uma linha por instrução dinâmica
+
+        Args:
+            instructions: Programa carregado; se fornecido, inclui o texto da instrução
+        """
+        names = ('seq',) + COLUMNS
+        columns = [self.column(name) for name in names]
+        # Formatação direta das linhas (todos os campos são inteiros), em blocos
+        row_format = ','.join(['%d'] * len(columns))
+        if instructions is not None:
+            names += ('instruction',)
+            text = [str(inst) for inst in instructions]
+            columns.append([text[pc] for pc in columns[1]])
+            row_format += ',"%s"'
+        row_format += '\n'
+        with open(path, 'w', newline='') as f:
+            f.write(','.join(names) + '\n')
+            for start in range(0, self._length, CSV_CHUNK_ROWS):
+                chunk = zip(*(column[start:start + CSV_CHUNK_ROWS] for column in columns))
+                f.write(''.join([row_format % row for row in chunk]))
+
+
+def _percentile(values: List[int], percent: float) -> int:
+    """Percentil pelo método do ranque mais próximo (valores ordenados)"""
+    rank = max(math.ceil(percent / 100 * len(values)), 1)
+    return values[rank - 1]
+
+
+# Tipos de array suportados -> descrição de tipo do NumPy
+NPY_TYPES = {'q': '<i8', 'd': '<f8'}
+
+
+def save_npz(path: str, columns: Dict[str, array]):
+    """Grava colunas (arrays 'q' ou 'd') em um .npz sem compressão, como numpy.savez"""
+    with zipfile.ZipFile(path, 'w', zipfile.ZIP_STORED) as archive:
+        for name, column in columns.items():
+            archive.writestr(f'{name}.npy', _npy_bytes(column))
+
+
+def _npy_bytes(column: array) -> bytes:
+    """Serializa uma coluna no formato .npy versão 1.0"""
+    descr = NPY_TYPES[column.typecode]
+    header = f"{{'descr': '{descr}', 'fortran_order': False, 'shape': ({len(column)},), }}"
+    # Magic (6) + versão (2) + tamanho do cabeçalho (2) + cabeçalho + '\n', múltiplo de 64
+    padding = -(10 + len(header) + 1) % 64
+    header = (header + ' ' * padding + '\n').encode('latin1')
+    if sys.byteorder == 'big':
+        column = array(column.typecode, column)
+        column.byteswap()
+    return b'\x93NUMPY\x01\x00' + len(header).to_bytes(2, 'little') + header + column.tobytes()
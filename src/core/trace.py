@@ -0,0 +1,249 @@
+"""
+Trace dinâmico binário: grava uma execução funcional uma vez e a reproduz
+no modelo temporal quantas vezes for necessário (uma por configuração)
+
+Formato do arquivo (little-endian):
+    cabeçalho: magic 'TMTR', versão (u32), nº de registros (u64), nº de instruções estáticas (u64)
+    registros: 3 palavras int64 por instrução dinâmica
+        [0] pc << 1 | desvio tomado
+        [1] endereço efetivo (LW/SW)
+        [2] valor produzido (resultado, ou valor armazenado para SW)
+"""
+import mmap
+import struct
+from array import array
+from typing import List, Dict, NamedTuple, Optional
+from src.core.structures import Instruction, InstructionType, ReservationStation, ROBEntry
+from src.core.simulator import TomasuloSimulator
+from src.core.functional import FunctionalSimulator
+
+
+TRACE_MAGIC = b'TMTR'
+TRACE_VERSION = 1
+RECORD_WORDS = 3
+
+_HEADER = struct.Struct('<4sIQQ')
+
+
+class TraceWriter:
+    """Escreve registros de trace em blocos, sem manter o trace inteiro em memória"""
+
+    def __init__(self, path: str, program_size: int, buffer_records: int = 65536):
+        self.path = path
+        self.program_size = program_size
+        self.count = 0
+        self._buffer = array('q')
+        self._buffer_words = buffer_records * RECORD_WORDS
+        self._file = open(path, 'wb')
+        self._file.write(_HEADER.pack(TRACE_MAGIC, TRACE_VERSION, 0, program_size))
+
+    def append(self, pc: int, taken: bool, address: int, value: int):
+        """Adiciona um registro ao trace"""
+        self._buffer.extend((pc << 1 | taken, address, value))
+        self.count += 1
+        if len(self._buffer) >= self._buffer_words:
+            self._flush()
+
+    def _flush(self):
+        self._buffer.tofile(self._file)
+        del self._buffer[:]
+
+    def close(self):
+        """Descarrega o buffer e grava o número final de registros no cabeçalho"""
+        if self._file.closed:
+            return
+        self._flush()
+        self._file.seek(0)
+        self._file.write(_HEADER.pack(TRACE_MAGIC, TRACE_VERSION, self.count, self.program_size))
+        self._file.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+
+class TraceReader:
+    """Lê um trace via mmap; os registros são acessados por um memoryview tipado"""
+
+    def __init__(self, path: str):
+        self.path = path
+        self._file = open(path, 'rb')
+        self._mmap = mmap.mmap(self._file.fileno(), 0, access=mmap.ACCESS_READ)
+        magic, version, count, program_size = _HEADER.unpack_from(self._mmap, 0)
+        if magic != TRACE_MAGIC or version != TRACE_VERSION:
+            self.close()
+            raise ValueError(f"Arquivo de trace inválido: {path}")
+        self.count = count
+        self.program_size = program_size
+        end = _HEADER.size + count * RECORD_WORDS * 8
+        self.words = memoryview(self._mmap)[_HEADER.size:end].cast('q')
+
+    def __len__(self):
+        return self.count
+
+    def pc(self, index: int) -> int:
+        return self.words[index * RECORD_WORDS] >> 1
+
+    def taken(self, index: int) -> bool:
+        return bool(self.words[index * RECORD_WORDS] & 1)
+
+    def address(self, index: int) -> int:
+        return self.words[index * RECORD_WORDS + 1]
+
+    def value(self, index: int) -> int:
+        return self.words[index * RECORD_WORDS + 2]
+
+    def close(self):
+        """Libera o memoryview e o mapeamento"""
+        if getattr(self, 'words', None) is not None:
+            self.words.release()
+            self.words = None
+        if not self._mmap.closed:
+            self._mmap.close()
+        self._file.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+
+class TraceSummary(NamedTuple):
+    """Resultado de record_trace"""
+    count: int  # Registros gravados
+    finished: bool  # O programa terminou (False: parou em max_instructions)
+
+
+def record_trace(instructions: List[Instruction], path: str,
+                 registers: Dict[str, int] = None, memory: Dict[int, int] = None,
+                 max_instructions: int = None) -> TraceSummary:
+    """Executa o programa funcionalmente e grava o trace dinâmico"""
+    functional = FunctionalSimulator(instructions, registers, memory)
+    with TraceWriter(path, len(instructions)) as writer:
+        append = writer.append
+        step = functional.step
+        remaining = max_instructions
+        while remaining is None or remaining > 0:
+            record = step()
+            if record is None:
+                break
+            append(*record)
+            if remaining is not None:
+                remaining -= 1
+        return TraceSummary(writer.count, functional.finished())
+
+
+class TraceReplaySimulator(TomasuloSimulator):
+    """Modelo temporal alimentado por um trace: direções de desvio, endereços
+    e valores vêm do trace em vez de serem recalculados
+
+    Após um desvio com misprediction, a busca segue o caminho predito no
+    programa estático (caminho errado) sem consumir o trace, até o desvio ser
+    resolvido no commit. Instruções do caminho errado nunca fazem commit; como a
+    temporização não depende dos valores, elas produzem valores fictícios.
+    """
+
+    def __init__(self, trace: TraceReader, config: Dict = None):
+        self.trace = trace
+        self._words = trace.words
+        self._cursor = 0
+        self._wrong_path = False
+        super().__init__(config)
+        self._rob_trace = [0] * self.rob_size
+
+    def load_program(self, instructions: List[Instruction]):
+        """Carrega o programa estático correspondente ao trace"""
+        if len(instructions) != self.trace.program_size:
+            raise ValueError(
+                f"Programa com {len(instructions)} instruções não corresponde ao trace "
+                f"({self.trace.program_size} instruções)"
+            )
+        super().load_program(instructions)
+
+    def reset(self):
+        """Reseta o simulador e volta ao início do trace"""
+        super().reset()
+        self._cursor = 0
+        self._wrong_path = False
+
+    def _control_state(self) -> tuple:
+        return super()._control_state() + (self._cursor, self._wrong_path)
+
+    def _set_control_state(self, state: tuple):
+        super()._set_control_state(state[:-2])
+        self._cursor, self._wrong_path = state[-2:]
+
+    def capture_state(self) -> Dict:
+        state = super().capture_state()
+        state['rob_trace'] = list(self._rob_trace)
+        return state
+
+    def restore_state(self, state: Dict):
+        super().restore_state(state)
+        self._rob_trace = list(state['rob_trace'])
+
+    def _fetch(self) -> Optional[Instruction]:
+        if self._wrong_path:
+            return super()._fetch()
+        if self._cursor >= self.trace.count:
+            return None
+        return self.instructions[self._words[self._cursor * RECORD_WORDS] >> 1]
+
+    def _fetch_exhausted(self) -> bool:
+        if self._wrong_path:
+            return super()._fetch_exhausted()
+        return self._cursor >= self.trace.count
+
+    def _advance_fetch(self, inst: Instruction, rob_entry: ROBEntry):
+        super()._advance_fetch(inst, rob_entry)
+        if self._wrong_path:
+            self._rob_trace[rob_entry.entry_id] = -1
+            return
+
+        self._rob_trace[rob_entry.entry_id] = self._cursor
+        if inst.type in (InstructionType.BEQ, InstructionType.BNE):
+            taken = bool(self._words[self._cursor * RECORD_WORDS] & 1)
+            self._wrong_path = rob_entry.branch_predicted != taken
+        self._cursor += 1
+
+    def _redirect(self, pc: int):
+        super()._redirect(pc)
+        self._wrong_path = False
+
+    def _fast_forward(self, instructions: int):
+        self._cursor += instructions
+        self._rob_trace = [index + instructions if index >= 0 else index
+                           for index in self._rob_trace]
+
+    def _execute_operation(self, rs: ReservationStation):
+        inst = rs.instruction
+        if inst.type in (InstructionType.BEQ, InstructionType.BNE):
+            super()._execute_operation(rs)
+            return
+
+        rob_entry = self.rob[rs.dest]
+        index = self._rob_trace[rs.dest]
+        if index < 0:
+            # Caminho errado: será descartada antes do commit
+            rob_entry.value = 0
+            rob_entry.ready = True
+            rob_entry.state = "Write"
+            return
+
+        base = index * RECORD_WORDS
+        if inst.type in (InstructionType.LW, InstructionType.SW):
+            rs.address = self._words[base + 1]
+            if inst.type == InstructionType.SW:
+                rob_entry.address = rs.address
+        rob_entry.value = self._words[base + 2]
+        rob_entry.ready = True
+        rob_entry.state = "Write"
+
+    def _branch_outcome(self, rs: ReservationStation, inst: Instruction) -> bool:
+        index = self._rob_trace[rs.dest]
+        if index < 0:
+            return False
+        return bool(self._words[index * RECORD_WORDS] & 1)
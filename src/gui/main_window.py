@@ -1,27 +1,89 @@
 """
 Interface gráfica para o simulador de Tomasulo
 """
+import threading
 from PyQt5.QtWidgets import (
     QMainWindow, QWidget, QVBoxLayout, QHBoxLayout, 
-    QTextEdit, QPushButton, QLabel, QTableWidget, 
-    QTableWidgetItem, QSplitter, QGroupBox, QFileDialog,
-    QMessageBox, QSpinBox, QFormLayout
+    QTextEdit, QPushButton, QLabel, QTableView, QHeaderView,
+    QSplitter, QGroupBox, QFileDialog,
+    QMessageBox, QSpinBox, QFormLayout, QComboBox, QCheckBox, QLineEdit
 )
-from PyQt5.QtCore import Qt, QTimer
-from PyQt5.QtGui import QFont, QColor
-from src.core.simulator import TomasuloSimulator
+from PyQt5.QtCore import Qt, QTimer, QThread
+from PyQt5.QtGui import QFont
+from src.core.simulator import TomasuloSimulator, SimulationStalled
+from src.core.result_cache import ResultCache, SimulationResult, warm_state
+from src.core.dataflow import analyze
+from src.core.server import SimulationClient, server_available
+from src.core.breakpoints import Breakpoint, parse_breakpoints
 from src.mips.parser import MIPSParser
+from src.gui.worker import ServerJobWorker
+from src.gui.stream_bridge import StreamBridge
+from src.gui.sparkline import Sparkline
+from src.gui.models import (
+    InstructionsTableModel, ReservationStationsModel,
+    ROBTableModel, RegistersTableModel
+)
 
 
 class SimulatorGUI(QMainWindow):
     """Interface gráfica principal do simulador"""
     
+    # Velocidades da execução automática (ciclos por segundo; 0 = sem limite).
+    # Acima de ~60 ciclos/s, cada lote executa vários ciclos e os repaints
+    # intermediários são pulados
+    SPEEDS = [
+        ('0,25 ciclo/s', 0.25),
+        ('0,5 ciclo/s', 0.5),
+        ('1 ciclo/s', 1),
+        ('2 ciclos/s', 2),
+        ('10 ciclos/s', 10),
+        ('100 ciclos/s', 100),
+        ('1000 ciclos/s', 1000),
+        ('10 mil ciclos/s', 10_000),
+        ('100 mil ciclos/s', 100_000),
+        ('Máxima', 0),
+    ]
+    DEFAULT_SPEED_INDEX = 3
+    
+    # Políticas de seleção do estágio de execução
+    SCHEDULERS = [
+        ('Mais antiga primeiro', 'oldest_first'),
+        ('Caminho crítico', 'critical_path'),
+        ('Aleatória', 'random'),
+    ]
+    
+    # Intervalo de repaint durante execuções em background (~60 Hz)
+    REPAINT_INTERVAL_MS = 16
+    
+    # Ciclos por ponto dos gráficos de IPC e ocupação do ROB
+    STATS_INTERVAL = 10
+    
+    # Instruções dinâmicas percorridas pela análise de fluxo de dados no carregamento
+    BOUND_INSTRUCTIONS = 200_000
+    
     def __init__(self):
         super().__init__()
         self.simulator = None
         self.parser = MIPSParser()
-        self.auto_run_timer = QTimer()
-        self.auto_run_timer.timeout.connect(self.step_simulation)
+        
+        # Cache de resultados de "Executar Tudo" (aberto no primeiro uso)
+        self.result_cache = None
+        self._program = None  # (instruções, configuração) do programa carregado
+        self._source = None  # Código do programa carregado (para o servidor de simulação)
+        self._cache_pending = False  # A execução em andamento começou do ciclo 0
+        self._cache_warm = None  # Estado aquecido (memória/preditor) no início dessa execução
+        self.ipc_bound = None  # Limites da análise de fluxo de dados do programa carregado
+        
+        # Execução em background
+        self.sim_lock = threading.Lock()
+        self.worker = None
+        self.worker_thread = None
+        self.server_worker = None  # Job de "Executar Tudo" no servidor local de simulação
+        self.server_thread = None
+        self._pending_batch = None  # Lote do fluxo ainda não exibido
+        self._pause_reason = None  # Evento que pausou a execução automática
+        self.repaint_timer = QTimer()
+        self.repaint_timer.timeout.connect(self._repaint_batch)
         
         self.init_ui()
         
@@ -109,6 +171,52 @@ class SimulatorGUI(QMainWindow):
         self.rob_size_spin.setValue(16)
         config_layout.addRow("ROB Size:", self.rob_size_spin)
         
+        self.mul_fus_spin = QSpinBox()
+        self.mul_fus_spin.setRange(0, 10)
+        self.mul_fus_spin.setValue(0)
+        self.mul_fus_spin.setSpecialValueText('Uma por RS')
+        config_layout.addRow("Unidades Mult:", self.mul_fus_spin)
+        
+        self.scheduler_combo = QComboBox()
+        for label, _ in self.SCHEDULERS:
+            self.scheduler_combo.addItem(label)
+        config_layout.addRow("Escalonador:", self.scheduler_combo)
+        
+        self.speed_combo = QComboBox()
+        for label, _ in self.SPEEDS:
+            self.speed_combo.addItem(label)
+        self.speed_combo.setCurrentIndex(self.DEFAULT_SPEED_INDEX)
+        self.speed_combo.currentIndexChanged.connect(self._speed_changed)
+        config_layout.addRow("Velocidade:", self.speed_combo)
+        
+        # Breakpoints: pausam "Executar Tudo" e a execução automática
+        stop_layout = QHBoxLayout()
+        self.stop_mispredict_check = QCheckBox('Misprediction')
+        self.stop_rob_full_check = QCheckBox('ROB cheio')
+        self.stop_pc_spin = QSpinBox()
+        self.stop_pc_spin.setRange(-1, 1000000)
+        self.stop_pc_spin.setValue(-1)
+        self.stop_pc_spin.setPrefix('Issue PC ')
+        self.stop_pc_spin.setSpecialValueText('Issue PC -')
+        for widget in (self.stop_mispredict_check, self.stop_rob_full_check):
+            widget.toggled.connect(self._apply_breakpoints)
+            stop_layout.addWidget(widget)
+        self.stop_pc_spin.valueChanged.connect(self._apply_breakpoints)
+        stop_layout.addWidget(self.stop_pc_spin)
+        config_layout.addRow("Parar em:", stop_layout)
+        
+        self.breakpoints_edit = QLineEdit()
+        self.breakpoints_edit.setPlaceholderText('ex.: ciclo 2000000, commit 12, reg R4, mem 200')
+        self.breakpoints_edit.editingFinished.connect(self._apply_breakpoints)
+        config_layout.addRow("Breakpoints:", self.breakpoints_edit)
+        
+        self.history_spin = QSpinBox()
+        self.history_spin.setRange(0, 1024)
+        self.history_spin.setValue(16)
+        self.history_spin.setSuffix(' MB')
+        self.history_spin.valueChanged.connect(self._history_budget_changed)
+        config_layout.addRow("Histórico:", self.history_spin)
+        
         config_group.setLayout(config_layout)
         layout.addWidget(config_group)
         
@@ -124,6 +232,18 @@ class SimulatorGUI(QMainWindow):
         self.step_btn.setEnabled(False)
         control_layout.addWidget(self.step_btn)
         
+        step_back_layout = QHBoxLayout()
+        self.step_back_btn = QPushButton('Voltar Ciclos')
+        self.step_back_btn.clicked.connect(self.step_back_simulation)
+        self.step_back_btn.setEnabled(False)
+        step_back_layout.addWidget(self.step_back_btn)
+        
+        self.step_back_spin = QSpinBox()
+        self.step_back_spin.setRange(1, 1000000)
+        self.step_back_spin.setValue(1)
+        step_back_layout.addWidget(self.step_back_spin)
+        control_layout.addLayout(step_back_layout)
+        
         self.run_btn = QPushButton('Executar Tudo')
         self.run_btn.clicked.connect(self.run_simulation)
         self.run_btn.setEnabled(False)
@@ -173,12 +293,8 @@ class SimulatorGUI(QMainWindow):
         # Tabela de instruções
         inst_group = QGroupBox("Instruções")
         inst_layout = QVBoxLayout()
-        self.instructions_table = QTableWidget()
-        self.instructions_table.setColumnCount(8)
-        self.instructions_table.setHorizontalHeaderLabels([
-            'PC', 'Instrução', 'Estágio', 'Issue', 'Exec', 
-            'Write', 'Commit', 'ROB'
-        ])
+        self.instructions_model = InstructionsTableModel(self)
+        self.instructions_table = self._create_table_view(self.instructions_model)
         inst_layout.addWidget(self.instructions_table)
         inst_group.setLayout(inst_layout)
         tables_splitter.addWidget(inst_group)
@@ -186,11 +302,8 @@ class SimulatorGUI(QMainWindow):
         # Tabela de Reservation Stations
         rs_group = QGroupBox("Reservation Stations")
         rs_layout = QVBoxLayout()
-        self.rs_table = QTableWidget()
-        self.rs_table.setColumnCount(8)
-        self.rs_table.setHorizontalHeaderLabels([
-            'Nome', 'Busy', 'Op', 'Vj', 'Vk', 'Qj', 'Qk', 'Dest'
-        ])
+        self.rs_model = ReservationStationsModel(self)
+        self.rs_table = self._create_table_view(self.rs_model)
         rs_layout.addWidget(self.rs_table)
         rs_group.setLayout(rs_layout)
         tables_splitter.addWidget(rs_group)
@@ -198,11 +311,8 @@ class SimulatorGUI(QMainWindow):
         # Tabela de ROB
         rob_group = QGroupBox("Reorder Buffer (ROB)")
         rob_layout = QVBoxLayout()
-        self.rob_table = QTableWidget()
-        self.rob_table.setColumnCount(7)
-        self.rob_table.setHorizontalHeaderLabels([
-            'Entry', 'Busy', 'Instrução', 'Estado', 'Destino', 'Valor', 'Ready'
-        ])
+        self.rob_model = ROBTableModel(self)
+        self.rob_table = self._create_table_view(self.rob_model)
         rob_layout.addWidget(self.rob_table)
         rob_group.setLayout(rob_layout)
         tables_splitter.addWidget(rob_group)
@@ -213,9 +323,8 @@ class SimulatorGUI(QMainWindow):
         # Tabela de registradores
         reg_group = QGroupBox("Registradores")
         reg_layout = QVBoxLayout()
-        self.registers_table = QTableWidget()
-        self.registers_table.setColumnCount(4)
-        self.registers_table.setHorizontalHeaderLabels(['Reg', 'Valor', 'Reg', 'Valor'])
+        self.registers_model = RegistersTableModel(self)
+        self.registers_table = self._create_table_view(self.registers_model)
         reg_layout.addWidget(self.registers_table)
         reg_group.setLayout(reg_layout)
         bottom_splitter.addWidget(reg_group)
@@ -227,6 +336,10 @@ class SimulatorGUI(QMainWindow):
         self.metrics_text.setReadOnly(True)
         self.metrics_text.setMaximumHeight(200)
         metrics_layout.addWidget(self.metrics_text)
+        self.ipc_sparkline = Sparkline('IPC')
+        metrics_layout.addWidget(self.ipc_sparkline)
+        self.rob_sparkline = Sparkline('Ocupação do ROB')
+        metrics_layout.addWidget(self.rob_sparkline)
         metrics_group.setLayout(metrics_layout)
         bottom_splitter.addWidget(metrics_group)
         
@@ -237,6 +350,15 @@ class SimulatorGUI(QMainWindow):
         panel.setLayout(layout)
         return panel
         
+    def _create_table_view(self, model):
+        """Cria uma tabela virtualizada ligada a um modelo do simulador"""
+        view = QTableView()
+        view.setModel(model)
+        # Altura fixa de linha: a view não precisa medir linhas fora da área visível
+        view.verticalHeader().setSectionResizeMode(QHeaderView.Fixed)
+        view.verticalHeader().setVisible(False)
+        return view
+        
     def load_file(self):
         """Carrega um arquivo MIPS"""
         filename, _ = QFileDialog.getOpenFileName(
@@ -281,6 +403,8 @@ DIV R7, R5, R6     # R7 = R5 / R6 = 300
         
     def load_program(self):
         """Carrega o programa no simulador"""
+        self.stop_worker()
+        self.stop_server_job()
         code = self.code_editor.toPlainText()
         if not code.strip():
             QMessageBox.warning(self, 'Aviso', 'Por favor, digite um programa MIPS')
@@ -300,16 +424,32 @@ DIV R7, R5, R6     # R7 = R5 / R6 = 300
                 'add_rs': self.add_rs_spin.value(),
                 'mul_rs': self.mul_rs_spin.value(),
                 'rob_size': self.rob_size_spin.value(),
+                'mul_fus': self.mul_fus_spin.value() or None,
+                'scheduler': self.SCHEDULERS[self.scheduler_combo.currentIndex()][1],
             }
             
             self.simulator = TomasuloSimulator(config)
             self.simulator.load_program(instructions)
+            self._program = (instructions, config)
+            self._source = code
+            self.ipc_bound = analyze(instructions, config, self.BOUND_INSTRUCTIONS)
+            self.simulator.enable_history(self.history_spin.value() * 1024 * 1024)
+            self.simulator.enable_versions()
+            self.simulator.enable_breakpoints()
+            self._apply_breakpoints()
+            self.simulator.enable_interval_stats(self.STATS_INTERVAL, sample_every=1)
+            
+            # Associar os modelos das tabelas ao novo simulador
+            for model, view in self._table_models():
+                model.set_simulator(self.simulator)
+                view.resizeColumnsToContents()
             
             # Atualizar interface
             self.update_display()
             
             # Habilitar botões
             self.step_btn.setEnabled(True)
+            self.step_back_btn.setEnabled(True)
             self.run_btn.setEnabled(True)
             self.auto_run_btn.setEnabled(True)
             self.reset_btn.setEnabled(True)
@@ -323,54 +463,277 @@ DIV R7, R5, R6     # R7 = R5 / R6 = 300
             
     def step_simulation(self):
         """Executa um ciclo da simulação"""
-        if not self.simulator:
+        if not self.simulator or self.worker is not None:
             return
             
         if not self.simulator.finished:
-            self.simulator.step()
+            try:
+                self.simulator.step()
+            except SimulationStalled as e:
+                self.update_display()
+                self._simulation_stalled(str(e))
+                return
             self.update_display()
             
             if self.simulator.finished:
-                self.auto_run_timer.stop()
-                self.auto_run_btn.setText('Execução Automática')
                 QMessageBox.information(self, 'Concluído', 'Simulação finalizada!')
                 self.show_final_metrics()
-        else:
-            self.auto_run_timer.stop()
-            self.auto_run_btn.setText('Execução Automática')
+                
+    def _simulation_stalled(self, message: str):
+        """Mostra o diagnóstico de uma simulação sem progresso"""
+        QMessageBox.warning(self, 'Simulação travada', message)
+        
+    def step_back_simulation(self):
+        """Volta N ciclos usando o histórico de deltas"""
+        if not self.simulator or self.worker is not None:
+            return
+            
+        undone = self.simulator.step_back(self.step_back_spin.value())
+        if undone == 0:
+            self.statusBar().showMessage('Sem histórico para voltar')
+            return
             
+        self.update_display(self.simulator.history.last_touched)
+        self.statusBar().showMessage(f'{undone} ciclo(s) desfeito(s)')
+        
+    def _history_budget_changed(self, megabytes):
+        """Aplica o novo orçamento de memória do histórico"""
+        if self.simulator and self.simulator.history is not None:
+            with self.sim_lock:
+                self.simulator.history.set_budget(megabytes * 1024 * 1024)
+                
     def run_simulation(self):
-        """Executa a simulação até o final"""
+        """Executa a simulação até o final (ou cancela a execução em andamento)"""
         if not self.simulator:
             return
             
-        self.simulator.run_until_complete()
+        if self.worker is not None:
+            self.stop_worker()
+            return
+        if self.server_worker is not None:
+            self.stop_server_job()
+            return
+            
+        # Execução completa a partir do início: consultar o cache de resultados
+        # (que não conhece breakpoints). Após "Resetar", memória e preditor
+        # continuam aquecidos e entram na chave.
+        if self.simulator.current_cycle == 0 and not len(self.simulator.breakpoints):
+            self._cache_warm = warm_state(self.simulator)
+            cached = self._cache().get(*self._program, warm=self._cache_warm)
+            if cached is not None and cached.finished:
+                self._show_result(cached, 'Resultado obtido do cache')
+                return
+            # Com um servidor local em execução, o resultado vem de um worker aquecido
+            # (que parte da memória vazia)
+            if not self._cache_warm and server_available():
+                self.start_server_job()
+                return
+            self._cache_pending = True
+            
+        self.start_worker(0)
+        self.run_btn.setText('Cancelar')
+        
+    def start_server_job(self):
+        """Executa o programa carregado no servidor local de simulação"""
+        job = SimulationClient().submit('run', source=self._source, config=self._program[1])
+        self.server_thread = QThread()
+        self.server_worker = ServerJobWorker(job)
+        self.server_worker.moveToThread(self.server_thread)
+        self.server_thread.started.connect(self.server_worker.run)
+        self.server_worker.progress.connect(
+            lambda cycle: self.statusBar().showMessage(f'Simulando no servidor... ciclo {cycle}'))
+        self.server_worker.failed.connect(
+            lambda message: QMessageBox.warning(self, 'Servidor de simulação', message))
+        self.server_worker.done.connect(self._server_job_done)
+        
+        self.run_btn.setText('Cancelar')
+        self.server_thread.start()
+        self.statusBar().showMessage('Simulando no servidor...')
+        
+    def stop_server_job(self):
+        """Cancela o job em andamento no servidor (a resposta encerra a thread)"""
+        if self.server_worker is not None:
+            self.server_worker.cancel()
+            
+    def _server_job_done(self, result):
+        """Finaliza a espera pelo servidor e mostra o resultado"""
+        self.server_thread.quit()
+        self.server_thread.wait()
+        self.server_worker.deleteLater()
+        self.server_thread.deleteLater()
+        self.server_worker = None
+        self.server_thread = None
+        
+        self.run_btn.setText('Executar Tudo')
+        if result is not None and result.finished:
+            self._show_result(result, 'Resultado obtido do servidor de simulação')
+        elif result is not None:
+            # Orçamento atingido no servidor: o estado intermediário não vem na
+            # resposta, então a execução é refeita localmente
+            self._cache_pending = True
+            self.start_worker(0)
+            if self.worker is not None:
+                self.run_btn.setText('Cancelar')
+        else:
+            self.statusBar().showMessage('Execução no servidor interrompida')
+            
+    def _show_result(self, result: SimulationResult, message: str):
+        """Leva o simulador e as tabelas ao estado final de um resultado pronto"""
+        result.apply_to(self.simulator)
         self.update_display()
-        self.show_final_metrics()
+        self.statusBar().showMessage(message)
+        self.show_final_metrics(result)
+        
+    def _cache(self) -> ResultCache:
+        """Cache de resultados persistente (aberto sob demanda)"""
+        if self.result_cache is None:
+            self.result_cache = ResultCache()
+        return self.result_cache
         
     def toggle_auto_run(self):
         """Alterna execução automática"""
-        if self.auto_run_timer.isActive():
-            self.auto_run_timer.stop()
-            self.auto_run_btn.setText('Execução Automática')
+        if self.worker is not None:
+            self.stop_worker()
         else:
-            self.auto_run_timer.start(500)  # 500ms por ciclo
+            self.start_worker(self._selected_speed())
             self.auto_run_btn.setText('Pausar')
             
+    def start_worker(self, cycles_per_second):
+        """Inicia a simulação em uma thread separada"""
+        if not self.simulator or self.simulator.finished:
+            return
+            
+        self.worker_thread = QThread()
+        self.worker = StreamBridge(self.simulator, self.sim_lock, cycles_per_second)
+        self.worker.moveToThread(self.worker_thread)
+        self.worker_thread.started.connect(self.worker.run)
+        self.worker.batch.connect(self._worker_batch)
+        self.worker.done.connect(self._worker_done)
+        self.worker.stalled.connect(self._simulation_stalled)
+        self.worker.paused.connect(self._worker_paused)
+        self._pause_reason = None
+        
+        self.step_btn.setEnabled(False)
+        self.step_back_btn.setEnabled(False)
+        self.load_btn.setEnabled(False)
+        self.repaint_timer.start(self.REPAINT_INTERVAL_MS)
+        self.worker_thread.start()
+        self.statusBar().showMessage('Simulando...')
+        
+    def stop_worker(self):
+        """Cancela a execução em background e espera a thread terminar"""
+        if self.worker is None:
+            return
+        self.worker.cancel()
+        self._worker_done(False)
+        
+    def _worker_paused(self, reason):
+        """Guarda o evento que pausou a execução (mostrado ao finalizar o worker)"""
+        self._pause_reason = reason
+        
+    def _worker_batch(self, batch):
+        """Guarda o lote; o repaint ocorre no próximo tick do timer"""
+        self._pending_batch = batch
+        
+    def _repaint_batch(self):
+        """Repaint limitado à taxa do timer, só das linhas alteradas pelo lote recebido"""
+        batch, self._pending_batch = self._pending_batch, None
+        if batch is None:
+            return
+        self.update_display(batch=batch)
+        if self.worker is not None:
+            self.worker.ack()  # Pronto para o próximo lote do fluxo
+            
+    def _worker_done(self, finished):
+        """Finaliza a execução em background"""
+        if self.worker is None:
+            return
+        self.repaint_timer.stop()
+        self.worker_thread.quit()
+        self.worker_thread.wait()
+        self.worker.deleteLater()
+        self.worker_thread.deleteLater()
+        self.worker = None
+        self.worker_thread = None
+        self._pending_batch = None
+        if finished and self._cache_pending:
+            self._cache().put(*self._program, SimulationResult.from_simulator(self.simulator),
+                              warm=self._cache_warm)
+        self._cache_pending = False
+        
+        self.run_btn.setText('Executar Tudo')
+        self.auto_run_btn.setText('Execução Automática')
+        self.step_btn.setEnabled(True)
+        self.step_back_btn.setEnabled(True)
+        self.load_btn.setEnabled(True)
+        self.update_display()
+        
+        if finished:
+            self.statusBar().showMessage('Simulação finalizada')
+            self.show_final_metrics()
+        elif self._pause_reason is not None:
+            self.statusBar().showMessage(
+                f'Pausado no ciclo {self.simulator.current_cycle}: {self._pause_reason}')
+        else:
+            self.statusBar().showMessage(f'Pausado no ciclo {self.simulator.current_cycle}')
+            
+    def _selected_speed(self):
+        """Velocidade selecionada (ciclos por segundo; 0 = sem limite)"""
+        return self.SPEEDS[self.speed_combo.currentIndex()][1]
+        
+    def _speed_changed(self, index):
+        """Aplica a nova velocidade à execução em andamento"""
+        if self.worker is not None:
+            self.worker.set_speed(self.SPEEDS[index][1])
+            
+    def _breakpoint_list(self):
+        """Breakpoints selecionados (caixas de seleção, PC e texto livre)"""
+        breakpoints = []
+        if self.stop_mispredict_check.isChecked():
+            breakpoints.append(Breakpoint('mispredict'))
+        if self.stop_rob_full_check.isChecked():
+            breakpoints.append(Breakpoint('rob_full'))
+        if self.stop_pc_spin.value() >= 0:
+            breakpoints.append(Breakpoint('issue', self.stop_pc_spin.value()))
+        return breakpoints + parse_breakpoints(self.breakpoints_edit.text())
+        
+    def _apply_breakpoints(self, *args):
+        """Compila os breakpoints selecionados no simulador (também durante a execução)"""
+        if not self.simulator:
+            return
+        try:
+            breakpoints = self._breakpoint_list()
+        except ValueError as e:
+            self.statusBar().showMessage(f'Breakpoint inválido: {e}')
+            return
+        with self.sim_lock:
+            self.simulator.breakpoints.replace(breakpoints)
+            
     def reset_simulation(self):
         """Reseta a simulação"""
+        self.stop_worker()
         if self.simulator:
             self.simulator.reset()
             self.update_display()
             self.statusBar().showMessage('Simulação resetada')
             
-    def show_final_metrics(self):
-        """Mostra métricas finais"""
+    def _table_models(self):
+        """Pares (modelo, view) das tabelas ligadas ao simulador"""
+        return [
+            (self.instructions_model, self.instructions_table),
+            (self.rs_model, self.rs_table),
+            (self.rob_model, self.rob_table),
+            (self.registers_model, self.registers_table),
+        ]
+        
+    def show_final_metrics(self, result: SimulationResult = None):
+        """Mostra métricas finais (do simulador ou de um resultado do cache)"""
         if not self.simulator:
             return
             
-        metrics = self.simulator.metrics
-        bp = self.simulator.branch_predictor
+        if result is None:
+            result = SimulationResult.from_simulator(self.simulator)
+        metrics = result.metrics
         
         msg = f"""Simulação Finalizada!
 
@@ -380,166 +743,77 @@ Métricas de Desempenho:
 Total de Ciclos: {metrics.total_cycles}
 Instruções Completadas: {metrics.instructions_completed}
 IPC (Instructions Per Cycle): {metrics.get_ipc():.3f}
+{self._bound_text(metrics)}
 
 Ciclos de Bolha: {metrics.bubble_cycles}
 Ciclos de Stall: {metrics.stall_cycles}
+Ciclos com ROB Cheio: {metrics.rob_full_cycles}
 
 Desvios:
   Mispredictions: {metrics.branch_mispredictions}
-  Predições: {bp.predictions}
-  Taxa de Acerto: {bp.get_accuracy()*100:.1f}%
+  Predições: {result.predictions}
+  Taxa de Acerto: {result.branch_accuracy*100:.1f}%
 """
         QMessageBox.information(self, 'Métricas Finais', msg)
         
-    def update_display(self):
+    def update_display(self, touched_instructions=None, batch=None):
         """Atualiza toda a interface"""
         if not self.simulator:
             return
             
+        # O worker pode estar avançando o simulador em outra thread
+        with self.sim_lock:
+            self._update_display_locked(touched_instructions, batch)
+            
+    def _update_display_locked(self, touched_instructions=None, batch=None):
+        """Atualiza a interface (com o lock do simulador adquirido)"""
         # Atualizar labels
         self.cycle_label.setText(f'Ciclo: {self.simulator.current_cycle}')
         self.pc_label.setText(f'PC: {self.simulator.pc}')
         status = 'Finalizado' if self.simulator.finished else 'Executando'
         self.status_label.setText(f'Status: {status}')
         
-        # Atualizar tabelas
-        self.update_instructions_table()
-        self.update_rs_table()
-        self.update_rob_table()
-        self.update_registers_table()
+        # Atualizar tabelas (ao voltar ciclos, as linhas alteradas vêm do histórico;
+        # em background, das chaves alteradas do lote do fluxo)
+        if batch is not None and not batch.full:
+            self.instructions_model.refresh(changed=batch.instructions)
+            self.rs_model.refresh(changed=batch.stations)
+            self.rob_model.refresh(changed=batch.rob)
+            self.registers_model.refresh(changed=batch.registers)
+        else:
+            self.update_instructions_table(touched_instructions)
+            backwards = touched_instructions is not None
+            self.update_rs_table(backwards)
+            self.update_rob_table(backwards)
+            self.update_registers_table(backwards)
         self.update_metrics()
         
-    def update_instructions_table(self):
+    def update_instructions_table(self, touched=None):
         """Atualiza a tabela de instruções"""
-        instructions = self.simulator.instructions
-        self.instructions_table.setRowCount(len(instructions))
-        
-        for i, inst in enumerate(instructions):
-            self.instructions_table.setItem(i, 0, QTableWidgetItem(str(inst.pc)))
-            self.instructions_table.setItem(i, 1, QTableWidgetItem(str(inst)))
-            self.instructions_table.setItem(i, 2, QTableWidgetItem(inst.stage.value))
-            self.instructions_table.setItem(i, 3, QTableWidgetItem(
-                str(inst.issue_cycle) if inst.issue_cycle else '-'
-            ))
-            self.instructions_table.setItem(i, 4, QTableWidgetItem(
-                str(inst.exec_start_cycle) if inst.exec_start_cycle else '-'
-            ))
-            self.instructions_table.setItem(i, 5, QTableWidgetItem(
-                str(inst.write_cycle) if inst.write_cycle else '-'
-            ))
-            self.instructions_table.setItem(i, 6, QTableWidgetItem(
-                str(inst.commit_cycle) if inst.commit_cycle else '-'
-            ))
-            self.instructions_table.setItem(i, 7, QTableWidgetItem(
-                f'ROB{inst.rob_entry}' if inst.rob_entry is not None else '-'
-            ))
-            
-            # Colorir linha baseado no estágio
-            color = self._get_stage_color(inst.stage)
-            for j in range(8):
-                item = self.instructions_table.item(i, j)
-                if item:
-                    item.setBackground(color)
-                    
-        self.instructions_table.resizeColumnsToContents()
-        
-    def update_rs_table(self):
+        self.instructions_model.refresh(touched)
+        
+    def update_rs_table(self, backwards=False):
         """Atualiza a tabela de reservation stations"""
-        all_rs = (self.simulator.add_rs + self.simulator.mul_rs + 
-                  self.simulator.load_rs + self.simulator.store_rs)
-        
-        self.rs_table.setRowCount(len(all_rs))
-        
-        for i, rs in enumerate(all_rs):
-            self.rs_table.setItem(i, 0, QTableWidgetItem(rs.name))
-            self.rs_table.setItem(i, 1, QTableWidgetItem('Sim' if rs.busy else 'Não'))
-            self.rs_table.setItem(i, 2, QTableWidgetItem(
-                rs.op.value if rs.op else '-'
-            ))
-            self.rs_table.setItem(i, 3, QTableWidgetItem(
-                str(rs.vj) if rs.vj is not None else '-'
-            ))
-            self.rs_table.setItem(i, 4, QTableWidgetItem(
-                str(rs.vk) if rs.vk is not None else '-'
-            ))
-            self.rs_table.setItem(i, 5, QTableWidgetItem(
-                f'ROB{rs.qj}' if rs.qj is not None else '-'
-            ))
-            self.rs_table.setItem(i, 6, QTableWidgetItem(
-                f'ROB{rs.qk}' if rs.qk is not None else '-'
-            ))
-            self.rs_table.setItem(i, 7, QTableWidgetItem(
-                f'ROB{rs.dest}' if rs.dest is not None else '-'
-            ))
-            
-            # Colorir se ocupado
-            color = QColor(255, 200, 200) if rs.busy else QColor(200, 255, 200)
-            for j in range(8):
-                item = self.rs_table.item(i, j)
-                if item:
-                    item.setBackground(color)
-                    
-        self.rs_table.resizeColumnsToContents()
-        
-    def update_rob_table(self):
+        self.rs_model.refresh(() if backwards else None)
+        
+    def update_rob_table(self, backwards=False):
         """Atualiza a tabela do ROB"""
-        self.rob_table.setRowCount(len(self.simulator.rob))
-        
-        for i, entry in enumerate(self.simulator.rob):
-            # Marcar head e tail
-            entry_text = f'ROB{i}'
-            if i == self.simulator.rob_head:
-                entry_text += ' (H)'
-            if i == self.simulator.rob_tail:
-                entry_text += ' (T)'
-                
-            self.rob_table.setItem(i, 0, QTableWidgetItem(entry_text))
-            self.rob_table.setItem(i, 1, QTableWidgetItem('Sim' if entry.busy else 'Não'))
-            self.rob_table.setItem(i, 2, QTableWidgetItem(
-                str(entry.instruction) if entry.instruction else '-'
-            ))
-            self.rob_table.setItem(i, 3, QTableWidgetItem(entry.state))
-            self.rob_table.setItem(i, 4, QTableWidgetItem(str(entry.dest) if entry.dest else '-'))
-            self.rob_table.setItem(i, 5, QTableWidgetItem(str(entry.value) if entry.value is not None else '-'))
-            self.rob_table.setItem(i, 6, QTableWidgetItem('Sim' if entry.ready else 'Não'))
-            
-            # Colorir
-            if entry.busy:
-                if i == self.simulator.rob_head:
-                    color = QColor(255, 255, 150)  # Amarelo para head
-                elif entry.speculative:
-                    color = QColor(255, 200, 150)  # Laranja para especulativo
-                else:
-                    color = QColor(200, 200, 255)  # Azul claro para ativo
-            else:
-                color = QColor(240, 240, 240)  # Cinza para livre
-                
-            for j in range(7):
-                item = self.rob_table.item(i, j)
-                if item:
-                    item.setBackground(color)
-                    
-        self.rob_table.resizeColumnsToContents()
-        
-    def update_registers_table(self):
+        self.rob_model.refresh(() if backwards else None)
+        
+    def update_registers_table(self, backwards=False):
         """Atualiza a tabela de registradores"""
-        # Mostrar primeiros 16 registradores em 2 colunas
-        self.registers_table.setRowCount(8)
-        
-        for i in range(8):
-            # Coluna 1
-            reg1 = f'R{i}'
-            val1 = self.simulator.registers.get(reg1, 0)
-            self.registers_table.setItem(i, 0, QTableWidgetItem(reg1))
-            self.registers_table.setItem(i, 1, QTableWidgetItem(str(val1)))
-            
-            # Coluna 2
-            reg2 = f'R{i+8}'
-            val2 = self.simulator.registers.get(reg2, 0)
-            self.registers_table.setItem(i, 2, QTableWidgetItem(reg2))
-            self.registers_table.setItem(i, 3, QTableWidgetItem(str(val2)))
-            
-        self.registers_table.resizeColumnsToContents()
+        self.registers_model.refresh(() if backwards else None)
+        
+    def _bound_text(self, metrics) -> str:
+        """IPC alcançado comparado ao limite da análise de fluxo de dados"""
+        bound = self.ipc_bound
+        if bound is None or bound.ipc_bound == 0:
+            return 'Limite de IPC: -'
+        approx = '≈' if bound.truncated else ''
+        achieved = metrics.get_ipc() / bound.ipc_bound * 100
+        limiter = 'fluxo de dados' if bound.limiter == 'dataflow' else f'RS {bound.limiter}'
+        return (f"Limite de IPC: {approx}{bound.ipc_bound:.3f} ({achieved:.0f}% alcançado, "
+                f"limitado por {limiter})")
         
     def update_metrics(self):
         """Atualiza as métricas"""
@@ -550,9 +824,11 @@ Desvios:
 Instruções Despachadas: {metrics.instructions_issued}
 Instruções Completadas: {metrics.instructions_completed}
 IPC: {metrics.get_ipc():.3f}
+{self._bound_text(metrics)}
 
 Ciclos de Bolha: {metrics.bubble_cycles}
 Ciclos de Stall: {metrics.stall_cycles}
+Ciclos com ROB Cheio: {metrics.rob_full_cycles}
 
 Preditor de Desvios:
   Predições: {bp.predictions}
@@ -562,13 +838,7 @@ Preditor de Desvios:
 """
         self.metrics_text.setPlainText(text)
         
-    def _get_stage_color(self, stage):
-        """Retorna cor baseada no estágio"""
-        colors = {
-            'Aguardando': QColor(240, 240, 240),
-            'Despachada': QColor(200, 220, 255),
-            'Executando': QColor(255, 255, 150),
-            'Escrita de Resultado': QColor(200, 255, 200),
-            'Commit': QColor(150, 255, 150),
-        }
-        return colors.get(stage.value, QColor(255, 255, 255))
+        stats = self.simulator.interval_stats
+        if stats is not None:
+            self.ipc_sparkline.set_values(stats.column('ipc'))
+            self.rob_sparkline.set_values(stats.column('rob_occupancy'))
@@ -0,0 +1,312 @@
+"""
+Modelos Qt (model/view) ligados diretamente ao estado do simulador
+
+Cada modelo mantém em cache o texto já formatado de cada linha e, a cada
+ciclo, reavalia apenas as linhas que podem ter mudado, emitindo dataChanged
+somente para as que de fato mudaram. Com versões habilitadas no simulador
+(`enable_versions`), as linhas candidatas são as alteradas desde o último
+refresh, inclusive ao voltar ciclos. Na execução em background, as chaves
+alteradas de cada lote do StateStream dão as linhas candidatas.
+"""
+from PyQt5.QtCore import Qt, QAbstractTableModel, QModelIndex
+from PyQt5.QtGui import QColor
+
+
+STAGE_COLORS = {
+    'Aguardando': QColor(240, 240, 240),
+    'Despachada': QColor(200, 220, 255),
+    'Executando': QColor(255, 255, 150),
+    'Escrita de Resultado': QColor(200, 255, 200),
+    'Commit': QColor(150, 255, 150),
+}
+
+RS_BUSY_COLOR = QColor(255, 200, 200)
+RS_FREE_COLOR = QColor(200, 255, 200)
+
+ROB_HEAD_COLOR = QColor(255, 255, 150)  # Amarelo para head
+ROB_SPECULATIVE_COLOR = QColor(255, 200, 150)  # Laranja para especulativo
+ROB_BUSY_COLOR = QColor(200, 200, 255)  # Azul claro para ativo
+ROB_FREE_COLOR = QColor(240, 240, 240)  # Cinza para livre
+
+
+def _cycle(value):
+    return str(value) if value else '-'
+
+
+class SimulatorTableModel(QAbstractTableModel):
+    """Modelo base: linhas em cache como tuplas (colunas..., cor)"""
+
+    headers = []
+    structure = None  # Estrutura de StateVersions exibida pelo modelo
+
+    def __init__(self, parent=None):
+        super().__init__(parent)
+        self.simulator = None
+        self._rows = []
+        self._last_cycle = 0
+        self._version = None
+
+    def set_simulator(self, simulator):
+        """Associa um (novo) simulador e reconstrói todas as linhas"""
+        self.beginResetModel()
+        self.simulator = simulator
+        self._rebuild()
+        self.endResetModel()
+
+    def _rebuild(self):
+        if self.simulator is None:
+            self._rows = []
+        else:
+            self._rows = [self._build_row(i) for i in range(self._row_count())]
+        self._last_cycle = self.simulator.current_cycle if self.simulator else 0
+        versions = self.simulator.versions if self.simulator else None
+        self._version = versions.version if versions is not None else None
+
+    def refresh(self, touched_rows=None, changed=None):
+        """
+        Atualiza o cache e notifica apenas as linhas alteradas
+        
+        Args:
+            touched_rows: Linhas alteradas fora do avanço normal (ex.: ao voltar
+                ciclos); sem essa informação, um ciclo anterior ao último
+                exibido força a reconstrução completa.
+            changed: Chaves da estrutura alteradas segundo um lote do
+                StateStream; substituem as versões e as linhas candidatas, que
+                continuam acumulando para o próximo refresh sem lote.
+        """
+        if self.simulator is None:
+            return
+
+        # Reset (ou restauração para ciclo anterior): reconstruir tudo
+        if ((touched_rows is None and self.simulator.current_cycle < self._last_cycle)
+                or self._row_count() != len(self._rows)):
+            self.set_simulator(self.simulator)
+            return
+
+        if changed is not None:
+            rows = sorted(row for row in self._rows_for(changed) if row < len(self._rows))
+        else:
+            rows = self._versioned_rows()
+            if rows is None:
+                rows = self._candidate_rows()
+        if touched_rows:
+            rows = sorted(set(rows).union(r for r in touched_rows if r < len(self._rows)))
+
+        last_column = len(self.headers) - 1
+        for row in rows:
+            new_row = self._build_row(row)
+            if new_row != self._rows[row]:
+                self._rows[row] = new_row
+                self.dataChanged.emit(self.index(row, 0), self.index(row, last_column))
+        self._last_cycle = self.simulator.current_cycle
+
+    def _row_count(self) -> int:
+        raise NotImplementedError
+
+    def _build_row(self, row: int) -> tuple:
+        raise NotImplementedError
+
+    def _candidate_rows(self):
+        """Linhas que podem ter mudado desde o último refresh"""
+        return range(len(self._rows))
+
+    def _versioned_rows(self):
+        """Linhas alteradas segundo as versões do simulador (None sem versões)"""
+        versions = self.simulator.versions
+        since = self._version
+        self._version = versions.version if versions is not None else None
+        if versions is None or since is None:
+            return None
+        changed = versions.changed(self.structure, since)
+        if changed is None:
+            return range(len(self._rows))
+        return sorted(row for row in self._rows_for(changed) if row < len(self._rows))
+
+    def _rows_for(self, keys) -> set:
+        """Linhas que exibem as chaves alteradas da estrutura"""
+        return set(keys)
+
+    # Interface QAbstractTableModel
+
+    def rowCount(self, parent=QModelIndex()):
+        if parent.isValid():
+            return 0
+        return len(self._rows)
+
+    def columnCount(self, parent=QModelIndex()):
+        if parent.isValid():
+            return 0
+        return len(self.headers)
+
+    def headerData(self, section, orientation, role=Qt.DisplayRole):
+        if role == Qt.DisplayRole and orientation == Qt.Horizontal:
+            return self.headers[section]
+        return None
+
+    def data(self, index, role=Qt.DisplayRole):
+        if not index.isValid():
+            return None
+        row = self._rows[index.row()]
+        if role == Qt.DisplayRole:
+            return row[index.column()]
+        if role == Qt.BackgroundRole:
+            return row[-1]
+        return None
+
+
+class InstructionsTableModel(SimulatorTableModel):
+    """Instruções do programa; só as instruções em voo são reavaliadas a cada ciclo"""
+
+    headers = ['PC', 'Instrução', 'Estágio', 'Issue', 'Exec', 'Write', 'Commit', 'ROB']
+    structure = 'instructions'
+
+    def __init__(self, parent=None):
+        super().__init__(parent)
+        self._active = set()
+
+    def _rebuild(self):
+        super()._rebuild()
+        self._active = self._in_flight() if self.simulator else set()
+
+    def _row_count(self) -> int:
+        return len(self.simulator.instructions)
+
+    def _build_row(self, row: int) -> tuple:
+        inst = self.simulator.instructions[row]
+        return (
+            str(inst.pc),
+            str(inst),
+            inst.stage.value,
+            _cycle(inst.issue_cycle),
+            _cycle(inst.exec_start_cycle),
+            _cycle(inst.write_cycle),
+            _cycle(inst.commit_cycle),
+            f'ROB{inst.rob_entry}' if inst.rob_entry is not None else '-',
+            STAGE_COLORS.get(inst.stage.value, QColor(255, 255, 255)),
+        )
+
+    def _in_flight(self) -> set:
+        """Linhas das instruções presentes no ROB"""
+        return {entry.instruction.pc for entry in self.simulator.rob
+                if entry.busy and entry.instruction is not None}
+
+    def _candidate_rows(self):
+        # Uma instrução só muda enquanto está no ROB; as que saíram neste
+        # ciclo (commit ou flush) ainda estão no conjunto anterior
+        active = self._in_flight()
+        candidates = self._active | active
+        self._active = active
+        return sorted(row for row in candidates if row < len(self._rows))
+
+
+class ReservationStationsModel(SimulatorTableModel):
+    """Estado de todas as reservation stations"""
+
+    headers = ['Nome', 'Busy', 'Op', 'Vj', 'Vk', 'Qj', 'Qk', 'Dest']
+    structure = 'stations'
+
+    def _stations(self):
+        sim = self.simulator
+        return sim.add_rs + sim.mul_rs + sim.load_rs + sim.store_rs
+
+    def _rebuild(self):
+        self._all_rs = self._stations() if self.simulator else []
+        super()._rebuild()
+
+    def _row_count(self) -> int:
+        return len(self._all_rs)
+
+    def _build_row(self, row: int) -> tuple:
+        rs = self._all_rs[row]
+        return (
+            rs.name,
+            'Sim' if rs.busy else 'Não',
+            rs.op.value if rs.op else '-',
+            str(rs.vj) if rs.vj is not None else '-',
+            str(rs.vk) if rs.vk is not None else '-',
+            f'ROB{rs.qj}' if rs.qj is not None else '-',
+            f'ROB{rs.qk}' if rs.qk is not None else '-',
+            f'ROB{rs.dest}' if rs.dest is not None else '-',
+            RS_BUSY_COLOR if rs.busy else RS_FREE_COLOR,
+        )
+
+
+class ROBTableModel(SimulatorTableModel):
+    """Entradas do Reorder Buffer, com marcação de head e tail"""
+
+    headers = ['Entry', 'Busy', 'Instrução', 'Estado', 'Destino', 'Valor', 'Ready']
+    structure = 'rob'
+
+    def _rebuild(self):
+        super()._rebuild()
+        self._markers = (self.simulator.rob_head, self.simulator.rob_tail) if self.simulator else ()
+
+    def _rows_for(self, keys) -> set:
+        # As marcações de head e tail mudam sem alterar as entradas
+        markers = (self.simulator.rob_head, self.simulator.rob_tail)
+        rows = set(keys).union(markers, self._markers)
+        self._markers = markers
+        return rows
+
+    def _row_count(self) -> int:
+        return len(self.simulator.rob)
+
+    def _build_row(self, row: int) -> tuple:
+        sim = self.simulator
+        entry = sim.rob[row]
+
+        entry_text = f'ROB{row}'
+        if row == sim.rob_head:
+            entry_text += ' (H)'
+        if row == sim.rob_tail:
+            entry_text += ' (T)'
+
+        if entry.busy:
+            if row == sim.rob_head:
+                color = ROB_HEAD_COLOR
+            elif entry.speculative:
+                color = ROB_SPECULATIVE_COLOR
+            else:
+                color = ROB_BUSY_COLOR
+        else:
+            color = ROB_FREE_COLOR
+
+        return (
+            entry_text,
+            'Sim' if entry.busy else 'Não',
+            str(entry.instruction) if entry.instruction else '-',
+            entry.state,
+            str(entry.dest) if entry.dest else '-',
+            str(entry.value) if entry.value is not None else '-',
+            'Sim' if entry.ready else 'Não',
+            color,
+        )
+
+
+class RegistersTableModel(SimulatorTableModel):
+    """Primeiros 16 registradores, em duas colunas de pares (registrador, valor)"""
+
+    headers = ['Reg', 'Valor', 'Reg', 'Valor']
+    structure = 'registers'
+    ROWS = 8
+
+    def _rows_for(self, keys) -> set:
+        rows = set()
+        for reg in keys:
+            index = int(reg[1:]) if reg[1:].isdigit() else 2 * self.ROWS
+            if index < 2 * self.ROWS:
+                rows.add(index % self.ROWS)
+        return rows
+
+    def _row_count(self) -> int:
+        return self.ROWS
+
+    def _build_row(self, row: int) -> tuple:
+        registers = self.simulator.registers
+        reg1 = f'R{row}'
+        reg2 = f'R{row + self.ROWS}'
+        return (
+            reg1, str(registers.get(reg1, 0)),
+            reg2, str(registers.get(reg2, 0)),
+            None,
+        )
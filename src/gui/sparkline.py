@@ -0,0 +1,52 @@
+"""
+Gráfico compacto (sparkline) para séries temporais
+"""
+import math
+from PyQt5.QtWidgets import QWidget
+from PyQt5.QtCore import Qt, QPointF
+from PyQt5.QtGui import QPainter, QPen, QColor, QPolygonF
+
+
+class Sparkline(QWidget):
+    """Desenha os últimos valores de uma série como uma linha, com o valor mais recente"""
+
+    LINE_COLOR = QColor(40, 100, 200)
+    TEXT_COLOR = QColor(80, 80, 80)
+
+    def __init__(self, label: str, max_points: int = 200, parent=None):
+        super().__init__(parent)
+        self.label = label
+        self.max_points = max_points
+        self._values = []
+        self.setMinimumHeight(40)
+
+    def set_values(self, values):
+        """Substitui a série exibida (apenas os últimos `max_points` valores)"""
+        values = [v for v in values[-self.max_points:] if not math.isnan(v)]
+        if values != self._values:
+            self._values = values
+            self.update()
+
+    def paintEvent(self, event):
+        painter = QPainter(self)
+        painter.setRenderHint(QPainter.Antialiasing)
+        width, height = self.width(), self.height()
+        values = self._values
+
+        painter.setPen(self.TEXT_COLOR)
+        last = f'{values[-1]:.2f}' if values else '-'
+        painter.drawText(4, 0, width - 8, height, Qt.AlignLeft | Qt.AlignTop,
+                         f'{self.label}: {last}')
+        if len(values) < 2:
+            return
+
+        top = max(max(values), 1e-9)
+        margin = 4
+        plot_height = height - 2 * margin
+        step = (width - 2 * margin) / (len(values) - 1)
+        line = QPolygonF([
+            QPointF(margin + i * step, margin + plot_height * (1 - value / top))
+            for i, value in enumerate(values)
+        ])
+        painter.setPen(QPen(self.LINE_COLOR, 1.5))
+        painter.drawPolyline(line)
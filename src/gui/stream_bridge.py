@@ -0,0 +1,95 @@
+"""
+Ponte entre o fluxo assíncrono de estados e o laço de eventos do Qt
+
+O laço do asyncio roda na thread do worker (QThread); os lotes chegam à
+interface por sinais (conexões enfileiradas do Qt). A interface assina o
+fluxo com perdas e consome no seu ritmo: um novo lote só é emitido depois de
+`ack`, e os lotes produzidos nesse meio-tempo são juntados em um só, sem
+atrasar a simulação. Cada lote indica quais linhas das tabelas reavaliar.
+"""
+import asyncio
+import threading
+from PyQt5.QtCore import QObject, pyqtSignal
+from src.core.simulator import SimulationStalled
+from src.core.stream import StateStream
+
+
+class StreamBridge(QObject):
+    """Avança o simulador fora da thread da interface publicando um StateStream
+
+    O simulador é compartilhado com a interface; todo acesso a ele (aqui e
+    nos repaints) é feito com `lock` adquirido. A velocidade é dada em ciclos
+    por segundo; 0 significa sem limite. Cada lote mantém o lock por no máximo
+    BATCH_TIME, de modo que um repaint nunca espera mais que isso. Outros
+    consumidores (gravação, visualizadores remotos) são funções que recebem o
+    StateStream e devolvem uma corrotina, executada no mesmo laço.
+    """
+
+    batch = pyqtSignal(object)  # StateBatch (lotes juntados desde o último ack)
+    done = pyqtSignal(bool)  # True se a simulação terminou, False se cancelada
+    stalled = pyqtSignal(str)  # Diagnóstico de deadlock/livelock
+    paused = pyqtSignal(str)  # Breakpoints que pausaram a execução
+
+    # Duração máxima de um lote em modo sem limite (segundos)
+    BATCH_TIME = 0.01
+
+    def __init__(self, simulator, lock: threading.Lock, cycles_per_second: float = 0,
+                 consumers=()):
+        super().__init__()
+        self.simulator = simulator
+        self.stream = StateStream(simulator, lock, cycles_per_second, self.BATCH_TIME)
+        self.consumers = list(consumers)
+        self._loop = None
+        self._acked = None
+
+    def set_speed(self, cycles_per_second: float):
+        """Altera a velocidade alvo (pode ser chamado durante a execução)"""
+        self.stream.set_speed(cycles_per_second)
+
+    def cancel(self):
+        """Solicita a interrupção da execução"""
+        self.stream.stop()
+
+    def ack(self):
+        """A interface terminou de exibir o último lote (chamado da thread da interface)"""
+        if self._loop is not None:
+            self._loop.call_soon_threadsafe(self._acked.set)
+
+    def run(self):
+        """Laço do asyncio; executa na thread do worker"""
+        asyncio.run(self._main())
+
+    async def _main(self):
+        self._loop = asyncio.get_running_loop()
+        self._acked = asyncio.Event()
+        self._acked.set()
+        pump = asyncio.ensure_future(self._pump(self.stream.subscribe(maxsize=1)))
+        consumers = [asyncio.ensure_future(consumer(self.stream)) for consumer in self.consumers]
+        finished = False
+        try:
+            finished = await self.stream.run()
+        except SimulationStalled as e:
+            self.stalled.emit(str(e))
+        finally:
+            # O último lote pendente não é entregue: ao fim, a interface
+            # redesenha a partir do simulador
+            pump.cancel()
+            await asyncio.gather(pump, *consumers, return_exceptions=True)
+            self._loop = None
+        if self.stream.stop_reason is not None:
+            self.paused.emit(self.stream.stop_reason)
+        self.done.emit(finished)
+
+    async def _pump(self, subscription):
+        """Entrega os lotes à interface, um por ack; os seguintes se juntam na fila"""
+        try:
+            while True:
+                await self._acked.wait()
+                try:
+                    batch = await subscription.__anext__()
+                except StopAsyncIteration:
+                    return
+                self._acked.clear()
+                self.batch.emit(batch)
+        finally:
+            subscription.close()
@@ -0,0 +1,33 @@
+"""
+Espera de jobs do servidor de simulação em uma thread separada da interface
+
+(A execução local em background usa StreamBridge, em stream_bridge.py.)
+"""
+from PyQt5.QtCore import QObject, pyqtSignal
+from src.core.server import ServerError, CANCELLED
+
+
+class ServerJobWorker(QObject):
+    """Espera um job do servidor de simulação fora da thread da interface"""
+
+    progress = pyqtSignal(int)  # Ciclo atual no worker do servidor
+    done = pyqtSignal(object)  # SimulationResult, ou None se cancelado ou com erro
+    failed = pyqtSignal(str)  # Mensagem de erro do servidor
+
+    def __init__(self, job):
+        super().__init__()
+        self.job = job
+
+    def cancel(self):
+        """Solicita o cancelamento do job no servidor"""
+        self.job.cancel()
+
+    def run(self):
+        """Executa na thread do worker até a resposta do servidor"""
+        try:
+            result = self.job.result(lambda params: self.progress.emit(params['cycle']))
+        except ServerError as e:
+            result = None
+            if e.code != CANCELLED:
+                self.failed.emit(str(e))
+        self.done.emit(result)
@@ -105,11 +105,13 @@ class MIPSParser:
                 # Formato: BEQ rs, rt, label
                 inst_type = InstructionType[op]
                 return Instruction(inst_type, None, parts[1], parts[2], 
-                                 label=parts[3], pc=pc)
+                                 label=parts[3], pc=pc,
+                                 target=self.labels.get(parts[3]))
                 
             elif op == 'J':
                 # Formato: J label
-                return Instruction(InstructionType.J, label=parts[1], pc=pc)
+                return Instruction(InstructionType.J, label=parts[1], pc=pc,
+                                   target=self.labels.get(parts[1]))
                 
             elif op == 'NOP':
                 return Instruction(InstructionType.NOP, pc=pc)
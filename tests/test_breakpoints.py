@@ -0,0 +1,162 @@
+"""
+Testes para breakpoints e watchpoints
+"""
+import asyncio
+import unittest
+from src.core.simulator import TomasuloSimulator
+from src.core.compiled import CompiledSimulator
+from src.core.breakpoints import Breakpoint, parse_breakpoint, parse_breakpoints
+from src.core.stream import StateStream
+from src.mips.parser import MIPSParser
+from tests.test_simulator import LOOP_PROGRAM
+
+
+PROGRAM = LOOP_PROGRAM.replace('400', '20')
+CONFIG = {'rob_size': 8}
+
+# Breakpoint -> condição verificada ciclo a ciclo no simulador de referência
+CASES = [
+    (Breakpoint('cycle', 57), lambda sim: sim.current_cycle == 57),
+    (Breakpoint('issue', 3), lambda sim: sim.instructions[3].issue_cycle == sim.current_cycle),
+    (Breakpoint('commit', 9), lambda sim: sim.instructions[9].commit_cycle == sim.current_cycle),
+    (Breakpoint('register', 'R5'), lambda sim: sim.instructions[6].commit_cycle == sim.current_cycle),
+    (Breakpoint('memory', 200), lambda sim: sim.instructions[5].commit_cycle == sim.current_cycle),
+    (Breakpoint('mispredict'), lambda sim: sim.metrics.branch_mispredictions > 0),
+    (Breakpoint('rob_full'), lambda sim: sim.metrics.rob_full_cycles > 0),
+]
+
+
+def load(cls=TomasuloSimulator, config=CONFIG):
+    simulator = cls(config)
+    simulator.load_program(MIPSParser().parse_program(PROGRAM))
+    return simulator
+
+
+def reference_cycle(predicate) -> int:
+    """Primeiro ciclo em que a condição vale, avançando ciclo a ciclo"""
+    simulator = load()
+    while True:
+        simulator.step()
+        if predicate(simulator):
+            return simulator.current_cycle
+
+
+class TestBreakpoints(unittest.TestCase):
+    """Testes para BreakpointSet e run_to_breakpoint"""
+
+    def test_parse(self):
+        """Texto da interface e dos scripts vira breakpoints normalizados"""
+        self.assertEqual(parse_breakpoint('reg r4'), Breakpoint('register', 'R4'))
+        self.assertEqual(parse_breakpoint('ciclo 2000000'), Breakpoint('cycle', 2000000))
+        self.assertEqual(parse_breakpoints('commit 12; mem 200, rob_full'),
+                         [Breakpoint('commit', 12), Breakpoint('memory', 200),
+                          Breakpoint('rob_full')])
+        for text in ('', 'foo 1', 'commit', 'mispredict 3', 'reg R40', 'mem -4', 'pc x'):
+            with self.assertRaises(ValueError):
+                parse_breakpoint(text)
+
+    def test_each_kind_stops_at_event(self):
+        """Cada tipo para no ciclo do evento, igual nos motores genérico e compilado"""
+        for breakpoint, predicate in CASES:
+            expected = reference_cycle(predicate)
+            for cls in (TomasuloSimulator, CompiledSimulator):
+                with self.subTest(breakpoint=breakpoint, engine=cls.__name__):
+                    simulator = load(cls)
+                    simulator.enable_breakpoints().add(breakpoint)
+                    hits = simulator.run_to_breakpoint()
+                    self.assertEqual(simulator.current_cycle, expected)
+                    self.assertEqual([hit.breakpoint for hit in hits], [breakpoint])
+                    self.assertEqual(hits[0].cycle, expected)
+                    if breakpoint.kind == 'register':
+                        self.assertEqual(hits[0].value, simulator.registers['R5'])
+
+    def test_resume_keeps_timing(self):
+        """Parar e retomar não altera a temporização; cada iteração atinge o breakpoint"""
+        plain = load()
+        plain.run_until_complete()
+        for cls in (TomasuloSimulator, CompiledSimulator):
+            simulator = load(cls)
+            breakpoints = simulator.enable_breakpoints()
+            breakpoints.add('commit', 9)
+            breakpoints.add('memory', 240)
+            stops = []
+            while True:
+                hits = simulator.run_to_breakpoint()
+                if not hits:
+                    break
+                stops.extend(hit.breakpoint.kind for hit in hits)
+            self.assertTrue(simulator.finished)
+            self.assertEqual(stops.count('commit'), 20)
+            self.assertEqual(stops.count('memory'), 1)
+            self.assertEqual(simulator.metrics.total_cycles, plain.metrics.total_cycles)
+            self.assertEqual(simulator.registers, plain.registers)
+
+    def test_rob_full_fires_on_transition(self):
+        """Retomar com o ROB ainda cheio não para no ciclo seguinte; para no próximo período"""
+        plain = load()
+        stalled = []
+        while not plain.finished:
+            before = plain.metrics.rob_full_cycles
+            plain.step()
+            stalled.append(plain.metrics.rob_full_cycles > before)
+        # Ciclos em que o ROB cheio passa a bloquear o despacho
+        edges = [cycle for cycle, blocked in enumerate(stalled, 1)
+                 if blocked and (cycle == 1 or not stalled[cycle - 2])]
+        self.assertLess(len(edges), sum(stalled))
+
+        for cls in (TomasuloSimulator, CompiledSimulator):
+            with self.subTest(engine=cls.__name__):
+                simulator = load(cls)
+                simulator.enable_breakpoints().add('rob_full')
+                stops = []
+                while True:
+                    hits = simulator.run_to_breakpoint()
+                    if not hits:
+                        break
+                    stops.append(hits[0].cycle)
+                self.assertEqual(stops, edges)
+                self.assertEqual(simulator.metrics.total_cycles, plain.metrics.total_cycles)
+
+    def test_compiled_checks_only_used_kinds(self):
+        """O motor compilado gera verificações só para os tipos em uso"""
+        simulator = load(CompiledSimulator)
+        self.assertNotIn('brk.hit', simulator.compiled_source)
+        breakpoints = simulator.enable_breakpoints()
+        breakpoints.add('memory', 200)
+        self.assertIn('brk_memory', simulator.compiled_source)
+        self.assertNotIn('brk_commit[pc]', simulator.compiled_source)
+        self.assertNotIn('brk.rob_full', simulator.compiled_source)
+        breakpoints.clear()
+        self.assertNotIn('brk.hit', simulator.compiled_source)
+
+    def test_cycle_breakpoint_after_step_back_and_reset(self):
+        """Voltar ciclos ou resetar rearma os breakpoints de ciclo"""
+        simulator = load()
+        simulator.enable_history()
+        simulator.enable_breakpoints().add('cycle', 30)
+        self.assertEqual(simulator.run_to_breakpoint()[0].cycle, 30)
+        simulator.step_back(5)
+        self.assertEqual(simulator.run_to_breakpoint()[0].cycle, 30)
+        self.assertEqual(simulator.run_to_breakpoint(), [])
+        self.assertTrue(simulator.finished)
+        simulator.reset()
+        self.assertEqual(simulator.run_to_breakpoint()[0].cycle, 30)
+
+    def test_stream_stops_on_breakpoint(self):
+        """O fluxo de estados (interface) para no breakpoint com o motivo"""
+        simulator = load()
+        simulator.enable_breakpoints().add('commit', 9)
+        stream = StateStream(simulator)
+        self.assertFalse(asyncio.run(stream.run()))
+        self.assertEqual(simulator.current_cycle, simulator.instructions[9].commit_cycle)
+        self.assertEqual(stream.stop_reason, f'commit do PC 9 no ciclo {simulator.current_cycle}')
+
+    def test_rejects_loop_acceleration(self):
+        """A extrapolação de laços pularia eventos: combinação recusada"""
+        simulator = load(config={'loop_acceleration': True})
+        with self.assertRaises(ValueError):
+            simulator.enable_breakpoints()
+
+
+if __name__ == '__main__':
+    unittest.main()
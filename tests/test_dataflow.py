@@ -0,0 +1,84 @@
+"""
+Testes para a análise de fluxo de dados (limites de IPC)
+"""
+import glob
+import os
+import unittest
+from src.core.simulator import TomasuloSimulator
+from src.core.dataflow import DataflowGraph, analyze
+from src.core.sweep import run_sweep
+from src.mips.parser import MIPSParser
+from tests.test_simulator import LOOP_PROGRAM
+
+
+EXAMPLES = os.path.join(os.path.dirname(__file__), '..', 'examples')
+
+CHAIN_PROGRAM = """
+ADDI R1, R0, 1
+ADD R2, R1, R1
+MUL R3, R2, R2
+"""
+
+
+class TestDataflow(unittest.TestCase):
+    """Testes para DataflowGraph e os limites calculados"""
+
+    def _parse(self, program):
+        return MIPSParser().parse_program(program)
+
+    def test_critical_path(self):
+        """Cadeia RAW: soma das latências, mais a escrita e o commit da última"""
+        bound = analyze(self._parse(CHAIN_PROGRAM))
+        self.assertEqual(bound.instructions, 3)
+        self.assertEqual(bound.critical_path, 2 + 2 + 10 + 2)
+        self.assertAlmostEqual(bound.ideal_ipc, 3 / bound.critical_path)
+        self.assertEqual(bound.limiter, 'dataflow')
+
+    def test_bound_never_exceeded(self):
+        """Os ciclos calculados nunca passam dos simulados"""
+        programs = [LOOP_PROGRAM.replace('400', '30'), CHAIN_PROGRAM,
+                    "\n".join(["MUL R1, R2, R3"] * 6 + ["ADD R4, R5, R6"] * 6)]
+        for path in sorted(glob.glob(os.path.join(EXAMPLES, '*.asm'))):
+            with open(path) as f:
+                programs.append(f.read())
+        configs = [{}, {'rob_size': 4, 'add_rs': 1}, {'add_fus': 1, 'mul_fus': 1},
+                   {'rob_size': 32, 'load_rs': 4, 'mul_latency': 3}, {'rob_size': 2, 'mul_rs': 4}]
+        for program in programs:
+            graph = DataflowGraph(self._parse(program))
+            for config in configs:
+                simulator = TomasuloSimulator(config)
+                simulator.load_program(self._parse(program))
+                simulator.run_until_complete()
+                bound = graph.bound(config)
+                self.assertLessEqual(bound.cycles, simulator.current_cycle)
+                self.assertGreaterEqual(bound.ipc_bound, simulator.metrics.get_ipc())
+
+    def test_resource_bound(self):
+        """Com uma unidade de multiplicação, o limite vem da classe Mult"""
+        program = "\n".join(f"MUL R{i}, R20, R21" for i in range(1, 9))
+        bound = analyze(self._parse(program), {'mul_fus': 1})
+        self.assertEqual(bound.limiter, 'Mult')
+        self.assertGreaterEqual(bound.cycles, 8 * 10)
+
+    def test_truncated(self):
+        """Laço infinito: a análise para em max_instructions"""
+        graph = DataflowGraph(self._parse("loop:\nADDI R1, R1, 1\nJ loop"), max_instructions=100)
+        self.assertTrue(graph.truncated)
+        self.assertEqual(len(graph), 100)
+
+    def test_sweep_pruning(self):
+        """Configurações cujo limite não supera o melhor IPC não são simuladas"""
+        instructions = self._parse(LOOP_PROGRAM.replace('400', '30'))
+        configs = [{'rob_size': 16}, {'rob_size': 2}, {'rob_size': 8}, {'add_rs': 1, 'rob_size': 2}]
+        full = run_sweep(instructions, configs)
+        pruned = run_sweep(instructions, configs, prune=True)
+        best = max(m.get_ipc() for m in full)
+        self.assertIn(None, pruned)
+        self.assertEqual(max(m.get_ipc() for m in pruned if m is not None), best)
+        for metrics, reference in zip(pruned, full):
+            if metrics is not None:
+                self.assertEqual(vars(metrics), vars(reference))
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,83 @@
+"""
+Testes para a simulação multinúcleo com coerência
+"""
+import unittest
+from src.core.multicore import run_multicore
+from src.core.functional import FunctionalSimulator
+from src.mips.parser import MIPSParser
+from tests.test_simulator import LOOP_PROGRAM
+
+
+PRODUCER = """
+ADDI R1, R0, 42
+MUL R5, R1, R1
+MUL R5, R5, R1
+SW R1, 100(R0)
+"""
+
+# Espera em laço até o produtor publicar o valor
+CONSUMER = """
+loop:
+LW R2, 100(R0)
+BEQ R2, R0, loop
+ADD R3, R2, R2
+"""
+
+# Lê e depois escreve um endereço privado
+PRIVATE = """
+LW R1, 0(R0)
+ADDI R1, R1, 1
+SW R1, 0(R0)
+"""
+
+
+class TestMulticore(unittest.TestCase):
+    """Testes para run_multicore"""
+
+    def _parse(self, program):
+        return MIPSParser().parse_program(program)
+
+    def test_producer_consumer(self):
+        """O consumidor enxerga a escrita do produtor após uma fronteira de quantum"""
+        programs = [self._parse(PRODUCER), self._parse(CONSUMER)]
+        result = run_multicore(programs, quantum=20, processes=False)
+        self.assertTrue(result.finished)
+        self.assertEqual(result.cores[1]['registers']['R3'], 84)
+        self.assertEqual(result.memory[100], 42)
+        self.assertGreaterEqual(result.cores[1]['load_misses'], 1)
+        self.assertEqual(result.traffic['bus_read_exclusive'], 1)
+        self.assertEqual(result.traffic['invalidations'], 1)
+
+    def test_processes_match_in_process(self):
+        """Workers em processos produzem o mesmo resultado da execução local"""
+        programs = [self._parse(PRODUCER), self._parse(CONSUMER),
+                    self._parse(LOOP_PROGRAM.replace('400', '30'))]
+        local = run_multicore(programs, quantum=50, processes=False)
+        parallel = run_multicore(programs, quantum=50, processes=True)
+        self.assertEqual(parallel.cores, local.cores)
+        self.assertEqual(parallel.traffic, local.traffic)
+        self.assertEqual(parallel.memory, local.memory)
+
+        # Um núcleo sozinho chega ao estado da execução funcional
+        functional = FunctionalSimulator(programs[2])
+        functional.run()
+        self.assertEqual(local.cores[2]['registers'], functional.registers)
+
+    def test_msi_vs_mesi(self):
+        """No MESI, ler e depois escrever um dado privado não gera upgrade"""
+        programs = [self._parse(PRIVATE)]
+        mesi = run_multicore(programs, quantum=5, protocol='mesi', processes=False)
+        msi = run_multicore(programs, quantum=5, protocol='msi', processes=False)
+        self.assertEqual(mesi.traffic['upgrades'], 0)
+        self.assertEqual(msi.traffic['upgrades'], 1)
+        self.assertEqual(mesi.memory[0], 1)
+
+    def test_invalid_arguments(self):
+        with self.assertRaises(ValueError):
+            run_multicore([], protocol='moesi')
+        with self.assertRaises(ValueError):
+            run_multicore([], quantum=0)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,111 @@
+"""
+Testes para a varredura paralela com agregação em memória compartilhada
+"""
+import itertools
+import os
+import shutil
+import tempfile
+import unittest
+from src.core.sweep import run_sweep
+from src.core.parallel_sweep import run_parallel_sweep, COLUMNS, ROW_BYTES, HEADER_SIZE
+from src.mips.parser import MIPSParser
+from tests.test_simulator import LOOP_PROGRAM
+from tests.test_trace import ENDLESS_PROGRAM
+
+
+class TestParallelSweep(unittest.TestCase):
+    """Testes para run_parallel_sweep"""
+
+    def setUp(self):
+        self.directory = tempfile.mkdtemp()
+        self.path = os.path.join(self.directory, 'sweep.bin')
+        self.instructions = MIPSParser().parse_program(LOOP_PROGRAM.replace('400', '20'))
+        self.configs = [{'add_rs': add, 'mul_rs': mul, 'rob_size': rob}
+                        for add, mul, rob in itertools.product((1, 2, 3), (1, 2), (4, 8, 16))]
+
+    def tearDown(self):
+        shutil.rmtree(self.directory)
+
+    def _assert_matches_sweep(self, table):
+        expected = run_sweep(self.instructions, self.configs)
+        self.assertEqual(len(table), len(self.configs))
+        for index, metrics in enumerate(expected):
+            row = table.row(index)
+            self.assertEqual(row['total_cycles'], metrics.total_cycles)
+            self.assertEqual(row['instructions_completed'], metrics.instructions_completed)
+            self.assertEqual(row['stall_cycles'], metrics.stall_cycles)
+            self.assertAlmostEqual(row['ipc'], metrics.get_ipc())
+        self.assertEqual(list(table.column('total_cycles')),
+                         [float(m.total_cycles) for m in expected])
+
+    def test_matches_sequential_sweep(self):
+        """Linhas escritas pelos workers iguais às métricas de run_sweep"""
+        table = run_parallel_sweep(self.instructions, self.configs, self.path,
+                                   workers=2, chunk_size=4)
+        self.assertEqual(table.simulated, len(self.configs))
+        self._assert_matches_sweep(table)
+        self.assertEqual(os.path.getsize(self.path),
+                         HEADER_SIZE + len(self.configs) * ROW_BYTES)
+
+    def test_resume_from_last_flushed_index(self):
+        """Uma varredura interrompida retoma só os pontos não gravados"""
+        run_parallel_sweep(self.instructions, self.configs, self.path, workers=1)
+        with open(self.path, 'rb') as f:
+            complete = f.read()
+
+        # Interrupção: 7 linhas gravadas e uma linha parcial
+        with open(self.path, 'r+b') as f:
+            f.truncate(HEADER_SIZE + 7 * ROW_BYTES + 5)
+        table = run_parallel_sweep(self.instructions, self.configs, self.path, workers=2)
+        self.assertEqual(table.simulated, len(self.configs) - 7)
+        with open(self.path, 'rb') as f:
+            self.assertEqual(f.read(), complete)
+
+        table = run_parallel_sweep(self.instructions, self.configs, self.path, workers=1)
+        self.assertEqual(table.simulated, 0)
+        self._assert_matches_sweep(table)
+
+    def test_resume_before_first_flush(self):
+        """Interrupção antes da primeira linha: arquivo vazio, cabeçalho parcial ou só cabeçalho"""
+        run_parallel_sweep(self.instructions, self.configs, self.path, workers=1)
+        with open(self.path, 'rb') as f:
+            complete = f.read()
+        for size in (0, HEADER_SIZE // 2, HEADER_SIZE):
+            with open(self.path, 'r+b') as f:
+                f.truncate(size)
+            table = run_parallel_sweep(self.instructions, self.configs, self.path, workers=1)
+            self.assertEqual(table.simulated, len(self.configs))
+            with open(self.path, 'rb') as f:
+                self.assertEqual(f.read(), complete)
+
+    def test_resume_rejects_other_sweep(self):
+        """Arquivo de outra varredura não é retomado"""
+        run_parallel_sweep(self.instructions, self.configs[:4], self.path, workers=1)
+        with self.assertRaises(ValueError):
+            run_parallel_sweep(self.instructions, self.configs, self.path, workers=1)
+        table = run_parallel_sweep(self.instructions, self.configs, self.path,
+                                   workers=1, resume=False)
+        self.assertEqual(len(table), len(self.configs))
+        self.assertEqual(len(table.row(0)), len(COLUMNS))
+
+    def test_truncated_trace_flag(self):
+        """O limite de instruções do trace fica marcado no arquivo e faz parte da varredura"""
+        table = run_parallel_sweep(self.instructions, self.configs, self.path, workers=1)
+        self.assertFalse(table.truncated)
+
+        instructions = MIPSParser().parse_program(ENDLESS_PROGRAM)
+        table = run_parallel_sweep(instructions, self.configs[:3], self.path, workers=1,
+                                   resume=False, max_instructions=300)
+        self.assertTrue(table.truncated)
+        self.assertEqual(list(table.column('instructions_completed')), [300.0] * 3)
+        table = run_parallel_sweep(instructions, self.configs[:3], self.path, workers=1,
+                                   max_instructions=300)
+        self.assertEqual(table.simulated, 0)
+        self.assertTrue(table.truncated)
+        with self.assertRaises(ValueError):
+            run_parallel_sweep(instructions, self.configs[:3], self.path, workers=1,
+                               max_instructions=400)
+
+
+if __name__ == '__main__':
+    unittest.main()
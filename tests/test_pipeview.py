@@ -0,0 +1,133 @@
+"""
+Testes para a exportação a visualizadores de pipeline
+"""
+import io
+import unittest
+from src.core.simulator import TomasuloSimulator
+from src.core.pipeview import attach_pipeview
+from src.mips.parser import MIPSParser
+
+
+# O BEQ é predito não tomado e é tomado: três instruções são descartadas
+PROGRAM = """
+ADDI R1, R0, 100
+ADDI R2, R0, 42
+SW R2, 0(R1)
+LW R3, 0(R1)
+MUL R4, R3, R2
+BEQ R3, R2, fim
+DIV R5, R4, R1
+SUB R6, R5, R3
+fim:
+ADD R7, R6, R4
+"""
+
+
+class TestPipeView(unittest.TestCase):
+    """Testes para os formatos Kanata e O3PipeView"""
+
+    def _simulator(self, fmt):
+        simulator = TomasuloSimulator()
+        simulator.load_program(MIPSParser().parse_program(PROGRAM))
+        stream = io.StringIO()
+        attach_pipeview(simulator, stream, fmt)
+        return simulator, stream
+
+    def test_konata_streamed(self):
+        """O log é escrito durante a simulação e cobre issue, execução, commit e squash"""
+        simulator, stream = self._simulator('konata')
+        for _ in range(3):
+            simulator.step()
+        self.assertIn('S\t0\t0\tEx', stream.getvalue())
+        simulator.run_until_complete()
+
+        lines = stream.getvalue().splitlines()
+        self.assertEqual(lines[0], 'Kanata\t0004')
+        self.assertEqual(lines[1], 'C=\t1')
+        records = [line.split('\t') for line in lines]
+        issued = [r for r in records if r[0] == 'I']
+        retired = [r for r in records if r[0] == 'R']
+        self.assertEqual(len(issued), simulator.metrics.instructions_issued)
+        self.assertEqual(sum(1 for r in retired if r[3] == '0'),
+                         simulator.metrics.instructions_completed)
+        self.assertEqual(sum(1 for r in retired if r[3] == '1'), 3)
+        # O avanço total de ciclos termina no ciclo do último commit
+        cycles = 1 + sum(int(r[1]) for r in records if r[0] == 'C')
+        self.assertEqual(cycles, simulator.current_cycle)
+
+    def test_o3pipeview(self):
+        """Uma instrução por bloco, com retire 0 para as descartadas"""
+        simulator, stream = self._simulator('o3pipeview')
+        simulator.run_until_complete()
+
+        lines = stream.getvalue().splitlines()
+        fetches = [line for line in lines if line.startswith('O3PipeView:fetch:')]
+        retires = [line.split(':') for line in lines if line.startswith('O3PipeView:retire:')]
+        self.assertEqual(len(fetches), simulator.metrics.instructions_issued)
+        self.assertEqual(len(lines), 7 * len(fetches))
+        self.assertEqual(sum(1 for r in retires if r[2] == '0'), 3)
+
+        # Primeira instrução: issue no ciclo 1, execução no 2, commit no 5
+        first = lines[:7]
+        self.assertTrue(first[0].startswith('O3PipeView:fetch:1000:0x00000000:0:1:ADDI'))
+        self.assertEqual(first[4], 'O3PipeView:issue:2000')
+        self.assertEqual(first[6], 'O3PipeView:retire:5000:store:0')
+
+    def test_konata_step_back(self):
+        """Desfazer ciclos fecha os registros abertos e reabre as instruções em voo"""
+        simulator, stream = self._simulator('konata')
+        simulator.enable_history()
+        for _ in range(8):
+            simulator.step()
+        simulator.step_back(4)
+        restored = simulator.current_cycle
+        simulator.run_until_complete()
+
+        records = [line.split('\t') for line in stream.getvalue().splitlines()[1:]]
+        self.assertEqual(sum(1 for r in records if r[0] == 'I'),
+                         sum(1 for r in records if r[0] == 'R'))
+        absolute = [i for i, r in enumerate(records) if r[0] == 'C=']
+        self.assertEqual(records[absolute[-1]][1], str(restored))
+        cycles = restored + sum(int(r[1]) for r in records[absolute[-1]:] if r[0] == 'C')
+        self.assertEqual(cycles, simulator.current_cycle)
+
+    def test_konata_reset(self):
+        """Após o reset do simulador, o próximo evento volta a gravar o ciclo absoluto"""
+        simulator, stream = self._simulator('konata')
+        simulator.run_until_complete()
+        simulator.reset()
+        simulator.step()
+        self.assertEqual(stream.getvalue().splitlines().count('C=\t1'), 2)
+
+    def test_o3pipeview_checkpoint_restore(self):
+        """Após restaurar um checkpoint, as instruções saem com os ciclos da execução direta"""
+        def blocks(text):
+            lines = text.splitlines()
+            result = set()
+            for i in range(0, len(lines), 7):
+                fetch = lines[i].split(':')
+                del fetch[5]  # Número de sequência
+                result.add(tuple(fetch) + tuple(lines[i + 1:i + 7]))
+            return result
+
+        reference, reference_stream = self._simulator('o3pipeview')
+        reference.run_until_complete()
+
+        simulator, stream = self._simulator('o3pipeview')
+        for _ in range(4):
+            simulator.step()
+        checkpoint = simulator.save_checkpoint()
+        for _ in range(6):
+            simulator.step()
+        simulator.load_checkpoint(checkpoint)
+        simulator.run_until_complete()
+        self.assertLessEqual(blocks(reference_stream.getvalue()), blocks(stream.getvalue()))
+
+    def test_unknown_format(self):
+        simulator = TomasuloSimulator()
+        with self.assertRaises(ValueError):
+            attach_pipeview(simulator, io.StringIO(), 'vcd')
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,127 @@
+"""
+Testes para o cache persistente de resultados
+"""
+import multiprocessing
+import os
+import shutil
+import tempfile
+import unittest
+from src.core.simulator import TomasuloSimulator
+from src.core.result_cache import ResultCache, SimulationResult, result_key, warm_state
+from src.core.sweep import run_sweep
+from src.mips.parser import MIPSParser
+from tests.test_simulator import LOOP_PROGRAM
+
+
+def _fill(path, programs):
+    """Worker: simula e guarda programas no cache compartilhado"""
+    with ResultCache(path) as cache:
+        for program in programs:
+            cache.run(MIPSParser().parse_program(program))
+
+
+class TestResultCache(unittest.TestCase):
+    """Testes para o ResultCache"""
+
+    def setUp(self):
+        self.directory = tempfile.mkdtemp()
+        self.path = os.path.join(self.directory, 'results.sqlite')
+        self.instructions = MIPSParser().parse_program(LOOP_PROGRAM.replace('400', '20'))
+
+    def tearDown(self):
+        shutil.rmtree(self.directory)
+
+    def test_key_normalization(self):
+        """Valores padrão explícitos e chaves irrelevantes não mudam a chave"""
+        key = result_key(self.instructions, {})
+        self.assertEqual(key, result_key(self.instructions, {'add_rs': 3, 'mul_latency': 10}))
+        self.assertEqual(key, result_key(self.instructions, {'loop_acceleration': True}))
+        self.assertNotEqual(key, result_key(self.instructions, {'rob_size': 8}))
+        other = MIPSParser().parse_program(LOOP_PROGRAM.replace('400', '21'))
+        self.assertNotEqual(key, result_key(other, {}))
+
+    def test_round_trip(self):
+        """O resultado guardado reproduz métricas, preditor, registradores e memória"""
+        simulator = TomasuloSimulator({'rob_size': 8})
+        simulator.load_program(self.instructions)
+        simulator.run_until_complete()
+
+        with ResultCache(self.path) as cache:
+            self.assertIsNone(cache.get(self.instructions, {'rob_size': 8}))
+            cache.put(self.instructions, {'rob_size': 8}, SimulationResult.from_simulator(simulator))
+        with ResultCache(self.path) as cache:
+            result = cache.get(self.instructions, {'rob_size': 8})
+            self.assertEqual((cache.hits, cache.misses), (1, 0))
+        self.assertEqual(vars(result.metrics), vars(simulator.metrics))
+        self.assertEqual(result.branch_accuracy, simulator.branch_predictor.get_accuracy())
+        self.assertEqual(result.registers, simulator.registers)
+        self.assertEqual(result.memory, simulator.memory)
+        self.assertTrue(result.finished)
+
+    def test_warm_state_in_key(self):
+        """Memória e preditor preservados por reset() mudam a chave; o resultado é aplicável"""
+        simulator = TomasuloSimulator({'rob_size': 8})
+        simulator.load_program(self.instructions)
+        cold = result_key(self.instructions, {'rob_size': 8}, warm_state(simulator))
+        self.assertEqual(cold, result_key(self.instructions, {'rob_size': 8}))
+        simulator.run_until_complete()
+        result = SimulationResult.from_simulator(simulator)
+
+        simulator.reset()
+        warm = warm_state(simulator)
+        self.assertEqual(set(warm), {'memory', 'predictor'})
+        self.assertNotEqual(cold, result_key(self.instructions, {'rob_size': 8}, warm))
+
+        # Aplicar o resultado leva um simulador no ciclo 0 ao estado final
+        fresh = TomasuloSimulator({'rob_size': 8})
+        fresh.load_program(self.instructions)
+        fresh.enable_history()
+        result.apply_to(fresh)
+        self.assertTrue(fresh.finished)
+        self.assertEqual(fresh.current_cycle, result.metrics.total_cycles)
+        self.assertEqual((fresh.registers, fresh.memory), (result.registers, result.memory))
+        self.assertEqual(vars(fresh.metrics), vars(result.metrics))
+        self.assertEqual(fresh.branch_predictor.get_accuracy(), result.branch_accuracy)
+        self.assertEqual(fresh.step_back(), 0)
+
+    def test_lru_eviction(self):
+        """Acima do limite, os resultados usados há mais tempo são removidos"""
+        with ResultCache(self.path) as cache:
+            cache.run(self.instructions, {'rob_size': 4})
+            entry_size = cache.size_bytes()
+            cache.max_bytes = entry_size * 2 + entry_size // 2
+            cache.run(self.instructions, {'rob_size': 5})
+            cache.get(self.instructions, {'rob_size': 4})  # Torna a primeira a mais recente
+            cache.run(self.instructions, {'rob_size': 6})
+            self.assertEqual(len(cache), 2)
+            self.assertLessEqual(cache.size_bytes(), cache.max_bytes)
+            self.assertIsNotNone(cache.get(self.instructions, {'rob_size': 4}))
+            self.assertIsNone(cache.get(self.instructions, {'rob_size': 5}))
+
+    def test_concurrent_workers(self):
+        """Vários processos podem gravar no mesmo cache"""
+        programs = [LOOP_PROGRAM.replace('400', str(n)) for n in range(5, 13)]
+        workers = [multiprocessing.Process(target=_fill, args=(self.path, programs[i::4]))
+                   for i in range(4)]
+        for worker in workers:
+            worker.start()
+        for worker in workers:
+            worker.join()
+            self.assertEqual(worker.exitcode, 0)
+        with ResultCache(self.path) as cache:
+            self.assertEqual(len(cache), len(programs))
+
+    def test_sweep_uses_cache(self):
+        """A varredura só simula as configurações ausentes do cache"""
+        configs = [{'rob_size': 4}, {'rob_size': 8}]
+        with ResultCache(self.path) as cache:
+            first = run_sweep(self.instructions, configs, cache=cache)
+            self.assertEqual(len(cache), 2)
+            second = run_sweep(self.instructions, configs + [{'rob_size': 16}], cache=cache)
+            self.assertEqual(cache.hits, 2)
+            self.assertEqual(len(cache), 3)
+        self.assertEqual([vars(m) for m in first], [vars(m) for m in second[:2]])
+
+
+if __name__ == '__main__':
+    unittest.main()
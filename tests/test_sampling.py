@@ -0,0 +1,51 @@
+"""
+Testes para a simulação amostrada
+"""
+import unittest
+from src.core.simulator import TomasuloSimulator
+from src.core.structures import BranchPredictor
+from src.core.functional import FunctionalSimulator
+from src.core.sampling import run_sampled
+from src.mips.parser import MIPSParser
+from tests.test_simulator import LOOP_PROGRAM
+
+
+class TestSampling(unittest.TestCase):
+    """Testes para o avanço funcional e as janelas detalhadas"""
+
+    def setUp(self):
+        self.program = LOOP_PROGRAM.replace('400', '2000')
+
+    def test_functional_warms_predictor(self):
+        """O avanço funcional treina o preditor com os desvios condicionais"""
+        instructions = MIPSParser().parse_program(self.program)
+        predictor = BranchPredictor()
+        FunctionalSimulator(instructions).run(100, predictor)
+        self.assertTrue(predictor.predict(9))
+
+    def test_estimate_close_to_exact(self):
+        """O IPC estimado fica próximo do IPC da simulação completa"""
+        instructions = MIPSParser().parse_program(self.program)
+        config = {'mul_latency': 4}
+        simulator = TomasuloSimulator(config)
+        simulator.load_program(instructions)
+        while not simulator.finished:
+            simulator.step()
+
+        result = run_sampled(MIPSParser().parse_program(self.program), config,
+                             period=1500, warmup=100, window=200)
+        self.assertGreaterEqual(len(result.samples), 9)
+        self.assertEqual(result.instructions, simulator.metrics.instructions_completed)
+        self.assertLessEqual(result.ipc_low, result.ipc)
+        self.assertLessEqual(result.ipc, result.ipc_high)
+        self.assertAlmostEqual(result.ipc, simulator.metrics.get_ipc(), delta=0.05)
+
+    def test_invalid_parameters(self):
+        """Aquecimento e janela precisam caber no período"""
+        instructions = MIPSParser().parse_program(self.program)
+        with self.assertRaises(ValueError):
+            run_sampled(instructions, period=100, warmup=60, window=60)
+
+
+if __name__ == '__main__':
+    unittest.main()
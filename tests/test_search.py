@@ -0,0 +1,92 @@
+"""
+Testes para a busca automática no espaço de configurações
+"""
+import itertools
+import os
+import shutil
+import tempfile
+import unittest
+from src.core.simulator import TomasuloSimulator
+from src.core.search import search, area_cost
+from src.core.result_cache import ResultCache
+from src.mips.parser import MIPSParser
+from tests.test_simulator import LOOP_PROGRAM
+
+
+SPACE = {
+    'add_rs': (1, 2, 3),
+    'mul_rs': (1, 2),
+    'load_rs': (1, 2),
+    'rob_size': (4, 8, 16),
+}
+
+
+class TestSearch(unittest.TestCase):
+    """Testes para search"""
+
+    def setUp(self):
+        self.instructions = MIPSParser().parse_program(LOOP_PROGRAM.replace('400', '15'))
+
+    def _grid(self):
+        """IPC e custo de todas as configurações do espaço"""
+        grid = {}
+        for values in itertools.product(*SPACE.values()):
+            config = dict(zip(SPACE, values))
+            simulator = TomasuloSimulator(config)
+            simulator.load_program(self.instructions)
+            simulator.run_until_complete()
+            grid[values] = (simulator.metrics.get_ipc(), area_cost(config))
+        return grid
+
+    def test_matches_grid(self):
+        """Encontra a configuração mais barata da grade com menos simulações"""
+        result = search(self.instructions, tolerance=0.05, space=SPACE, workers=1)
+        grid = self._grid()
+        best = max(ipc for ipc, _ in grid.values())
+        cheapest = min(cost for ipc, cost in grid.values() if ipc >= best * 0.95)
+
+        self.assertEqual(result.grid_size, len(grid))
+        self.assertLess(result.simulations, len(grid))
+        self.assertAlmostEqual(result.reference_ipc, best)
+        self.assertGreaterEqual(result.ipc, best * 0.95)
+        self.assertEqual(result.cost, cheapest)
+        self.assertEqual(grid[tuple(result.config[key] for key in SPACE)][0], result.ipc)
+
+    def test_custom_cost_and_parallel(self):
+        """Custo do usuário e avaliação em processos; o cache guarda as avaliações"""
+        directory = tempfile.mkdtemp()
+        try:
+            def rob_cost(config):
+                return config['rob_size'] * 10 + config['add_rs'] + config['mul_rs'] + config['load_rs']
+
+            with ResultCache(os.path.join(directory, 'cache.sqlite')) as cache:
+                result = search(self.instructions, tolerance=0.2, cost=rob_cost,
+                                space=SPACE, workers=2, cache=cache)
+                self.assertEqual(len(cache), result.simulations)
+                again = search(self.instructions, tolerance=0.2, cost=rob_cost,
+                               space=SPACE, workers=1, cache=cache)
+            self.assertEqual(again.config, result.config)
+            self.assertEqual(again.simulations, 0)
+            self.assertGreaterEqual(result.ipc, result.reference_ipc * 0.8)
+            self.assertLess(result.cost, rob_cost({'rob_size': 16, 'add_rs': 3, 'mul_rs': 2, 'load_rs': 2}))
+        finally:
+            shutil.rmtree(directory)
+
+    def test_result_meets_final_minimum(self):
+        """O resultado é o ponto avaliado mais barato que atende ao IPC mínimo final"""
+        def inverse_cost(config):
+            return -area_cost(config)
+
+        result = search(self.instructions, tolerance=0.2, cost=inverse_cost,
+                        space=SPACE, workers=1)
+        minimum = result.reference_ipc * 0.8
+        self.assertGreaterEqual(result.ipc, minimum)
+        feasible = [dict(zip(SPACE, point)) for point, ipc in result.evaluations.items()
+                    if ipc is not None and ipc >= minimum]
+        self.assertEqual(result.cost, min(inverse_cost(config) for config in feasible))
+        # Aqui o mais barato é a maior configuração, de onde a descida parte
+        self.assertEqual(result.config, {key: values[-1] for key, values in SPACE.items()})
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,144 @@
+"""
+Testes para o servidor local de simulação
+"""
+import os
+import shutil
+import tempfile
+import threading
+import unittest
+from src.core.simulator import TomasuloSimulator
+from src.core.server import (
+    SimulationServer, SimulationClient, ServerError, server_available, CANCELLED, SIMULATION_ERROR
+)
+from src.mips.parser import MIPSParser
+from tests.test_simulator import LOOP_PROGRAM
+
+
+class TestSimulationServer(unittest.TestCase):
+    """Testes para SimulationServer e SimulationClient"""
+
+    @classmethod
+    def setUpClass(cls):
+        cls.directory = tempfile.mkdtemp()
+        cls.path = os.path.join(cls.directory, 'server.sock')
+        cls.server = SimulationServer(cls.path, workers=2,
+                                      cache_path=os.path.join(cls.directory, 'results.sqlite'))
+        cls.server.start()
+        cls.client = SimulationClient(cls.path)
+
+    @classmethod
+    def tearDownClass(cls):
+        cls.server.close()
+        shutil.rmtree(cls.directory)
+
+    def _simulate(self, source, config=None):
+        simulator = TomasuloSimulator(config)
+        simulator.load_program(MIPSParser().parse_program(source))
+        simulator.run_until_complete()
+        return simulator
+
+    def test_run_matches_local_simulation(self):
+        """Resultado do servidor igual ao da simulação local"""
+        source = LOOP_PROGRAM.replace('400', '30')
+        for config in (None, {'rob_size': 4, 'add_rs': 1}):
+            result = self.client.run(source, config)
+            expected = self._simulate(source, config)
+            self.assertTrue(result.finished)
+            self.assertEqual(result.metrics.total_cycles, expected.metrics.total_cycles)
+            self.assertEqual(result.registers, expected.registers)
+            self.assertEqual(result.memory, expected.memory)
+
+    def test_sweep_with_progress(self):
+        """Varredura distribuída entre os workers, com progresso por ponto"""
+        source = LOOP_PROGRAM.replace('400', '10')
+        configs = [{'rob_size': size} for size in (2, 4, 8, 16, 32)]
+        events = []
+        results = self.client.sweep(source, configs, events.append)
+        self.assertEqual([r.metrics.total_cycles for r in results],
+                         [self._simulate(source, c).metrics.total_cycles for c in configs])
+        self.assertEqual(sorted(e['done'] for e in events), [1, 2, 3, 4, 5])
+        self.assertEqual(self.client.sweep(source, []), [])
+
+    def test_cancel_long_run(self):
+        """Cancelamento interrompe um job em execução"""
+        job = self.client.submit('run', source=LOOP_PROGRAM.replace('400', '10000000'),
+                                 config={'add_rs': 3})
+        cycles = []
+
+        def progress(params):
+            cycles.append(params['cycle'])
+            job.cancel()
+
+        with self.assertRaises(ServerError) as raised:
+            job.result(progress)
+        self.assertEqual(raised.exception.code, CANCELLED)
+        self.assertTrue(cycles)
+        # Os workers continuam disponíveis
+        self.assertTrue(self.client.run('ADDI R1, R0, 5').finished)
+
+    def test_errors_and_status(self):
+        """Erros de simulação e requisições inválidas viram respostas de erro"""
+        with self.assertRaises(ServerError) as raised:
+            self.client.run('ADDI R1, R0, 1', {'scheduler': 'unknown'})
+        self.assertEqual(raised.exception.code, SIMULATION_ERROR)
+        with self.assertRaises(ServerError):
+            self.client.submit('unknown').result()
+        status = self.client.status()
+        self.assertEqual(status['workers'], 2)
+
+    def test_concurrent_clients(self):
+        """Jobs de vários clientes entram na mesma fila"""
+        results = []
+
+        def submit(n):
+            results.append(self.client.run(f'ADDI R1, R0, {n}').registers['R1'])
+
+        threads = [threading.Thread(target=submit, args=(n,)) for n in range(8)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+        self.assertEqual(sorted(results), list(range(8)))
+
+    def test_worker_killed(self):
+        """A morte de um worker falha a tarefa dele e outro worker o substitui"""
+        path = os.path.join(self.directory, 'killed.sock')
+        with SimulationServer(path, workers=1, cache_path=None) as server:
+            client = SimulationClient(path)
+            job = client.submit('run', source=LOOP_PROGRAM.replace('400', '10000000'))
+            killed = []
+
+            def progress(params):
+                if not killed:
+                    killed.append(server._processes[0].pid)
+                    server._processes[0].kill()
+
+            with self.assertRaises(ServerError) as raised:
+                job.result(progress)
+            self.assertEqual(raised.exception.code, SIMULATION_ERROR)
+            self.assertNotEqual(server._processes[0].pid, killed[0])
+            self.assertEqual(client.run('ADDI R1, R0, 7').registers['R1'], 7)
+
+    def test_shutdown_removes_socket(self):
+        """Encerramento remove o socket"""
+        path = os.path.join(self.directory, 'other.sock')
+        with SimulationServer(path, workers=1, cache_path=None):
+            self.assertTrue(server_available(path))
+            with self.assertRaises(RuntimeError):
+                SimulationServer(path, workers=1).start()
+        self.assertFalse(os.path.exists(path))
+        self.assertFalse(server_available(path))
+
+    def test_shutdown_request_stops_server(self):
+        """O método shutdown encerra um servidor iniciado com start()"""
+        path = os.path.join(self.directory, 'stopped.sock')
+        server = SimulationServer(path, workers=1, cache_path=None).start()
+        SimulationClient(path).shutdown()
+        self.assertTrue(server._stopped.wait(10))
+        self.assertFalse(os.path.exists(path))
+        self.assertFalse(server_available(path))
+        server.close()  # Já encerrado: nada a fazer
+
+
+if __name__ == '__main__':
+    unittest.main()
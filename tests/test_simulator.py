@@ -2,7 +2,7 @@
 Testes unitários para o simulador de Tomasulo
 """
 import unittest
-from src.core.simulator import TomasuloSimulator
+from src.core.simulator import TomasuloSimulator, SimulationStalled
 from src.core.structures import InstructionType, Instruction
 from src.mips.parser import MIPSParser
 
@@ -174,5 +174,431 @@ class TestROB(unittest.TestCase):
         self.assertLess(instructions[1].commit_cycle, instructions[2].commit_cycle)
 
 
+
+class TestCheckpoint(unittest.TestCase):
+    """Testes para checkpoint e restauração de estado"""
+    
+    PROGRAM = """
+    ADDI R1, R0, 100
+    ADDI R2, R0, 7
+    SW R2, 4(R1)
+    MUL R3, R2, R2
+    LW R4, 4(R1)
+    DIV R5, R3, R4
+    BNE R5, R2, fim
+    ADD R6, R5, R3
+    fim:
+    SUB R7, R3, R5
+    """
+    
+    def setUp(self):
+        self.instructions = MIPSParser().parse_program(self.PROGRAM)
+        
+    def _run(self, simulator):
+        simulator.run_until_complete()
+        return (simulator.metrics.total_cycles, simulator.registers, simulator.memory)
+        
+    def test_restore_resumes_identically(self):
+        """Restaurar um checkpoint e continuar gera o mesmo resultado"""
+        reference = TomasuloSimulator()
+        reference.load_program(self.instructions)
+        expected = self._run(reference)
+        
+        simulator = TomasuloSimulator()
+        simulator.load_program(self.instructions)
+        for _ in range(12):
+            simulator.step()
+        data = simulator.save_checkpoint()
+        self._run(simulator)
+        
+        restored = TomasuloSimulator()
+        restored.load_program(self.instructions)
+        restored.load_checkpoint(data)
+        self.assertEqual(restored.current_cycle, 12)
+        self.assertEqual(self._run(restored), expected)
+        
+    def test_goto_cycle(self):
+        """goto_cycle alcança qualquer ciclo a partir dos checkpoints periódicos"""
+        from src.core.checkpoint import CheckpointManager
+        
+        simulator = TomasuloSimulator()
+        simulator.load_program(self.instructions)
+        manager = CheckpointManager(simulator, interval=5)
+        manager.run_until_complete()
+        final_cycles = simulator.current_cycle
+        
+        manager.goto_cycle(13)
+        self.assertEqual(simulator.current_cycle, 13)
+        self.assertEqual(manager.nearest(13), 10)
+        
+        snapshot = simulator.get_state_snapshot()
+        reference = TomasuloSimulator()
+        reference.load_program(self.instructions)
+        for _ in range(13):
+            reference.step()
+        self.assertEqual(snapshot, reference.get_state_snapshot())
+        
+        manager.goto_cycle(final_cycles)
+        self.assertTrue(simulator.finished)
+        
+    def test_step_after_finish_takes_no_checkpoint(self):
+        """Depois do fim, step não grava de novo o checkpoint do último ciclo"""
+        from src.core.checkpoint import CheckpointManager
+        
+        simulator = TomasuloSimulator()
+        simulator.load_program(self.instructions)
+        simulator.run_until_complete()
+        final_cycles = simulator.current_cycle
+        
+        simulator = TomasuloSimulator()
+        simulator.load_program(self.instructions)
+        manager = CheckpointManager(simulator, interval=final_cycles)
+        manager.run_until_complete()
+        data = manager.checkpoints[final_cycles]
+        for _ in range(3):
+            self.assertFalse(manager.step())
+        self.assertEqual(manager._cycles, [0, final_cycles])
+        self.assertIs(manager.checkpoints[final_cycles], data)
+        
+    def test_restore_clears_history(self):
+        """Após restaurar um checkpoint, step_back não usa deltas de outra linha do tempo"""
+        simulator = TomasuloSimulator()
+        simulator.load_program(self.instructions)
+        simulator.enable_history()
+        for _ in range(10):
+            simulator.step()
+        data = simulator.save_checkpoint()
+        for _ in range(40):
+            simulator.step()
+        simulator.load_checkpoint(data)
+        self.assertEqual(simulator.step_back(1), 0)
+        self.assertEqual(simulator.current_cycle, 10)
+        
+        # O histórico volta a ser gravado a partir do estado restaurado
+        expected = simulator.get_state_snapshot()
+        simulator.step()
+        self.assertEqual(simulator.step_back(1), 1)
+        self.assertEqual(simulator.get_state_snapshot(), expected)
+        
+    def test_size_mismatch_rejected(self):
+        """Checkpoint não pode ser restaurado com ROB de tamanho diferente"""
+        simulator = TomasuloSimulator()
+        simulator.load_program(self.instructions)
+        data = simulator.save_checkpoint()
+        
+        other = TomasuloSimulator({'rob_size': 8})
+        other.load_program(self.instructions)
+        with self.assertRaises(ValueError):
+            other.load_checkpoint(data)
+
+
+class TestHistory(unittest.TestCase):
+    """Testes para execução reversa"""
+    
+    PROGRAM = TestCheckpoint.PROGRAM
+    
+    def setUp(self):
+        self.instructions = MIPSParser().parse_program(self.PROGRAM)
+        
+    def test_step_back_restores_state(self):
+        """Voltar ciclos restaura exatamente o estado daquele ciclo"""
+        states = []
+        simulator = TomasuloSimulator()
+        simulator.load_program(self.instructions)
+        simulator.enable_history()
+        while not simulator.finished:
+            states.append(simulator.capture_state())
+            simulator.step()
+        states.append(simulator.capture_state())
+        
+        final_cycle = simulator.current_cycle
+        self.assertEqual(simulator.step_back(5), 5)
+        self.assertEqual(simulator.capture_state(), states[final_cycle - 5])
+        
+        self.assertEqual(simulator.step_back(final_cycle), final_cycle - 5)
+        self.assertEqual(simulator.capture_state(), states[0])
+        
+        # Executar de novo a partir do início reproduz o mesmo resultado
+        simulator.run_until_complete()
+        self.assertEqual(simulator.capture_state(), states[-1])
+        
+    def test_budget_limits_depth(self):
+        """O orçamento de memória limita a profundidade do histórico"""
+        simulator = TomasuloSimulator()
+        simulator.load_program(self.instructions)
+        simulator.enable_history(budget_bytes=10000)
+        simulator.run_until_complete()
+        
+        depth = len(simulator.history)
+        self.assertGreater(depth, 0)
+        self.assertLess(depth, simulator.current_cycle)
+        self.assertLessEqual(simulator.history.used_bytes, 10000)
+        self.assertEqual(simulator.step_back(simulator.current_cycle), depth)
+
+
+LOOP_PROGRAM = """
+ADDI R1, R0, 0
+ADDI R2, R0, 400
+ADDI R3, R0, 200
+loop:
+LW R4, 0(R3)
+ADD R4, R4, R1
+SW R4, 0(R3)
+MUL R5, R4, R2
+ADDI R3, R3, 4
+ADDI R1, R1, 1
+BNE R1, R2, loop
+J fim
+ADDI R6, R0, 1
+fim:
+ADD R7, R5, R4
+"""
+
+
+class TestBranches(unittest.TestCase):
+    """Testes para redirecionamento de desvios"""
+    
+    def test_loop_and_jump(self):
+        """Laços repetem o corpo e J salta instruções"""
+        instructions = MIPSParser().parse_program(LOOP_PROGRAM)
+        simulator = TomasuloSimulator()
+        simulator.load_program(instructions)
+        simulator.run_until_complete()
+        
+        self.assertTrue(simulator.finished)
+        self.assertEqual(simulator.registers['R1'], 400)
+        self.assertEqual(simulator.registers['R3'], 1800)
+        self.assertEqual(simulator.registers['R6'], 0)
+        self.assertEqual(simulator.memory[200 + 4 * 399], 399)
+        self.assertEqual(simulator.registers['R7'], 399 * 400 + 399)
+        self.assertEqual(simulator.metrics.instructions_completed, 3 + 7 * 400 + 2)
+        # Preditor inicial "fracamente não tomado": erra a primeira e a última iteração
+        self.assertEqual(simulator.metrics.branch_mispredictions, 2)
+        
+    def test_self_dependency(self):
+        """Uma instrução que lê o próprio destino depende do produtor anterior"""
+        instructions = MIPSParser().parse_program("""
+        ADDI R1, R0, 5
+        ADD R1, R1, R1
+        """)
+        simulator = TomasuloSimulator()
+        simulator.load_program(instructions)
+        simulator.run_until_complete()
+        self.assertEqual(simulator.registers['R1'], 10)
+
+
+class TestScheduler(unittest.TestCase):
+    """Testes para as filas de prontas e as políticas de seleção"""
+    
+    # Três MULs ficam prontas no mesmo ciclo; a mais nova inicia a cadeia mais longa
+    PROGRAM = """
+    ADDI R1, R0, 3
+    MUL R4, R1, R1
+    MUL R7, R1, R1
+    MUL R3, R1, R1
+    MUL R5, R3, R3
+    MUL R6, R5, R5
+    """
+    
+    def _run(self, config):
+        simulator = TomasuloSimulator(dict({'mul_rs': 5, 'addi_latency': 5}, **config))
+        simulator.load_program(MIPSParser().parse_program(self.PROGRAM))
+        simulator.run_until_complete()
+        return simulator
+        
+    def test_unlimited_units_ignore_policy(self):
+        """Com uma unidade por RS, todas as prontas executam e a política é irrelevante"""
+        cycles = {self._run({'scheduler': policy}).current_cycle
+                  for policy in ('oldest_first', 'random', 'critical_path')}
+        self.assertEqual(len(cycles), 1)
+        
+    def test_units_limit_concurrent_execution(self):
+        """Nunca há mais instruções executando que unidades funcionais"""
+        for policy in ('oldest_first', 'random', 'critical_path'):
+            simulator = self._run({'mul_fus': 2, 'scheduler': policy})
+            self.assertEqual(simulator.registers['R6'], 6561)
+            intervals = [(inst.exec_start_cycle, inst.exec_end_cycle)
+                         for inst in simulator.instructions if inst.type == InstructionType.MUL]
+            for cycle in range(simulator.current_cycle):
+                running = sum(1 for start, end in intervals if start <= cycle <= end)
+                self.assertLessEqual(running, 2)
+                
+    def test_critical_path_first(self):
+        """Priorizar o caminho crítico encurta a execução quando há disputa"""
+        oldest = self._run({'mul_fus': 2, 'scheduler': 'oldest_first'})
+        critical = self._run({'mul_fus': 2, 'scheduler': 'critical_path'})
+        self.assertLess(critical.current_cycle, oldest.current_cycle)
+        self.assertEqual(critical.current_cycle, self._run({}).current_cycle)
+        with self.assertRaises(ValueError):
+            TomasuloSimulator({'scheduler': 'fifo'})
+
+
+class TestStallDetection(unittest.TestCase):
+    """Testes para os orçamentos e a detecção de deadlock/livelock"""
+    
+    def _simulator(self, program, config=None):
+        simulator = TomasuloSimulator(config)
+        simulator.load_program(MIPSParser().parse_program(program))
+        return simulator
+        
+    def test_deadlock_without_station(self):
+        """Instrução sem reservation station disponível aborta com diagnóstico"""
+        simulator = self._simulator("""
+        ADDI R1, R0, 3
+        MUL R2, R1, R1
+        ADD R3, R2, R1
+        """, {'mul_rs': 0, 'deadlock_cycles': 20})
+        with self.assertRaises(SimulationStalled) as context:
+            simulator.run_until_complete()
+        diagnosis = context.exception.diagnosis
+        self.assertEqual(diagnosis['reason'], 'deadlock')
+        self.assertLess(diagnosis['cycle'], 30)
+        self.assertIsNone(diagnosis['rob_head'])
+        self.assertEqual(diagnosis['issue_blocked']['instruction'], 'MUL R2, R1, R1')
+        self.assertEqual(diagnosis['issue_blocked']['stations'], [])
+        
+    def test_livelock_repeated_state(self):
+        """Laço infinito sem mudança de estado é detectado por estado repetido"""
+        simulator = self._simulator("""
+        ADDI R1, R0, 3
+        loop:
+        ADDI R2, R0, 1
+        J loop
+        """)
+        with self.assertRaises(SimulationStalled) as context:
+            simulator.run_until_complete()
+        self.assertEqual(context.exception.diagnosis['reason'], 'livelock')
+        self.assertLess(simulator.current_cycle, 100)
+        
+    def test_budgets(self):
+        """Orçamentos de ciclos e instruções interrompem sem erro"""
+        program = """
+        loop:
+        ADDI R1, R1, 1
+        J loop
+        """
+        simulator = self._simulator(program, {'max_cycles': 500})
+        self.assertFalse(simulator.run_until_complete())
+        self.assertEqual(simulator.current_cycle, 500)
+        
+        simulator = self._simulator(program, {'max_instructions': 300})
+        self.assertFalse(simulator.run_until_complete())
+        self.assertEqual(simulator.metrics.instructions_completed, 300)
+        
+    def test_long_run_not_truncated(self):
+        """Execuções legítimas com mais de 10000 ciclos vão até o fim"""
+        simulator = self._simulator(LOOP_PROGRAM.replace('400', '1500'))
+        self.assertTrue(simulator.run_until_complete())
+        self.assertGreater(simulator.current_cycle, 10000)
+        self.assertEqual(simulator.registers['R1'], 1500)
+
+
+class TestLoopAcceleration(unittest.TestCase):
+    """Testes para a extrapolação de laços em regime estacionário"""
+    
+    CONFIGS = [{}, {'rob_size': 4, 'add_rs': 1}, {'mul_latency': 25}, {'rob_size': 32}]
+    
+    def _run(self, config):
+        instructions = MIPSParser().parse_program(LOOP_PROGRAM)
+        simulator = TomasuloSimulator(config)
+        simulator.load_program(instructions)
+        simulator.run_until_complete()
+        timings = [(inst.issue_cycle, inst.exec_start_cycle, inst.write_cycle,
+                    inst.commit_cycle) for inst in instructions]
+        return simulator, timings
+        
+    def test_disabled_by_default(self):
+        """A aceleração só é ativada pela configuração"""
+        simulator = TomasuloSimulator()
+        self.assertIsNone(simulator.loop_accelerator)
+        
+    def test_matches_exact_mode(self):
+        """Ciclos, métricas e estado final coincidem com a simulação exata"""
+        for config in self.CONFIGS:
+            exact, exact_timings = self._run(config)
+            fast, fast_timings = self._run(dict(config, loop_acceleration=True))
+            
+            self.assertEqual(fast.loop_accelerator.jumps, 1)
+            self.assertGreater(fast.loop_accelerator.skipped_iterations, 300)
+            self.assertEqual(vars(fast.metrics), vars(exact.metrics))
+            self.assertEqual(fast.branch_predictor.get_accuracy(),
+                             exact.branch_predictor.get_accuracy())
+            self.assertEqual(fast.registers, exact.registers)
+            self.assertEqual(fast.memory, exact.memory)
+            self.assertEqual(fast_timings, exact_timings)
+            
+    def test_replay_matches_exact_mode(self):
+        """A aceleração também vale para o replay de traces"""
+        import os
+        import tempfile
+        from src.core.trace import TraceReader, TraceReplaySimulator, record_trace
+        
+        exact, _ = self._run({})
+        instructions = MIPSParser().parse_program(LOOP_PROGRAM)
+        fd, path = tempfile.mkstemp(suffix='.trace')
+        os.close(fd)
+        try:
+            record_trace(instructions, path)
+            with TraceReader(path) as trace:
+                replay = TraceReplaySimulator(trace, {'loop_acceleration': True})
+                replay.load_program(instructions)
+                replay.run_until_complete()
+                self.assertEqual(replay.loop_accelerator.jumps, 1)
+                self.assertEqual(vars(replay.metrics), vars(exact.metrics))
+                self.assertEqual(replay.registers, exact.registers)
+        finally:
+            os.remove(path)
+
+
+class TestBlockCache(unittest.TestCase):
+    """Testes para a memoização da temporização por bloco básico"""
+    
+    def _exact(self, program, config):
+        simulator = TomasuloSimulator(config)
+        simulator.load_program(MIPSParser().parse_program(program))
+        simulator.run_until_complete()
+        return simulator.capture_state()
+        
+    def test_matches_exact_mode(self):
+        """O estado completo ao fim coincide com a simulação ciclo a ciclo"""
+        from src.core.block_cache import BlockTimingCache
+        
+        for program in (LOOP_PROGRAM, TestCheckpoint.PROGRAM):
+            for config in ({}, {'rob_size': 4, 'add_rs': 1}, {'mul_latency': 25}):
+                simulator = TomasuloSimulator(config)
+                simulator.load_program(MIPSParser().parse_program(program))
+                cache = BlockTimingCache(simulator)
+                cache.run_until_complete()
+                self.assertEqual(simulator.capture_state(), self._exact(program, config))
+                
+    def test_hit_rate_and_lru(self):
+        """Blocos repetidos são servidos pelo cache, limitado pelo LRU"""
+        from src.core.block_cache import BlockTimingCache
+        
+        simulator = TomasuloSimulator()
+        simulator.load_program(MIPSParser().parse_program(LOOP_PROGRAM))
+        cache = BlockTimingCache(simulator)
+        while cache.step_block():
+            pass
+        self.assertGreater(cache.hit_rate, 0.9)
+        self.assertEqual(cache.hits + cache.misses, 400 + 1)
+        
+        small = TomasuloSimulator()
+        small.load_program(MIPSParser().parse_program(LOOP_PROGRAM))
+        cache = BlockTimingCache(small, max_entries=2)
+        cache.run_until_complete()
+        self.assertLessEqual(len(cache), 2)
+        self.assertEqual(small.capture_state(), simulator.capture_state())
+        
+    def test_rejects_history(self):
+        """Não pode ser combinado com o histórico de execução reversa"""
+        from src.core.block_cache import BlockTimingCache
+        
+        simulator = TomasuloSimulator()
+        simulator.enable_history()
+        with self.assertRaises(ValueError):
+            BlockTimingCache(simulator)
+
+
 if __name__ == '__main__':
     unittest.main()
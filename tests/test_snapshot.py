@@ -0,0 +1,149 @@
+"""
+Testes para os snapshots tipados e incrementais
+"""
+import unittest
+from src.core.simulator import TomasuloSimulator
+from src.core.snapshot import StateVersions, StationState
+from src.core.stream import StateTracker
+from src.mips.parser import MIPSParser
+from tests.test_simulator import LOOP_PROGRAM
+
+
+STRUCTURES = ('registers', 'memory', 'stations', 'rob', 'instructions')
+
+
+def apply(state, snapshot):
+    """Aplica um snapshot (completo ou incremental) a um estado reconstruído"""
+    if snapshot.full:
+        state = {key: {} for key in STRUCTURES}
+    for reg, value in snapshot.registers.items():
+        if value is None:
+            state['registers'].pop(reg, None)
+        else:
+            state['registers'][reg] = value
+    for page, contents in snapshot.memory_pages.items():
+        # Páginas vêm completas: substituem o conteúdo anterior da página
+        state['memory'] = {address: value for address, value in state['memory'].items()
+                           if address >> StateVersions.PAGE_SHIFT != page}
+        state['memory'].update(contents)
+    for key in ('stations', 'rob', 'instructions'):
+        state[key].update(getattr(snapshot, key))
+    return state
+
+
+def expected_state(simulator):
+    full = simulator.snapshot()
+    return {
+        'registers': full.registers,
+        'memory': full.memory,
+        'stations': full.stations,
+        'rob': full.rob,
+        'instructions': full.instructions,
+    }
+
+
+class TestStateVersions(unittest.TestCase):
+    """Testes para StateVersions e TomasuloSimulator.snapshot"""
+
+    def setUp(self):
+        self.simulator = TomasuloSimulator({'rob_size': 8})
+        self.simulator.load_program(MIPSParser().parse_program(LOOP_PROGRAM.replace('400', '20')))
+
+    def test_snapshot_without_versions_is_full(self):
+        """Sem versões, todo snapshot é completo e tipado"""
+        snapshot = self.simulator.snapshot(since=5)
+        self.assertTrue(snapshot.full)
+        self.assertIsNone(snapshot.version)
+        self.assertIsInstance(snapshot.stations[0], StationState)
+        self.assertEqual(snapshot.stations[0], self.simulator._rs_state(self.simulator._all_rs()[0]))
+
+    def test_deltas_reconstruct_state_forward(self):
+        """Snapshots incrementais aplicados em ordem reproduzem o estado completo"""
+        versions = self.simulator.enable_versions()
+        snapshot = self.simulator.snapshot()
+        state = apply(None, snapshot)
+        total_stations = len(self.simulator._all_rs())
+        while not self.simulator.finished:
+            self.simulator.step()
+            snapshot = self.simulator.snapshot(since=snapshot.version)
+            self.assertFalse(snapshot.full)
+            self.assertEqual(snapshot.cycle, self.simulator.current_cycle)
+            self.assertLessEqual(len(snapshot.registers), 4)
+            self.assertLess(len(snapshot.stations), total_stations)
+            state = apply(state, snapshot)
+            self.assertEqual(state, expected_state(self.simulator))
+        self.assertEqual(snapshot.version, versions.version)
+        # Nada mudou desde a última versão
+        idle = self.simulator.snapshot(since=snapshot.version)
+        self.assertEqual((idle.registers, idle.memory_pages, idle.stations, idle.rob,
+                          idle.instructions), ({}, {}, {}, {}, {}))
+
+    def test_deltas_follow_step_back(self):
+        """Voltar ciclos gera uma nova versão com as estruturas restauradas"""
+        self.simulator.enable_history()
+        self.simulator.enable_versions()
+        for _ in range(40):
+            self.simulator.step()
+        snapshot = self.simulator.snapshot()
+        state = apply(None, snapshot)
+        for cycles in (7, 1, 15):
+            self.assertEqual(self.simulator.step_back(cycles), cycles)
+            snapshot = self.simulator.snapshot(since=snapshot.version)
+            self.assertFalse(snapshot.full)
+            state = apply(state, snapshot)
+            self.assertEqual(state, expected_state(self.simulator))
+        # Depois de voltar, o avanço continua incremental
+        for _ in range(5):
+            self.simulator.step()
+        state = apply(state, self.simulator.snapshot(since=snapshot.version))
+        self.assertEqual(state, expected_state(self.simulator))
+
+    def test_reset_and_external_changes_invalidate(self):
+        """Reset e restauração de checkpoint tornam o próximo snapshot completo"""
+        self.simulator.enable_versions()
+        for _ in range(10):
+            self.simulator.step()
+        checkpoint = self.simulator.save_checkpoint()
+        version = self.simulator.snapshot().version
+        self.simulator.reset()
+        self.assertTrue(self.simulator.snapshot(since=version).full)
+
+        version = self.simulator.snapshot().version
+        self.simulator.load_checkpoint(checkpoint)
+        snapshot = self.simulator.snapshot(since=version)
+        self.assertTrue(snapshot.full)
+        self.assertEqual(snapshot.cycle, 10)
+
+    def test_memory_pages(self):
+        """Escritas na memória marcam apenas a página do endereço"""
+        versions = self.simulator.enable_versions()
+        self.simulator.memory.update({address: 1 for address in range(0, 4096, 4)})
+        self.simulator.reset()  # Memória alterada por fora: invalidar
+        version = versions.version
+        self.simulator._write_memory(204, 7)
+        self.simulator._write_memory(1000, 8)
+        versions.sync()
+        snapshot = self.simulator.snapshot(since=version)
+        pages = {204 >> StateVersions.PAGE_SHIFT, 1000 >> StateVersions.PAGE_SHIFT}
+        self.assertEqual(set(snapshot.memory_pages), pages)
+        self.assertEqual(snapshot.memory_pages[204 >> StateVersions.PAGE_SHIFT][204], 7)
+        self.assertEqual(len(snapshot.memory), 2 * (1 << StateVersions.PAGE_SHIFT) // 4)
+        self.assertEqual(versions.changed('pages', version), sorted(pages))
+
+    def test_stream_tracker_uses_versions(self):
+        """StateTracker com versões produz os mesmos lotes que a comparação completa"""
+        other = TomasuloSimulator({'rob_size': 8})
+        other.load_program(MIPSParser().parse_program(LOOP_PROGRAM.replace('400', '20')))
+        self.simulator.enable_versions()
+        trackers = (StateTracker(self.simulator), StateTracker(other))
+        while not self.simulator.finished:
+            for _ in range(3):
+                self.simulator.step()
+                other.step()
+            versioned, compared = (tracker.delta() for tracker in trackers)
+            for key in STRUCTURES + ('metrics', 'cycle', 'pc', 'finished'):
+                self.assertEqual(getattr(versioned, key), getattr(compared, key), key)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,240 @@
+"""
+Testes para o fluxo assíncrono de mudanças de estado
+"""
+import asyncio
+import io
+import json
+import os
+import shutil
+import tempfile
+import threading
+import time
+import unittest
+from src.core.simulator import TomasuloSimulator
+from src.core.stream import (
+    StateStream, stream_states, record_batches, serve_batches
+)
+from src.mips.parser import MIPSParser
+from tests.test_simulator import LOOP_PROGRAM
+
+
+STRUCTURES = ('registers', 'memory', 'stations', 'rob', 'instructions')
+
+
+def apply(state, batch):
+    """Aplica um lote a um estado reconstruído (dicionários por estrutura)"""
+    if batch.full or state is None:
+        state = {key: {} for key in STRUCTURES}
+    for key in STRUCTURES:
+        state[key].update(getattr(batch, key))
+    state['cycle'] = batch.cycle
+    state['finished'] = batch.finished
+    return state
+
+
+def final_state(simulator):
+    return {
+        'registers': dict(simulator.registers),
+        'memory': dict(simulator.memory),
+        'stations': dict(enumerate(simulator._rs_state(rs) for rs in simulator._all_rs())),
+        'rob': dict(enumerate(simulator._rob_state(entry) for entry in simulator.rob)),
+        'instructions': dict(enumerate(simulator._inst_state(inst)
+                                       for inst in simulator.instructions)),
+        'cycle': simulator.current_cycle,
+        'finished': simulator.finished,
+    }
+
+
+class TestStateStream(unittest.TestCase):
+    """Testes para StateStream e seus consumidores"""
+
+    def setUp(self):
+        self.simulator = TomasuloSimulator({'rob_size': 8})
+        self.simulator.load_program(MIPSParser().parse_program(LOOP_PROGRAM.replace('400', '40')))
+
+    def test_consumers_reconstruct_final_state(self):
+        """Consumidores com e sem perdas reconstroem o estado final"""
+        stream = StateStream(self.simulator, threading.Lock(), batch_time=0.0001)
+        lossless = stream.subscribe(maxsize=2, lossless=True)
+        lossy = stream.subscribe(maxsize=1)
+        results = {}
+
+        async def consume(name, subscription, delay):
+            state, cycles = None, []
+            async for batch in subscription:
+                if cycles:
+                    self.assertFalse(batch.full)
+                    self.assertEqual(batch.first_cycle, cycles[-1])
+                state = apply(state, batch)
+                cycles.append(batch.cycle)
+                await asyncio.sleep(delay)
+            results[name] = (state, cycles)
+
+        async def main():
+            consumers = asyncio.gather(consume('lossless', lossless, 0),
+                                       consume('lossy', lossy, 0.005))
+            finished = await stream.run()
+            await consumers
+            return finished
+
+        self.assertTrue(asyncio.run(main()))
+        expected = final_state(self.simulator)
+        for name in ('lossless', 'lossy'):
+            self.assertEqual(results[name][0], expected)
+        # O consumidor lento recebeu lotes juntados; o sem perdas recebeu todos
+        self.assertGreater(lossy.coalesced, 0)
+        self.assertEqual(lossless.coalesced, 0)
+        self.assertLess(len(results['lossy'][1]), len(results['lossless'][1]))
+
+    def test_async_generator_stops_with_consumer(self):
+        """A simulação espera o consumidor e para quando o gerador é fechado"""
+        async def main():
+            cycles = []
+            batches = stream_states(self.simulator, cycles_per_second=1e6, batch_time=0)
+            async for batch in batches:
+                cycles.append(batch.cycle)
+                if len(cycles) == 5:
+                    break
+                await asyncio.sleep(0.01)
+            await batches.aclose()
+            return cycles
+
+        cycles = asyncio.run(main())
+        self.assertEqual(cycles, [0, 1, 2, 3, 4])
+        self.assertFalse(self.simulator.finished)
+        # Contrapressão: no máximo a fila (2 lotes) e um lote em andamento à frente
+        self.assertLessEqual(self.simulator.current_cycle, cycles[-1] + 3)
+
+    def test_no_batches_without_subscribers(self):
+        """Sem assinaturas nada é calculado; quem assina depois recebe o que mudou"""
+        stream = StateStream(self.simulator, batch_time=0)
+        self.assertIsNone(stream._advance(0)[0])
+        for _ in range(20):
+            stream._advance(0)
+        subscription = stream.subscribe(lossless=True)
+        state = None
+
+        async def consume():
+            nonlocal state
+            async for batch in subscription:
+                state = apply(state, batch)
+
+        async def main():
+            consumer = asyncio.ensure_future(consume())
+            await stream.run()
+            await consumer
+
+        asyncio.run(main())
+        self.assertEqual(state, final_state(self.simulator))
+
+    def test_paced_run_batches_cycles(self):
+        """Em velocidade limitada alta, cada lote executa vários ciclos no ritmo pedido"""
+        speed = 2000
+        stream = StateStream(self.simulator, threading.Lock(), cycles_per_second=speed)
+        subscription = stream.subscribe(lossless=True)
+        batches = []
+
+        async def consume():
+            async for batch in subscription:
+                batches.append(batch)
+
+        async def main():
+            consumer = asyncio.ensure_future(consume())
+            start = time.perf_counter()
+            finished = await stream.run()
+            await consumer
+            return finished, time.perf_counter() - start
+
+        finished, elapsed = asyncio.run(main())
+        cycles = self.simulator.current_cycle
+        self.assertTrue(finished)
+        self.assertGreater(elapsed, 0.8 * cycles / speed)
+        self.assertLess(len(batches), cycles / 4)
+
+    def test_breakpoints_pause_and_resume(self):
+        """A execução pausa no ciclo do breakpoint e retoma até o próximo"""
+        def run(stream):
+            return asyncio.run(stream.run())
+
+        def first_cycle(predicate):
+            simulator = TomasuloSimulator({'rob_size': 8})
+            simulator.load_program(self.simulator.instructions)
+            while not predicate(simulator):
+                simulator.step()
+            return simulator.current_cycle
+
+        breakpoints = self.simulator.enable_breakpoints()
+        breakpoints.add('mispredict')
+        stream = StateStream(self.simulator)
+        self.assertFalse(run(stream))
+        cycle = first_cycle(lambda sim: sim.metrics.branch_mispredictions)
+        self.assertEqual(self.simulator.current_cycle, cycle)
+        self.assertEqual(stream.stop_reason, f'misprediction no ciclo {cycle}')
+
+        breakpoints.replace([('issue', 3)])
+        cycles = []
+        for _ in range(2):
+            self.assertFalse(run(stream))
+            cycles.append(self.simulator.current_cycle)
+            self.assertEqual(self.simulator.instructions[3].issue_cycle, cycles[-1])
+            self.assertEqual(stream.stop_reason, f'issue do PC 3 no ciclo {cycles[-1]}')
+        self.assertLess(cycles[0], cycles[1])
+
+        self.setUp()
+        self.simulator.enable_breakpoints().add('rob_full')
+        stream = StateStream(self.simulator)
+        self.assertFalse(run(stream))
+        self.assertEqual(self.simulator.current_cycle,
+                         first_cycle(lambda sim: sim.metrics.rob_full_cycles))
+
+        # Sem breakpoints, a execução vai até o fim
+        self.simulator.breakpoints.clear()
+        self.assertTrue(run(stream))
+        self.assertIsNone(stream.stop_reason)
+
+    def test_recorder_and_remote_viewer(self):
+        """Gravação em JSON e visualizador por socket recebem o mesmo estado final"""
+        directory = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, directory)
+        path = os.path.join(directory, 'stream.sock')
+        stream = StateStream(self.simulator, batch_time=0.001)
+        output = io.StringIO()
+
+        async def viewer():
+            reader, writer = await asyncio.open_unix_connection(path)
+            batches = []
+            while True:
+                line = await reader.readline()
+                if not line:
+                    break
+                batches.append(json.loads(line))
+            writer.close()
+            return batches
+
+        async def main():
+            server = await serve_batches(stream, path)
+            recorder = asyncio.ensure_future(record_batches(stream.subscribe(lossless=True), output))
+            remote = asyncio.ensure_future(viewer())
+            while not stream._subscribers[1:]:
+                await asyncio.sleep(0.001)  # Espera o visualizador conectar
+            await stream.run()
+            await recorder
+            batches = await remote
+            server.close()
+            await server.wait_closed()
+            return batches
+
+        remote = asyncio.run(main())
+        recorded = [json.loads(line) for line in output.getvalue().splitlines()]
+        for batches in (recorded, remote):
+            self.assertTrue(batches[0]['full'])
+            self.assertTrue(batches[-1]['finished'])
+            self.assertEqual(batches[-1]['cycle'], self.simulator.current_cycle)
+            registers = {}
+            for batch in batches:
+                registers.update(batch['registers'])
+            self.assertEqual(registers, self.simulator.registers)
+
+
+if __name__ == '__main__':
+    unittest.main()
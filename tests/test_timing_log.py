@@ -0,0 +1,164 @@
+"""
+Testes para o registro colunar de temporização por instrução
+"""
+import ast
+import csv
+import os
+import tempfile
+import unittest
+import zipfile
+from array import array
+from src.core.simulator import TomasuloSimulator
+from src.core.timing_log import COLUMNS
+from src.mips.parser import MIPSParser
+from tests.test_simulator import LOOP_PROGRAM
+
+
+# O BEQ é predito não tomado e é tomado: DIV, SUB e ADD são descartadas e ADD é rebuscada
+PROGRAM = """
+ADDI R1, R0, 100
+ADDI R2, R0, 42
+SW R2, 0(R1)
+LW R3, 0(R1)
+MUL R4, R3, R2
+BEQ R3, R2, fim
+DIV R5, R4, R1
+SUB R6, R5, R3
+fim:
+ADD R7, R6, R4
+"""
+
+
+class TestTimingLog(unittest.TestCase):
+    """Testes para a gravação e exportação da temporização"""
+
+    def setUp(self):
+        self.simulator = TomasuloSimulator()
+        self.simulator.load_program(MIPSParser().parse_program(PROGRAM))
+        self.log = self.simulator.enable_timing_log(capacity=2)
+        self.simulator.run_until_complete()
+        fd, self.path = tempfile.mkstemp()
+        os.close(fd)
+
+    def tearDown(self):
+        os.remove(self.path)
+
+    def test_rows_match_instructions(self):
+        """Cada instrução dinâmica tem uma linha; descartadas têm ciclo de squash"""
+        log = self.log
+        self.assertEqual(len(log), self.simulator.metrics.instructions_issued)
+        pcs = list(log.column('pc'))
+        self.assertEqual(pcs, [0, 1, 2, 3, 4, 5, 6, 7, 8, 8])
+
+        squashed = [seq for seq, cycle in enumerate(log.column('squash')) if cycle >= 0]
+        self.assertEqual(squashed, [6, 7, 8])
+        for seq in squashed:
+            self.assertEqual(log.column('commit')[seq], -1)
+
+        # Instruções que fizeram commit: colunas iguais aos campos da instrução
+        for seq, pc in enumerate(pcs):
+            inst = self.simulator.instructions[pc]
+            if seq in squashed:
+                continue
+            self.assertEqual(log.column('issue')[seq], inst.issue_cycle)
+            self.assertEqual(log.column('exec_start')[seq], inst.exec_start_cycle)
+            self.assertEqual(log.column('write')[seq], inst.write_cycle)
+            self.assertEqual(log.column('commit')[seq], inst.commit_cycle)
+
+    def test_summary_and_histogram(self):
+        """Resumos contam apenas instruções em que os dois eventos ocorreram"""
+        summary = self.log.summary()
+        self.assertEqual(summary['issue->commit']['count'], 7)
+        self.assertLessEqual(summary['issue->commit']['p50'], summary['issue->commit']['max'])
+        histogram = self.log.histogram('issue', 'commit', bin_width=5)
+        self.assertEqual(sum(histogram.values()), 7)
+        self.assertTrue(all(start % 5 == 0 for start in histogram))
+
+    def test_save_npz(self):
+        """O .npz contém um .npy int64 por coluna"""
+        self.log.save_npz(self.path)
+        with zipfile.ZipFile(self.path) as archive:
+            self.assertIn('commit.npy', archive.namelist())
+            data = archive.read('commit.npy')
+        self.assertEqual(data[:8], b'\x93NUMPY\x01\x00')
+        header_size = int.from_bytes(data[8:10], 'little')
+        self.assertEqual((10 + header_size) % 64, 0)
+        header = ast.literal_eval(data[10:10 + header_size].decode('latin1'))
+        self.assertEqual(header['descr'], '<i8')
+        self.assertEqual(header['shape'], (len(self.log),))
+        values = array('q', data[10 + header_size:])
+        self.assertEqual(values, self.log.column('commit'))
+
+    def test_save_csv(self):
+        """O CSV tem cabeçalho e uma linha por instrução dinâmica"""
+        self.log.save_csv(self.path, self.simulator.instructions)
+        with open(self.path, newline='') as f:
+            rows = list(csv.reader(f))
+        self.assertEqual(rows[0][:3], ['seq', 'pc', 'issue'])
+        self.assertEqual(len(rows), len(self.log) + 1)
+        self.assertEqual(rows[-1][-1], 'ADD R7, R6, R4')
+
+
+class TestTimingLogRewind(unittest.TestCase):
+    """Registro após desfazer ciclos ou restaurar checkpoints"""
+
+    def _simulator(self, program=LOOP_PROGRAM):
+        simulator = TomasuloSimulator()
+        simulator.load_program(MIPSParser().parse_program(program))
+        return simulator
+
+    def _columns(self, log):
+        return {name: log.column(name) for name in ('seq',) + COLUMNS}
+
+    def _reference(self, program=LOOP_PROGRAM):
+        simulator = self._simulator(program)
+        log = simulator.enable_timing_log()
+        simulator.run_until_complete()
+        return self._columns(log)
+
+    def test_step_back_then_run(self):
+        """Desfazer ciclos descarta os eventos posteriores; o registro final é o da execução direta"""
+        for program in (LOOP_PROGRAM, PROGRAM):
+            simulator = self._simulator(program)
+            simulator.enable_history()
+            log = simulator.enable_timing_log()
+            for _ in range(20):
+                simulator.step()
+            simulator.step_back(10)
+            simulator.run_until_complete()
+            self.assertEqual(self._columns(log), self._reference(program))
+
+    def test_checkpoint_restore(self):
+        """Restaurar um checkpoint anterior da mesma execução equivale a voltar no tempo"""
+        simulator = self._simulator()
+        log = simulator.enable_timing_log()
+        for _ in range(7):
+            simulator.step()
+        checkpoint = simulator.save_checkpoint()
+        for _ in range(15):
+            simulator.step()
+        simulator.load_checkpoint(checkpoint)
+        simulator.run_until_complete()
+        self.assertEqual(self._columns(log), self._reference())
+
+    def test_checkpoint_from_other_run(self):
+        """Instruções em voo de um estado alheio ganham linhas sem ciclo de issue"""
+        source = self._simulator()
+        for _ in range(7):
+            source.step()
+        in_flight = len(source._in_flight_entries())
+        self.assertGreater(in_flight, 0)
+
+        simulator = self._simulator()
+        log = simulator.enable_timing_log()
+        simulator.load_checkpoint(source.save_checkpoint())
+        self.assertEqual(len(log), in_flight)
+        self.assertEqual(set(log.column('issue')), {-1})
+        simulator.run_until_complete()
+        # Todas as linhas, inclusive as herdadas, terminam em commit ou squash
+        for commit, squash in zip(log.column('commit'), log.column('squash')):
+            self.assertTrue(commit >= 0 or squash >= 0)
+
+
+if __name__ == '__main__':
+    unittest.main()
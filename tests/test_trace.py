@@ -0,0 +1,127 @@
+"""
+Testes para o trace dinâmico (gravação funcional e replay temporal)
+"""
+import os
+import tempfile
+import unittest
+from src.core.simulator import TomasuloSimulator
+from src.core.functional import FunctionalSimulator
+from src.core.trace import TraceReader, TraceReplaySimulator, record_trace
+from src.core.sweep import run_sweep
+from src.core.result_cache import ResultCache
+from src.mips.parser import MIPSParser
+
+
+PROGRAM = """
+ADDI R1, R0, 100
+ADDI R2, R0, 42
+SW R2, 0(R1)
+LW R3, 0(R1)
+MUL R4, R3, R2
+BEQ R3, R2, fim
+DIV R5, R4, R1
+SUB R6, R5, R3
+fim:
+ADD R7, R6, R4
+"""
+
+ENDLESS_PROGRAM = """
+ADDI R1, R0, 1
+loop:
+ADDI R2, R2, 1
+BNE R1, R0, loop
+"""
+
+
+class TestTrace(unittest.TestCase):
+    """Testes para gravação e replay de traces"""
+
+    def setUp(self):
+        self.instructions = MIPSParser().parse_program(PROGRAM)
+        fd, self.path = tempfile.mkstemp(suffix='.trace')
+        os.close(fd)
+
+    def tearDown(self):
+        os.remove(self.path)
+
+    def test_functional_matches_timing(self):
+        """O simulador funcional produz o mesmo estado final que o temporal"""
+        functional = FunctionalSimulator(self.instructions)
+        functional.run()
+
+        simulator = TomasuloSimulator()
+        simulator.load_program(self.instructions)
+        simulator.run_until_complete()
+
+        self.assertEqual(functional.registers, simulator.registers)
+        self.assertEqual(functional.memory, simulator.memory)
+
+    def test_record_and_read(self):
+        """Registros gravados são lidos de volta via mmap"""
+        count, finished = record_trace(self.instructions, self.path)
+        self.assertTrue(finished)
+        # O BEQ é tomado e salta DIV e SUB
+        self.assertEqual(count, len(self.instructions) - 2)
+
+        with TraceReader(self.path) as trace:
+            self.assertEqual(len(trace), count)
+            self.assertEqual(trace.pc(3), 3)
+            self.assertEqual(trace.address(3), 100)
+            self.assertEqual(trace.value(3), 42)
+            self.assertTrue(trace.taken(5))
+
+    def test_replay_matches_direct_run(self):
+        """O replay reproduz exatamente os ciclos e o estado da simulação direta"""
+        record_trace(self.instructions, self.path)
+        configs = [{}, {'add_rs': 1, 'rob_size': 4}, {'mul_rs': 1, 'mul_latency': 3}]
+
+        with TraceReader(self.path) as trace:
+            for config in configs:
+                direct = TomasuloSimulator(config)
+                direct.load_program(self.instructions)
+                direct.run_until_complete()
+
+                replay = TraceReplaySimulator(trace, config)
+                replay.load_program(self.instructions)
+                replay.run_until_complete()
+
+                self.assertEqual(replay.metrics.total_cycles, direct.metrics.total_cycles)
+                self.assertEqual(replay.metrics.branch_mispredictions,
+                                 direct.metrics.branch_mispredictions)
+                self.assertEqual(replay.registers, direct.registers)
+                self.assertEqual(replay.memory, direct.memory)
+
+    def test_run_sweep(self):
+        """A varredura retorna uma métrica por configuração"""
+        results = run_sweep(self.instructions, [{}, {'rob_size': 4}])
+        self.assertEqual(len(results), 2)
+        self.assertEqual(results[0].instructions_completed, len(self.instructions) - 2)
+        self.assertEqual(results.truncated, [])
+
+    def test_run_sweep_truncates_endless_program(self):
+        """Um programa que não termina para no limite e é marcado, sem ir ao cache"""
+        instructions = MIPSParser().parse_program(ENDLESS_PROGRAM)
+        cache_path = self.path + '.sqlite'
+        self.addCleanup(os.remove, cache_path)
+        with ResultCache(cache_path) as cache:
+            results = run_sweep(instructions, [{}, {'rob_size': 4}], cache=cache,
+                                max_instructions=500)
+            self.assertEqual(len(cache), 0)
+        self.assertEqual(results.truncated, [0, 1])
+        for metrics in results:
+            self.assertEqual(metrics.instructions_completed, 500)
+
+    def test_run_sweep_limit_equal_to_program_length(self):
+        """Um programa com exatamente max_instructions instruções dinâmicas terminou"""
+        dynamic = len(self.instructions) - 2
+        self.assertEqual(record_trace(self.instructions, self.path, max_instructions=dynamic),
+                         (dynamic, True))
+        self.assertEqual(record_trace(self.instructions, self.path, max_instructions=dynamic - 1),
+                         (dynamic - 1, False))
+        results = run_sweep(self.instructions, [{}], max_instructions=dynamic)
+        self.assertEqual(results.truncated, [])
+        self.assertEqual(results[0].instructions_completed, dynamic)
+
+
+if __name__ == '__main__':
+    unittest.main()